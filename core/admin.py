@@ -1,10 +1,33 @@
-from django.contrib import admin
+from datetime import date, timedelta
+
+from django import forms
+from django.contrib import admin, messages
+from django.contrib.admin.helpers import ACTION_CHECKBOX_NAME
+from django.contrib.auth.models import User
+from django.core.exceptions import PermissionDenied
+from django.http import HttpResponseRedirect
+from django.template.response import TemplateResponse
+from django.urls import path, reverse
+from django.utils import timezone
+from django.utils.html import format_html, format_html_join
 
 from .models import (
     Partner, Client, Project,
     Environment, Server, Resource,
     UserProfile, Issue, InfraActivity,
+    IssueSLA, ServerProbe, AuditEntry, EstimateStat, SavedSearch,
+    TimesheetMonth, ProfileTrigger, RecurrenceRule,
 )
+from .analytics import suggest as suggest_estimate
+from .clone import clone_project
+from .calendar_index import issues_between, month_range, week_key, week_start
+from .audit import FIELD_NAMES, MODEL_BY_CODE, object_timeline
+from .impact import blast_radius
+from .probe import with_last_probe
+from .purge import PurgeBlocked, PurgePlan
+from .recurrence import DEFAULT_HORIZON_DAYS, schedule as schedule_recurring
+from .similarity import similar_issues
+from . import triage
 
 
 # ---------- Inlines ----------
@@ -37,14 +60,226 @@ class ResourceInline(admin.TabularInline):
 class InfraActivityInline(admin.TabularInline):
     model = InfraActivity
     extra = 0
-    fields = ("activity_date", "status", "note", "hours_spent")
+    fields = ("activity_date", "status", "note", "hours_spent", "performed_by")
     readonly_fields = ("created_at",)
+    autocomplete_fields = ("performed_by",)
+
+
+# ---------- Filters ----------
+
+class ReachabilityFilter(admin.SimpleListFilter):
+    """
+    Filter servers on their latest probe (see core.probe).
+    """
+    title = "reachability"
+    parameter_name = "reachable"
+
+    def lookups(self, request, model_admin):
+        return (
+            ("up", "Up"),
+            ("down", "Down"),
+            ("unknown", "Never probed"),
+        )
+
+    def queryset(self, request, queryset):
+        if self.value() == "up":
+            return queryset.filter(last_probe_up=True)
+        if self.value() == "down":
+            return queryset.filter(last_probe_up=False)
+        if self.value() == "unknown":
+            return queryset.filter(last_probe_up__isnull=True)
+        return queryset
+
+
+class SLAFilter(admin.SimpleListFilter):
+    """
+    Filter on the precomputed IssueSLA deadline (see core.sla).
+    """
+    title = "SLA"
+    parameter_name = "sla"
+
+    def lookups(self, request, model_admin):
+        return (
+            ("breached", "Breached"),
+            ("24h", "Breaching in next 24h"),
+            ("7d", "Breaching in next 7 days"),
+            ("none", "No SLA (closed)"),
+        )
+
+    def queryset(self, request, queryset):
+        now = timezone.now()
+        if self.value() == "breached":
+            return queryset.filter(sla__deadline__lte=now)
+        if self.value() == "24h":
+            return queryset.filter(sla__deadline__gt=now, sla__deadline__lte=now + timedelta(hours=24))
+        if self.value() == "7d":
+            return queryset.filter(sla__deadline__gt=now, sla__deadline__lte=now + timedelta(days=7))
+        if self.value() == "none":
+            return queryset.filter(sla__isnull=True)
+        return queryset
+
+
+# ---------- Forms ----------
+
+class CloneProjectForm(forms.Form):
+    client = forms.ModelChoiceField(queryset=Client.objects.order_by("name"))
+    name = forms.CharField(max_length=200)
+    code = forms.SlugField(help_text="Must be unique within the client.")
+    with_issues = forms.BooleanField(required=False, label="Copy open issues")
+
+    def clean(self):
+        cleaned = super().clean()
+        client, code = cleaned.get("client"), cleaned.get("code")
+        if client and code and Project.objects.filter(client=client, code=code).exists():
+            self.add_error("code", "This client already has a project with this code.")
+        return cleaned
+
+
+class ReassignIssuesForm(forms.Form):
+    assigned_to = forms.ModelChoiceField(
+        queryset=User.objects.filter(is_active=True).order_by("username"),
+        required=False,
+        empty_label="(unassigned)",
+    )
+
+
+class IssueStatusForm(forms.Form):
+    status = forms.ChoiceField(choices=[("", "(unchanged)")] + Issue.STATUS_CHOICES, required=False)
+    priority = forms.ChoiceField(choices=[("", "(unchanged)")] + Issue.PRIORITY_CHOICES, required=False)
+
+    def clean(self):
+        cleaned = super().clean()
+        if not cleaned.get("status") and not cleaned.get("priority"):
+            raise forms.ValidationError("Pick a status, a priority or both.")
+        return cleaned
+
+
+class ShiftDueDatesForm(forms.Form):
+    days = forms.IntegerField(
+        min_value=-365,
+        max_value=365,
+        help_text="Negative moves due dates earlier. Issues without one are skipped.",
+    )
+
+    def clean_days(self):
+        if self.cleaned_data["days"] == 0:
+            raise forms.ValidationError("Shift by at least one day.")
+        return self.cleaned_data["days"]
+
+
+class CloseIssuesForm(forms.Form):
+    status = forms.ChoiceField(choices=[("done", "Done / Completed"), ("cancelled", "Cancelled")])
+    activity_date = forms.DateField(initial=date.today)
+    note = forms.CharField(widget=forms.Textarea(attrs={"rows": 3}), help_text="Logged as the final activity of every issue.")
+    hours_spent = forms.DecimalField(max_digits=5, decimal_places=2, min_value=0, initial=0)
+
+
+# ---------- Mixins ----------
+
+class BlastRadiusMixin:
+    """
+    Adds a "Blast radius" page (core.impact) to a server/resource admin.
+    """
+    impact_kind = None
+
+    def get_urls(self):
+        info = self.model._meta.app_label, self.model._meta.model_name
+        return [
+            path(
+                "<path:object_id>/impact/",
+                self.admin_site.admin_view(self.impact_view),
+                name="%s_%s_impact" % info,
+            ),
+        ] + super().get_urls()
+
+    def impact_view(self, request, object_id):
+        obj = self.get_object(request, object_id)
+        if obj is None:
+            return self._get_obj_does_not_exist_redirect(request, self.model._meta, object_id)
+        context = {
+            **self.admin_site.each_context(request),
+            "opts": self.model._meta,
+            "original": obj,
+            "title": f"Blast radius of {obj}",
+            "radius": blast_radius(self.impact_kind, obj.pk),
+        }
+        return TemplateResponse(request, "admin/core/impact.html", context)
+
+    def impact_link(self, obj):
+        info = self.model._meta.app_label, self.model._meta.model_name
+        url = reverse("admin:%s_%s_impact" % info, args=[obj.pk])
+        return format_html('<a href="{}">Blast radius</a>', url)
+
+    impact_link.short_description = "Impact"
+
+
+class TenantPurgeMixin:
+    """
+    Replaces the collector-based delete of a tenant (partner / client)
+    with core.purge: counts on the confirmation page, batched raw deletes.
+    """
+    actions = ["purge_selected"]
+
+    def get_actions(self, request):
+        actions = super().get_actions(request)
+        actions.pop("delete_selected", None)
+        return actions
+
+    def delete_view(self, request, object_id, extra_context=None):
+        obj = self.get_object(request, object_id)
+        if obj is None:
+            return self._get_obj_does_not_exist_redirect(request, self.model._meta, object_id)
+        return self._purge(request, [obj])
+
+    def purge_selected(self, request, queryset):
+        return self._purge(request, list(queryset))
+
+    purge_selected.short_description = "Purge selected %(verbose_name_plural)s and everything under them"
+
+    def _purge(self, request, objs):
+        if not self.has_delete_permission(request):
+            raise PermissionDenied
+        plans = [PurgePlan(obj) for obj in objs]
+
+        if request.POST.get("post") == "yes":
+            for plan in plans:
+                try:
+                    deleted = plan.execute()
+                except PurgeBlocked as exc:
+                    self.message_user(request, f"{plan.root}: {exc}", level=messages.ERROR)
+                    continue
+                self.message_user(request, f"Purged {plan.root}: {sum(deleted.values())} rows.")
+            info = self.model._meta.app_label, self.model._meta.model_name
+            return HttpResponseRedirect(reverse("admin:%s_%s_changelist" % info))
+
+        context = {
+            **self.admin_site.each_context(request),
+            "opts": self.model._meta,
+            "title": "Purge tenant data",
+            "summaries": [
+                {
+                    "root": plan.root,
+                    "counts": [
+                        (model._meta.verbose_name_plural, deleted, unlinked)
+                        for model, deleted, unlinked in plan.counts()
+                        if deleted or unlinked
+                    ],
+                    "blockers": [
+                        (model._meta.verbose_name_plural, count)
+                        for model, count in plan.blockers()
+                    ],
+                }
+                for plan in plans
+            ],
+            "action_checkbox_name": ACTION_CHECKBOX_NAME,
+        }
+        return TemplateResponse(request, "admin/core/purge.html", context)
 
 
 # ---------- Admin classes ----------
 
 @admin.register(Partner)
-class PartnerAdmin(admin.ModelAdmin):
+class PartnerAdmin(TenantPurgeMixin, admin.ModelAdmin):
     list_display = ("name", "code", "contact_person", "contact_email", "active", "created_at")
     list_filter = ("active", "created_at")
     search_fields = ("name", "code", "contact_person", "contact_email")
@@ -54,7 +289,7 @@ class PartnerAdmin(admin.ModelAdmin):
 
 
 @admin.register(Client)
-class ClientAdmin(admin.ModelAdmin):
+class ClientAdmin(TenantPurgeMixin, admin.ModelAdmin):
     list_display = ("name", "partner", "code", "contact_person", "contact_email", "active", "created_at")
     list_filter = ("partner", "active", "created_at")
     search_fields = ("name", "code", "partner__name")
@@ -71,6 +306,49 @@ class ProjectAdmin(admin.ModelAdmin):
     ordering = ("client", "name")
     readonly_fields = ("created_at",)
     inlines = [EnvironmentInline]
+    actions = ["clone_selected"]
+
+    def clone_selected(self, request, queryset):
+        if queryset.count() != 1:
+            self.message_user(request, "Select exactly one project to clone.", level=messages.WARNING)
+            return None
+        source = queryset.select_related("client").get()
+
+        if "apply" in request.POST:
+            form = CloneProjectForm(request.POST)
+            if form.is_valid():
+                project, counts = clone_project(
+                    source,
+                    form.cleaned_data["client"],
+                    form.cleaned_data["name"],
+                    form.cleaned_data["code"],
+                    with_issues=form.cleaned_data["with_issues"],
+                )
+                self.message_user(
+                    request,
+                    f"Cloned into “{project}”: {counts['environments']} environments, "
+                    f"{counts['servers']} servers, {counts['resources']} resources, "
+                    f"{counts['issues']} issues.",
+                )
+                return None
+        else:
+            form = CloneProjectForm(initial={
+                "client": source.client_id,
+                "name": f"{source.name} (copy)",
+                "code": f"{source.code}-copy",
+            })
+
+        context = {
+            **self.admin_site.each_context(request),
+            "opts": self.model._meta,
+            "title": f"Clone {source}",
+            "source": source,
+            "form": form,
+            "action_checkbox_name": ACTION_CHECKBOX_NAME,
+        }
+        return TemplateResponse(request, "admin/core/project/clone.html", context)
+
+    clone_selected.short_description = "Clone selected project (environments, servers, resources)"
 
 
 @admin.register(Environment)
@@ -84,17 +362,33 @@ class EnvironmentAdmin(admin.ModelAdmin):
 
 
 @admin.register(Server)
-class ServerAdmin(admin.ModelAdmin):
-    list_display = ("name", "environment", "provider", "region", "ip_address", "ssh_user", "ssh_port", "is_active", "created_at")
-    list_filter = ("provider", "is_active", "environment__env_type", "environment__project__client")
+class ServerAdmin(BlastRadiusMixin, admin.ModelAdmin):
+    impact_kind = "server"
+    list_display = ("name", "environment", "provider", "region", "ip_address", "ssh_user", "ssh_port", "reachability_display", "is_active", "impact_link", "created_at")
+    list_filter = ("provider", "is_active", ReachabilityFilter, "environment__env_type", "environment__project__client")
     search_fields = ("name", "ip_address", "environment__name", "environment__project__name")
     ordering = ("environment", "name")
     readonly_fields = ("created_at",)
 
+    def get_queryset(self, request):
+        return with_last_probe(super().get_queryset(request))
+
+    def reachability_display(self, obj):
+        if obj.last_probe_up is None:
+            return "-"
+        when = timezone.localtime(obj.last_probe_at).strftime("%Y-%m-%d %H:%M")
+        if obj.last_probe_up:
+            return f"Up ({obj.last_probe_ms} ms, {when})"
+        return f"Down ({when})"
+
+    reachability_display.short_description = "Reachability"
+    reachability_display.admin_order_field = "last_probe_up"
+
 
 @admin.register(Resource)
-class ResourceAdmin(admin.ModelAdmin):
-    list_display = ("name", "environment", "resource_type", "provider", "identifier", "is_critical", "is_active", "created_at")
+class ResourceAdmin(BlastRadiusMixin, admin.ModelAdmin):
+    impact_kind = "resource"
+    list_display = ("name", "environment", "resource_type", "provider", "identifier", "is_critical", "is_active", "impact_link", "created_at")
     list_filter = ("resource_type", "provider", "is_critical", "is_active")
     search_fields = ("name", "identifier", "environment__name", "environment__project__name")
     ordering = ("environment", "resource_type", "name")
@@ -115,12 +409,13 @@ class IssueAdmin(admin.ModelAdmin):
         "status", "priority",
         "activity_date", "due_date",
         "estimate_hours", "actual_hours",
-        "delay_display",
+        "delay_display", "sla_display",
         "assigned_to", "project_manager",
         "created_at",
     )
     list_filter = (
         "status", "priority",
+        SLAFilter,
         "project__client__partner",
         "project__client",
         "project",
@@ -137,22 +432,397 @@ class IssueAdmin(admin.ModelAdmin):
         "resource__name",
     )
     date_hierarchy = "activity_date"
-    readonly_fields = ("created_at", "updated_at")
+    readonly_fields = ("created_at", "updated_at", "occurrence_key", "estimate_hint", "similar_issues_display", "audit_history")
     inlines = [InfraActivityInline]
     autocomplete_fields = ("project", "environment", "resource", "assigned_to", "assigned_by", "project_manager")
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related("sla")
+
+    actions = ["reassign_selected", "set_status_selected", "shift_due_selected", "close_selected"]
+
+    def _triage(self, request, queryset, action, title, form_class, run):
+        """
+        Intermediate form for a bulk action; on submit ``run(ids, data)``
+        applies it set-based (core.triage) and returns the count.
+        """
+        if "apply" in request.POST:
+            form = form_class(request.POST)
+            if form.is_valid():
+                changed = run(queryset.values_list("pk", flat=True), form.cleaned_data)
+                self.message_user(request, f"{title}: {changed} issue(s) updated.")
+                return None
+        else:
+            form = form_class()
+
+        context = {
+            **self.admin_site.each_context(request),
+            "opts": self.model._meta,
+            "title": title,
+            "action": action,
+            "form": form,
+            "count": queryset.count(),
+            "selected": request.POST.getlist(ACTION_CHECKBOX_NAME),
+            "select_across": request.POST.get("select_across", "0"),
+            "action_checkbox_name": ACTION_CHECKBOX_NAME,
+        }
+        return TemplateResponse(request, "admin/core/issue/triage.html", context)
+
+    def reassign_selected(self, request, queryset):
+        return self._triage(
+            request, queryset, "reassign_selected", "Reassign issues", ReassignIssuesForm,
+            lambda ids, data: triage.reassign(ids, data["assigned_to"], assigned_by=request.user),
+        )
+
+    reassign_selected.short_description = "Reassign selected issues"
+
+    def set_status_selected(self, request, queryset):
+        return self._triage(
+            request, queryset, "set_status_selected", "Change status / priority", IssueStatusForm,
+            lambda ids, data: triage.set_status_priority(ids, data["status"], data["priority"]),
+        )
+
+    set_status_selected.short_description = "Change status / priority of selected issues"
+
+    def shift_due_selected(self, request, queryset):
+        return self._triage(
+            request, queryset, "shift_due_selected", "Shift due dates", ShiftDueDatesForm,
+            lambda ids, data: triage.shift_due_dates(ids, data["days"]),
+        )
+
+    shift_due_selected.short_description = "Shift due dates of selected issues"
+
+    def close_selected(self, request, queryset):
+        return self._triage(
+            request, queryset, "close_selected", "Close issues", CloseIssuesForm,
+            lambda ids, data: triage.close(
+                ids, data["status"], data["activity_date"], data["note"], data["hours_spent"],
+                performed_by=request.user,
+            ),
+        )
+
+    close_selected.short_description = "Close selected issues with a final activity"
+
+    def save_model(self, request, obj, form, change):
+        # New issue without an estimate: start from the activity type's median.
+        if not change and not obj.estimate_hours and obj.activity_type:
+            typical = suggest_estimate(obj.activity_type)["typical"]
+            if typical is not None:
+                obj.estimate_hours = round(typical.hours_p50, 2)
+                self.message_user(
+                    request,
+                    f"Estimate set to {obj.estimate_hours}h, the median for "
+                    f"'{obj.activity_type}' ({typical.sample_size} finished issues).",
+                )
+        super().save_model(request, obj, form, change)
+
+    def save_formset(self, request, form, formset, change):
+        # New activities default to whoever logs them.
+        if formset.model is InfraActivity:
+            for activity_form in formset.forms:
+                activity = activity_form.instance
+                if activity.pk is None and activity.performed_by_id is None:
+                    activity.performed_by = request.user
+        super().save_formset(request, form, formset, change)
+
+    def get_urls(self):
+        return [
+            path(
+                "calendar/",
+                self.admin_site.admin_view(self.calendar_view),
+                name="core_issue_calendar",
+            ),
+        ] + super().get_urls()
+
+    def calendar_view(self, request):
+        """
+        Month grid of issues for a client or assignee (core.calendar_index).
+        """
+        today = date.today()
+        try:
+            year, month = (int(p) for p in request.GET.get("month", "").split("-"))
+            start, end = month_range(year, month)
+        except ValueError:
+            start, end = month_range(today.year, today.month)
+
+        scope = {}
+        client_id = request.GET.get("client", "")
+        assignee_id = request.GET.get("assignee", "")
+        if client_id.isdigit():
+            scope["client_id"] = int(client_id)
+        if assignee_id.isdigit():
+            scope["assignee_id"] = int(assignee_id)
+        rows = issues_between(start, end, **scope) if scope else []
+
+        weeks = []
+        for key in range(week_key(start), week_key(end) + 1):
+            days = []
+            for offset in range(7):
+                day = week_start(key) + timedelta(days=offset)
+                days.append({
+                    "date": day,
+                    "in_month": start <= day <= end,
+                    "issues": [row for row in rows if row[4] <= day <= row[5]],
+                })
+            weeks.append(days)
+
+        context = {
+            **self.admin_site.each_context(request),
+            "opts": self.model._meta,
+            "title": f"Issue calendar – {start:%B %Y}",
+            "weeks": weeks,
+            "has_scope": bool(scope),
+            "issue_count": len(rows),
+            "clients": Client.objects.order_by("name").values_list("id", "name"),
+            "assignees": User.objects.filter(is_active=True).order_by("username").values_list("id", "username"),
+            "client_id": scope.get("client_id"),
+            "assignee_id": scope.get("assignee_id"),
+            "month": f"{start:%Y-%m}",
+            "prev_month": f"{start - timedelta(days=1):%Y-%m}",
+            "next_month": f"{end + timedelta(days=1):%Y-%m}",
+        }
+        return TemplateResponse(request, "admin/core/issue_calendar.html", context)
+
     def delay_display(self, obj):
         return obj.delay_days
 
     delay_display.short_description = "Delay (days)"
 
+    def sla_display(self, obj):
+        sla = getattr(obj, "sla", None)
+        if sla is None:
+            return "-"
+        hours = int(sla.time_to_breach.total_seconds() // 3600)
+        if hours < 0:
+            return f"Breached {-hours}h ago"
+        return f"{hours}h left"
+
+    sla_display.short_description = "SLA"
+    sla_display.admin_order_field = "sla__deadline"
+
+    def audit_history(self, obj):
+        if obj.pk is None:
+            return "-"
+        rows = object_timeline(Issue, obj.pk, limit=50)
+        if not rows:
+            return "No recorded changes."
+        return format_html(
+            "<table><tr><th>When</th><th>Change</th><th>From</th><th>To</th></tr>{}</table>",
+            format_html_join(
+                "",
+                "<tr><td>{}</td><td>{}</td><td>{}</td><td>{}</td></tr>",
+                (
+                    (
+                        timezone.localtime(r["ts"]).strftime("%Y-%m-%d %H:%M"),
+                        r["field"] or AuditEntry(action=r["action"]).get_action_display(),
+                        r["old_value"],
+                        r["new_value"],
+                    )
+                    for r in rows
+                ),
+            ),
+        )
+
+    audit_history.short_description = "History"
+
+    def estimate_hint(self, obj):
+        if obj.pk is None:
+            return "-"
+        hint = suggest_estimate(
+            obj.activity_type,
+            client_id=obj.project.client_id,
+            assignee_id=obj.assigned_to_id,
+            estimate=obj.estimate_hours,
+        )
+        parts = []
+        typical = hint["typical"]
+        if typical is not None:
+            parts.append(
+                f"'{obj.activity_type}' usually takes {typical.hours_p50:.1f}h "
+                f"(80% within {typical.hours_p80:.1f}h, {typical.sample_size} issues)"
+            )
+        if hint["adjusted"] is not None:
+            basis = hint["basis"]
+            parts.append(
+                f"{basis.get_dimension_display().lower()} actuals run "
+                f"{basis.ratio_p50:.2f}x estimates: about {hint['adjusted']}h"
+            )
+        return "; ".join(parts) or "Not enough history yet."
+
+    estimate_hint.short_description = "Estimate hint"
+
+    def similar_issues_display(self, obj):
+        if obj.pk is None:
+            return "-"
+        matches = similar_issues(obj)
+        if not matches:
+            return "None found."
+        return format_html_join(
+            format_html("<br>"),
+            '<a href="{}">{}</a> &middot; {} &middot; {} ({}% similar)',
+            (
+                (
+                    reverse("admin:core_issue_change", args=[issue.pk]),
+                    issue.title,
+                    issue.project.client.name,
+                    issue.get_status_display(),
+                    int(score * 100),
+                )
+                for score, issue in matches
+            ),
+        )
+
+    similar_issues_display.short_description = "Similar issues"
+
 
 @admin.register(InfraActivity)
 class InfraActivityAdmin(admin.ModelAdmin):
     list_display = (
         "issue", "activity_date", "status",
-        "hours_spent", "created_at",
+        "hours_spent", "performed_by", "created_at",
     )
-    list_filter = ("activity_date", "status", "issue__project")
+    list_filter = ("activity_date", "status", "issue__project", "performed_by")
     search_fields = ("issue__title", "note")
     readonly_fields = ("created_at",)
+    autocomplete_fields = ("performed_by",)
+
+    def save_model(self, request, obj, form, change):
+        if not change and obj.performed_by_id is None:
+            obj.performed_by = request.user
+        super().save_model(request, obj, form, change)
+
+
+@admin.register(IssueSLA)
+class IssueSLAAdmin(admin.ModelAdmin):
+    list_display = ("issue", "state", "deadline", "checked_at")
+    list_filter = ("state",)
+    search_fields = ("issue__title",)
+    ordering = ("deadline",)
+    list_select_related = ("issue__project__client__partner",)
+    readonly_fields = ("issue", "deadline", "state", "checked_at")
+
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(ServerProbe)
+class ServerProbeAdmin(admin.ModelAdmin):
+    list_display = ("server", "checked_at", "is_up", "latency_ms", "error")
+    list_filter = ("is_up", "checked_at")
+    search_fields = ("server__name", "server__ip_address")
+    date_hierarchy = "checked_at"
+    list_select_related = ("server",)
+    readonly_fields = ("server", "checked_at", "is_up", "latency_ms", "error")
+
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(AuditEntry)
+class AuditEntryAdmin(admin.ModelAdmin):
+    list_display = ("ts", "model_display", "object_id", "action", "field_display", "old_value", "new_value", "user_id", "partner_id")
+    list_filter = ("model_code", "action")
+    date_hierarchy = "ts"
+    ordering = ("-ts",)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+    def model_display(self, obj):
+        return MODEL_BY_CODE[obj.model_code]._meta.verbose_name
+
+    model_display.short_description = "Model"
+
+    def field_display(self, obj):
+        return FIELD_NAMES[obj.model_code].get(obj.field_code, "")
+
+    field_display.short_description = "Field"
+
+
+@admin.register(SavedSearch)
+class SavedSearchAdmin(admin.ModelAdmin):
+    list_display = ("name", "user", "kind", "query", "created_at")
+    list_filter = ("kind",)
+    search_fields = ("name", "query", "user__username")
+    list_select_related = ("user",)
+
+
+@admin.register(EstimateStat)
+class EstimateStatAdmin(admin.ModelAdmin):
+    list_display = ("dimension", "key", "sample_size", "ratio_p50", "ratio_p80", "ratio_p90", "hours_p50", "overrun_share", "computed_at")
+    list_filter = ("dimension",)
+    search_fields = ("key",)
+    ordering = ("dimension", "-sample_size")
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(TimesheetMonth)
+class TimesheetMonthAdmin(admin.ModelAdmin):
+    """
+    Frozen timesheet months (core.timesheet); refresh one with
+    ``manage.py freeze_timesheets --month YYYY-MM --refresh``.
+    """
+    list_display = ("month", "hours", "entries", "frozen_at")
+    ordering = ("-month",)
+    readonly_fields = ("month", "hours", "entries", "frozen_at")
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(ProfileTrigger)
+class ProfileTriggerAdmin(admin.ModelAdmin):
+    """
+    Switches for the request profiler (core.profiling); every worker
+    re-reads them from the database each PROFILER_REFRESH_SECONDS.
+    """
+    list_display = ("__str__", "user", "path_pattern", "sample_rate", "active", "expires_at", "created_by", "created_at")
+    list_filter = ("active",)
+    list_editable = ("active",)
+    search_fields = ("path_pattern", "note", "user__username")
+    list_select_related = ("user", "created_by")
+    autocomplete_fields = ("user",)
+    fields = ("user", "path_pattern", "sample_rate", "active", "expires_at", "note")
+
+    def save_model(self, request, obj, form, change):
+        if not change:
+            obj.created_by = request.user
+        super().save_model(request, obj, form, change)
+
+
+@admin.register(RecurrenceRule)
+class RecurrenceRuleAdmin(admin.ModelAdmin):
+    """
+    Recurring maintenance; ``manage.py schedule_recurring`` (or the
+    action below) creates the issues.
+    """
+    list_display = ("title", "project", "environment", "resource", "frequency", "interval", "start_date", "end_date", "assigned_to", "active")
+    list_filter = ("active", "frequency", "project__client")
+    search_fields = ("title", "project__name", "environment__name", "resource__name")
+    list_select_related = ("project", "environment", "resource", "assigned_to")
+    autocomplete_fields = ("project", "environment", "resource", "assigned_to", "project_manager")
+    actions = ["schedule_selected"]
+
+    def schedule_selected(self, request, queryset):
+        counts = schedule_recurring(rule_ids=list(queryset.values_list("pk", flat=True)))
+        self.message_user(
+            request,
+            f"Created {counts['created']} issue(s) for the next {DEFAULT_HORIZON_DAYS} days "
+            f"({counts['existing']} already existed).",
+        )
+
+    schedule_selected.short_description = f"Create issues for the next {DEFAULT_HORIZON_DAYS} days"
@@ -0,0 +1,165 @@
+"""
+Estimate-vs-actual analytics.
+
+``compute_stats`` reads finished issues in primary-key batches of plain
+``values_list`` columns, turns them into NumPy arrays and computes, per
+activity type / client / assignee, the distribution of
+``actual_hours / estimate_hours`` with one sort per dimension. Results
+land in ``EstimateStat`` so pages only read a handful of small rows;
+schedule ``manage.py compute_estimate_stats`` (e.g. nightly) to refresh.
+"""
+import numpy as np
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Issue, EstimateStat
+
+
+MIN_SAMPLES = 5
+PERCENTILES = (0.5, 0.8, 0.9)
+COLUMNS = ("pk", "activity_type", "project__client_id", "assigned_to_id", "estimate_hours", "actual_hours")
+
+
+def _load(batch_size):
+    """
+    Column arrays of every finished issue with both an estimate and
+    actual hours.
+    """
+    base = (
+        Issue.objects
+        .filter(status="done", estimate_hours__gt=0, actual_hours__gt=0)
+        .order_by("pk")
+    )
+    types, clients, assignees, estimates, actuals = [], [], [], [], []
+    last_pk = 0
+    while True:
+        rows = list(base.filter(pk__gt=last_pk).values_list(*COLUMNS)[:batch_size])
+        if not rows:
+            break
+        _, batch_types, batch_clients, batch_assignees, batch_estimates, batch_actuals = zip(*rows)
+        types.append(np.array([(t or "").strip().lower() for t in batch_types], dtype=object))
+        clients.append(np.array(batch_clients, dtype=np.int64))
+        assignees.append(np.array([a or 0 for a in batch_assignees], dtype=np.int64))
+        estimates.append(np.array(batch_estimates, dtype=np.float64))
+        actuals.append(np.array(batch_actuals, dtype=np.float64))
+        last_pk = rows[-1][0]
+    if not estimates:
+        return None
+    return {
+        "activity_type": np.concatenate(types),
+        "client": np.concatenate(clients),
+        "assignee": np.concatenate(assignees),
+        "estimate": np.concatenate(estimates),
+        "actual": np.concatenate(actuals),
+    }
+
+
+def _grouped_percentiles(sorted_values, starts, counts, q):
+    """
+    Linear-interpolated ``q`` percentile of each group of an array sorted
+    by (group, value), without a Python loop over groups.
+    """
+    position = starts + (counts - 1) * q
+    low = np.floor(position).astype(np.int64)
+    high = np.ceil(position).astype(np.int64)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (position - low)
+
+
+def _group_stats(keys, ratio, actual):
+    """
+    ``[(key, stats_dict)]`` for every key with at least MIN_SAMPLES rows.
+    """
+    group_keys, inverse = np.unique(keys, return_inverse=True)
+    counts = np.bincount(inverse, minlength=len(group_keys))
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+
+    ratio_sorted = ratio[np.lexsort((ratio, inverse))]
+    hours_sorted = actual[np.lexsort((actual, inverse))]
+    ratio_mean = np.bincount(inverse, weights=ratio) / counts
+    overrun = np.bincount(inverse, weights=(ratio > 1.0).astype(np.float64)) / counts
+    ratio_pct = [_grouped_percentiles(ratio_sorted, starts, counts, q) for q in PERCENTILES]
+    hours_pct = [_grouped_percentiles(hours_sorted, starts, counts, q) for q in PERCENTILES[:2]]
+
+    result = []
+    for index in np.flatnonzero(counts >= MIN_SAMPLES):
+        result.append((group_keys[index], {
+            "sample_size": int(counts[index]),
+            "ratio_mean": float(ratio_mean[index]),
+            "ratio_p50": float(ratio_pct[0][index]),
+            "ratio_p80": float(ratio_pct[1][index]),
+            "ratio_p90": float(ratio_pct[2][index]),
+            "hours_p50": float(hours_pct[0][index]),
+            "hours_p80": float(hours_pct[1][index]),
+            "overrun_share": float(overrun[index]),
+        }))
+    return result
+
+
+def compute_stats(batch_size=20000):
+    """
+    Recompute every ``EstimateStat`` row; returns the number written.
+    """
+    columns = _load(batch_size)
+    now = timezone.now()
+    stats = []
+    if columns is not None:
+        ratio = columns["actual"] / columns["estimate"]
+        actual = columns["actual"]
+        dimensions = {
+            "all": np.zeros(len(ratio), dtype=np.int64),
+            "activity_type": columns["activity_type"],
+            "client": columns["client"],
+            "assignee": columns["assignee"],
+        }
+        for dimension, keys in dimensions.items():
+            mask = np.ones(len(ratio), dtype=bool)
+            if dimension == "activity_type":
+                mask = keys != ""
+            elif dimension == "assignee":
+                mask = keys != 0
+            for key, values in _group_stats(keys[mask], ratio[mask], actual[mask]):
+                stats.append(EstimateStat(
+                    dimension=dimension,
+                    key="" if dimension == "all" else str(key),
+                    computed_at=now,
+                    **values,
+                ))
+
+    with transaction.atomic():
+        EstimateStat.objects.all().delete()
+        EstimateStat.objects.bulk_create(stats, batch_size=500)
+    return len(stats)
+
+
+def suggest(activity_type, client_id=None, assignee_id=None, estimate=None):
+    """
+    Estimate hints for an issue from the stored stats (one query):
+
+    ``typical`` holds the activity type's median / p80 actual hours, and
+    ``adjusted`` the given estimate scaled by the median overrun of the
+    most specific of assignee, client or all issues. Either may be None.
+    """
+    wanted = {("all", "")}
+    if activity_type and activity_type.strip():
+        wanted.add(("activity_type", activity_type.strip().lower()))
+    if client_id:
+        wanted.add(("client", str(client_id)))
+    if assignee_id:
+        wanted.add(("assignee", str(assignee_id)))
+
+    match = Q()
+    for dimension, key in wanted:
+        match |= Q(dimension=dimension, key=key)
+    found = {(s.dimension, s.key): s for s in EstimateStat.objects.filter(match)}
+
+    typical = next((s for (d, _), s in found.items() if d == "activity_type"), None)
+
+    adjusted, basis = None, None
+    if estimate:
+        for dimension in ("assignee", "client", "all"):
+            basis = next((s for (d, _), s in found.items() if d == dimension), None)
+            if basis is not None:
+                adjusted = round(float(estimate) * basis.ratio_p50, 2)
+                break
+    return {"typical": typical, "adjusted": adjusted, "basis": basis}
@@ -0,0 +1,403 @@
+"""
+Read-only JSON API over the core hierarchy.
+
+    GET /api/<resource>/                 list (keyset paginated)
+    GET /api/<resource>/<id>/            single object
+
+Query parameters:
+    fields=title,status      only these columns are SELECTed
+    include=project,activities
+                             related rows, loaded with one query per relation
+    after=<cursor>           continue from the ``next`` link of a previous page
+    limit=50                 page size (max 500)
+    <filter>=<value>         e.g. partner=1, project=4, status=open
+
+Responses carry an ETag (and Last-Modified for issues without includes)
+so polling clients can send If-None-Match / If-Modified-Since and get a
+bodiless 304 without the rows being read.
+"""
+import base64
+import functools
+import hashlib
+import json
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Count, Max
+from django.http import HttpResponse, JsonResponse
+from django.utils.cache import get_conditional_response
+from django.utils.crypto import constant_time_compare
+from django.utils.http import http_date
+
+from . import search
+from .db.routers import replica_safe
+from .models import (
+    Partner, Client, Project,
+    Environment, Server, Resource,
+    Issue, InfraActivity,
+)
+
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+
+
+class ApiResource:
+    """
+    How one model is exposed: its public fields, filters and includes.
+
+    ``includes`` maps an include name to ``(resource, local, remote)``:
+    rows of ``resource`` whose ``remote`` column matches our ``local``
+    column, e.g. ``("projects", "project_id", "id")`` (forward) or
+    ``("activities", "id", "issue_id")`` (reverse).
+    """
+
+    def __init__(self, model, filters=None, includes=None):
+        self.model = model
+        self.filters = filters or {}
+        self.includes = includes or {}
+        # public name -> column; FKs are exposed by name with their id value
+        self.columns = {
+            field.name: field.attname
+            for field in model._meta.concrete_fields
+            if field.name not in ("password", "connection_info")
+        }
+        self.timestamp = "updated_at" if "updated_at" in self.columns else None
+
+    def queryset(self):
+        return self.model._default_manager.order_by("pk")
+
+
+def _tenant_filters(prefix):
+    return {
+        "partner": f"{prefix}client__partner_id",
+        "client": f"{prefix}client_id",
+    }
+
+
+RESOURCES = {
+    "partners": ApiResource(
+        Partner,
+        filters={"active": "active"},
+    ),
+    "clients": ApiResource(
+        Client,
+        filters={"partner": "partner_id", "active": "active"},
+        includes={
+            "partner": ("partners", "partner_id", "id"),
+            "projects": ("projects", "id", "client_id"),
+        },
+    ),
+    "projects": ApiResource(
+        Project,
+        filters={**_tenant_filters(""), "is_active": "is_active"},
+        includes={
+            "client": ("clients", "client_id", "id"),
+            "environments": ("environments", "id", "project_id"),
+        },
+    ),
+    "environments": ApiResource(
+        Environment,
+        filters={
+            **_tenant_filters("project__"),
+            "project": "project_id",
+            "env_type": "env_type",
+        },
+        includes={
+            "project": ("projects", "project_id", "id"),
+            "servers": ("servers", "id", "environment_id"),
+            "resources": ("resources", "id", "environment_id"),
+        },
+    ),
+    "servers": ApiResource(
+        Server,
+        filters={
+            **_tenant_filters("environment__project__"),
+            "project": "environment__project_id",
+            "environment": "environment_id",
+            "provider": "provider",
+        },
+        includes={"environment": ("environments", "environment_id", "id")},
+    ),
+    "resources": ApiResource(
+        Resource,
+        filters={
+            **_tenant_filters("environment__project__"),
+            "project": "environment__project_id",
+            "environment": "environment_id",
+            "resource_type": "resource_type",
+            "is_critical": "is_critical",
+        },
+        includes={"environment": ("environments", "environment_id", "id")},
+    ),
+    "issues": ApiResource(
+        Issue,
+        filters={
+            **_tenant_filters("project__"),
+            "project": "project_id",
+            "environment": "environment_id",
+            "resource": "resource_id",
+            "status": "status",
+            "priority": "priority",
+            "assigned_to": "assigned_to_id",
+        },
+        includes={
+            "project": ("projects", "project_id", "id"),
+            "environment": ("environments", "environment_id", "id"),
+            "resource": ("resources", "resource_id", "id"),
+            "activities": ("activities", "id", "issue_id"),
+        },
+    ),
+    "activities": ApiResource(
+        InfraActivity,
+        filters={
+            **_tenant_filters("issue__project__"),
+            "project": "issue__project_id",
+            "issue": "issue_id",
+        },
+        includes={"issue": ("issues", "issue_id", "id")},
+    ),
+}
+
+
+class ApiError(Exception):
+    status = 400
+
+
+def api_error(message, status=400):
+    return JsonResponse({"error": message}, status=status)
+
+
+def token_user(request):
+    """
+    The user an ``Authorization: Bearer <token>`` header names through
+    ``settings.API_TOKENS``; None without a (known) token.
+    """
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    token = token.strip()
+    if scheme.lower() != "bearer" or not token:
+        return None
+    for known, username in settings.API_TOKENS.items():
+        if constant_time_compare(token, known):
+            return User.objects.filter(username=username, is_active=True).first()
+    return None
+
+
+def api_view(view_func):
+    """
+    Staff-only, GET-only, replica-safe, and ApiError -> JSON error.
+    """
+    @functools.wraps(view_func)
+    def _wrapped(request, resource, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return api_error("Authentication required.", status=401)
+        if not request.user.is_staff:
+            return api_error("Staff access required.", status=403)
+        if request.method not in ("GET", "HEAD"):
+            return api_error("Method not allowed.", status=405)
+        api_resource = RESOURCES.get(resource)
+        if api_resource is None:
+            return api_error(f"Unknown resource '{resource}'.", status=404)
+        try:
+            return view_func(request, api_resource, *args, **kwargs)
+        except ApiError as exc:
+            return api_error(str(exc), status=exc.status)
+
+    return replica_safe(_wrapped)
+
+
+# ---------- Query parameter parsing ----------
+
+def _csv_param(request, name):
+    raw = request.GET.get(name, "")
+    return [part.strip() for part in raw.split(",") if part.strip()]
+
+
+def _selected_columns(request, api_resource, includes):
+    fields = _csv_param(request, "fields")
+    if not fields:
+        return dict(api_resource.columns)
+    unknown = [f for f in fields if f not in api_resource.columns]
+    if unknown:
+        raise ApiError(f"Unknown field(s): {', '.join(unknown)}.")
+    # The id is always returned (it is the cursor), and so are the keys
+    # the requested includes are joined on.
+    wanted = {"id"} | set(fields) | {
+        _public_name(api_resource, api_resource.includes[name][1])
+        for name in includes
+    }
+    return {
+        name: column
+        for name, column in api_resource.columns.items()
+        if name in wanted
+    }
+
+
+def _public_name(api_resource, column):
+    return next(n for n, c in api_resource.columns.items() if c == column)
+
+
+def _selected_includes(request, api_resource):
+    names = _csv_param(request, "include")
+    unknown = [n for n in names if n not in api_resource.includes]
+    if unknown:
+        raise ApiError(f"Unknown include(s): {', '.join(unknown)}.")
+    return names
+
+
+def _apply_filters(request, api_resource, qs):
+    for param, lookup in api_resource.filters.items():
+        value = request.GET.get(param)
+        if value is None:
+            continue
+        if lookup.endswith("_id"):
+            if not value.isdigit():
+                raise ApiError(f"'{param}' must be an integer id.")
+            value = int(value)
+        elif lookup in ("active", "is_active", "is_critical"):
+            value = value.lower() in ("1", "true", "yes")
+        qs = qs.filter(**{lookup: value})
+    return qs
+
+
+def encode_cursor(pk):
+    return base64.urlsafe_b64encode(str(pk).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        return int(base64.urlsafe_b64decode(padded.encode()).decode())
+    except (ValueError, UnicodeDecodeError):
+        raise ApiError("Invalid cursor.")
+
+
+def _limit(request):
+    raw = request.GET.get("limit", str(DEFAULT_LIMIT))
+    if not raw.isdigit() or int(raw) < 1:
+        raise ApiError("'limit' must be a positive integer.")
+    return min(int(raw), MAX_LIMIT)
+
+
+# ---------- Serialization ----------
+
+def _rows(qs, columns):
+    """
+    ``values()`` rows renamed from column names to public field names.
+    """
+    renames = {column: name for name, column in columns.items()}
+    return [
+        {renames[column]: value for column, value in row.items()}
+        for row in qs.values(*columns.values())
+    ]
+
+
+def _load_includes(api_resource, rows, names):
+    included = {}
+    for name in names:
+        target_name, local, remote = api_resource.includes[name]
+        target = RESOURCES[target_name]
+        local_name = _public_name(api_resource, local)
+        keys = {row[local_name] for row in rows if row.get(local_name) is not None}
+        if not keys:
+            included[name] = []
+            continue
+        qs = target.queryset().filter(**{f"{remote}__in": keys})
+        included[name] = _rows(qs, target.columns)
+    return included
+
+
+def _json_response(request, payload, etag, last_modified=None):
+    body = json.dumps(payload, cls=DjangoJSONEncoder).encode()
+    response = HttpResponse(body, content_type="application/json")
+    response["ETag"] = etag
+    if last_modified is not None:
+        response["Last-Modified"] = http_date(last_modified)
+    response["Cache-Control"] = "private, no-cache"
+    return response
+
+
+def _change_marker(request, api_resource, qs, includes):
+    """
+    ``(etag, last_modified)`` from one aggregate over the filtered rows.
+
+    Rows with ``updated_at`` are marked by its maximum (also sent as
+    Last-Modified); the others (activities are only ever appended) by
+    ``Max(pk)`` and the count, plus the model's ``core.search``
+    generation, which moves on edits and deletes too. Included resources
+    add their generations, and then Last-Modified is left out.
+    """
+    models = [RESOURCES[api_resource.includes[name][0]].model for name in includes]
+    if api_resource.timestamp is None:
+        models.insert(0, api_resource.model)
+        marker = qs.order_by().aggregate(n=Count("pk"), last=Max("pk"))
+        last = None
+    else:
+        marker = qs.order_by().aggregate(n=Count("pk"), last=Max(api_resource.timestamp))
+        last = marker["last"]
+    digest = hashlib.md5(
+        f"{request.get_full_path()}|{marker['n']}|{marker['last']}|{search.stamp(models)}".encode(),
+        usedforsecurity=False,
+    ).hexdigest()
+    if last is None or includes:
+        return f'W/"{digest}"', None
+    return f'W/"{digest}"', int(last.timestamp())
+
+
+# ---------- Views ----------
+
+@api_view
+def api_list(request, api_resource):
+    includes = _selected_includes(request, api_resource)
+    columns = _selected_columns(request, api_resource, includes)
+    limit = _limit(request)
+
+    qs = _apply_filters(request, api_resource, api_resource.queryset())
+
+    etag, last_modified = _change_marker(request, api_resource, qs, includes)
+    not_modified = get_conditional_response(
+        request, etag=etag, last_modified=last_modified,
+    )
+    if not_modified is not None:
+        return not_modified
+
+    after = request.GET.get("after")
+    if after:
+        qs = qs.filter(pk__gt=decode_cursor(after))
+
+    rows = _rows(qs[:limit + 1], columns)
+    next_url = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        params = request.GET.copy()
+        params["after"] = encode_cursor(rows[-1]["id"])
+        next_url = f"{request.path}?{params.urlencode()}"
+
+    payload = {"data": rows, "next": next_url}
+    if includes:
+        payload["included"] = _load_includes(api_resource, rows, includes)
+    return _json_response(request, payload, etag, last_modified)
+
+
+@api_view
+def api_detail(request, api_resource, pk):
+    includes = _selected_includes(request, api_resource)
+    columns = _selected_columns(request, api_resource, includes)
+
+    qs = api_resource.queryset().filter(pk=pk)
+    etag, last_modified = _change_marker(request, api_resource, qs, includes)
+    not_modified = get_conditional_response(
+        request, etag=etag, last_modified=last_modified,
+    )
+    if not_modified is not None:
+        return not_modified
+
+    rows = _rows(qs, columns)
+    if not rows:
+        return api_error("Not found.", status=404)
+
+    payload = {"data": rows[0]}
+    if includes:
+        payload["included"] = _load_includes(api_resource, rows, includes)
+    return _json_response(request, payload, etag, last_modified)
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        # Signal receivers
+        from . import audit, calendar_index, changefeed, fragments, impact, profiling, search, similarity, sla  # noqa: F401
@@ -0,0 +1,306 @@
+"""
+Field-level audit history for Issue and InfraActivity.
+
+Tracked field values are snapshotted when an instance is loaded
+(``post_init``, no query) and diffed on ``post_save``. The resulting
+``AuditEntry`` rows are buffered per transaction and written with one
+``bulk_create`` on commit, so an admin save with a dozen inline rows
+costs one INSERT. Rolled back transactions leave no history.
+
+Model and field names are stored as the small integer codes below.
+Codes are part of the stored data: append new ones, never renumber.
+"""
+import contextvars
+import threading
+
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import Project, Issue, InfraActivity, AuditEntry
+
+
+AUDITED_MODELS = {
+    Issue: (1, {
+        "project": 1,
+        "environment": 2,
+        "resource": 3,
+        "title": 4,
+        "description": 5,
+        "status": 6,
+        "priority": 7,
+        "activity_type": 8,
+        "activity_date": 9,
+        "due_date": 10,
+        "estimate_hours": 11,
+        "actual_hours": 12,
+        "project_manager": 13,
+        "assigned_by": 14,
+        "assigned_to": 15,
+    }),
+    InfraActivity: (2, {
+        "issue": 1,
+        "activity_date": 2,
+        "status": 3,
+        "note": 4,
+        "hours_spent": 5,
+        "performed_by": 6,
+    }),
+}
+
+MODEL_BY_CODE = {code: model for model, (code, _) in AUDITED_MODELS.items()}
+FIELD_NAMES = {
+    code: {field_code: name for name, field_code in fields.items()}
+    for _, (code, fields) in AUDITED_MODELS.items()
+}
+
+_MISSING = object()
+_current_request = contextvars.ContextVar("audit_request", default=None)
+
+
+def set_current_request(request):
+    """
+    Remember the request whose user is credited with changes (middleware).
+    """
+    return _current_request.set(request)
+
+
+def reset_current_request(token):
+    _current_request.reset(token)
+
+
+def _current_user_id():
+    request = _current_request.get()
+    user = getattr(request, "user", None)
+    if user is not None and user.is_authenticated:
+        return user.pk
+    return None
+
+
+def _attnames(model):
+    _, fields = AUDITED_MODELS[model]
+    return {name: model._meta.get_field(name).attname for name in fields}
+
+
+def _format(value):
+    if value is None:
+        return ""
+    return str(value)[:255]
+
+
+def _label(instance):
+    # Not str(instance): Issue.__str__ walks project -> client -> partner.
+    if isinstance(instance, Issue):
+        return _format(instance.title)
+    return _format(f"{instance.activity_date} {instance.hours_spent}h")
+
+
+# ---------- Buffering ----------
+
+class _Buffer:
+    """
+    Entries of one transaction; written by ``flush`` on commit.
+    """
+
+    def __init__(self):
+        self.entries = []   # (AuditEntry, issue_id or None, project_id or None)
+        self.flushed = False
+
+    def flush(self):
+        self.flushed = True
+        entries, self.entries = self.entries, []
+        if entries:
+            write_entries(entries)
+
+
+_local = threading.local()
+
+
+def _buffer(using):
+    connection = connections[using]
+    if not connection.in_atomic_block:
+        return None
+    buffer = getattr(_local, "buffer", None)
+    # Reuse the buffer only while its flush is still queued on this
+    # transaction; after a commit or rollback start a new one. (Each
+    # ``buffer.flush`` is a new bound method: compare its owner.)
+    if buffer is not None and not buffer.flushed and any(
+        getattr(func, "__self__", None) is buffer for _, func, _ in connection.run_on_commit
+    ):
+        return buffer
+    buffer = _local.buffer = _Buffer()
+    transaction.on_commit(buffer.flush, using=using)
+    return buffer
+
+
+def write_entries(entries):
+    """
+    Resolve tenant ids for ``(entry, issue_id, project_id)`` tuples in
+    two queries at most, then insert everything at once.
+    """
+    issue_ids = {issue_id for _, issue_id, _ in entries if issue_id}
+    issue_projects = dict(
+        Issue.objects.filter(pk__in=issue_ids).values_list("pk", "project_id")
+    ) if issue_ids else {}
+    project_ids = {
+        project_id or issue_projects.get(issue_id)
+        for _, issue_id, project_id in entries
+    } - {None}
+    project_partners = dict(
+        Project.objects.filter(pk__in=project_ids).values_list("pk", "client__partner_id")
+    ) if project_ids else {}
+
+    rows = []
+    for entry, issue_id, project_id in entries:
+        project_id = project_id or issue_projects.get(issue_id)
+        entry.partner_id = project_partners.get(project_id)
+        rows.append(entry)
+    AuditEntry.objects.bulk_create(rows, batch_size=500)
+
+
+def record(entries, using=DEFAULT_DB_ALIAS):
+    """
+    Queue ``(entry, issue_id, project_id)`` tuples for the current
+    transaction, or write them right away in autocommit mode.
+    """
+    if not entries:
+        return
+    buffer = _buffer(using)
+    if buffer is None:
+        write_entries(entries)
+    else:
+        buffer.entries.extend(entries)
+
+
+def _entry(model, instance_pk, action, field_code=0, old="", new="", user_id=None, ts=None):
+    return AuditEntry(
+        ts=ts or timezone.now(),
+        model_code=AUDITED_MODELS[model][0],
+        object_id=instance_pk,
+        action=action,
+        field_code=field_code,
+        old_value=old,
+        new_value=new,
+        user_id=user_id,
+    )
+
+
+def _scope(model, values):
+    """
+    ``(issue_id, project_id)`` used to find the tenant of an object.
+    """
+    if model is Issue:
+        return None, values.get("project_id")
+    return values.get("issue_id"), None
+
+
+def record_bulk_update(model, changes, using=DEFAULT_DB_ALIAS):
+    """
+    Audit a ``queryset.update()``: ``changes`` is an iterable of
+    ``(pk, field_name, old_value, new_value, scope_values)`` where
+    ``scope_values`` holds ``project_id`` (issues) or ``issue_id``.
+    """
+    _, fields = AUDITED_MODELS[model]
+    now, user_id = timezone.now(), _current_user_id()
+    record([
+        (
+            _entry(model, pk, AuditEntry.ACTION_UPDATE, fields[name],
+                   _format(old), _format(new), user_id, now),
+            *_scope(model, scope),
+        )
+        for pk, name, old, new, scope in changes
+        if _format(old) != _format(new)
+    ], using=using)
+
+
+# ---------- Signal receivers ----------
+
+@receiver(post_init, sender=Issue, dispatch_uid="audit_issue_init")
+@receiver(post_init, sender=InfraActivity, dispatch_uid="audit_activity_init")
+def snapshot(sender, instance, **kwargs):
+    values = instance.__dict__
+    instance._audit_snapshot = {
+        attname: values.get(attname, _MISSING)
+        for attname in _attnames(sender).values()
+    }
+
+
+@receiver(post_save, sender=Issue, dispatch_uid="audit_issue_saved")
+@receiver(post_save, sender=InfraActivity, dispatch_uid="audit_activity_saved")
+def saved(sender, instance, created, raw=False, using=DEFAULT_DB_ALIAS, **kwargs):
+    if raw:
+        return
+    attnames = _attnames(sender)
+    _, fields = AUDITED_MODELS[sender]
+    scope = _scope(sender, instance.__dict__)
+    now, user_id = timezone.now(), _current_user_id()
+
+    if created:
+        entries = [(_entry(sender, instance.pk, AuditEntry.ACTION_CREATE,
+                           new=_label(instance), user_id=user_id, ts=now), *scope)]
+    else:
+        before = getattr(instance, "_audit_snapshot", {})
+        entries = []
+        for name, attname in attnames.items():
+            old = before.get(attname, _MISSING)
+            new = instance.__dict__.get(attname, _MISSING)
+            if old is _MISSING or new is _MISSING:
+                continue
+            old, new = _format(old), _format(new)
+            if old != new:
+                entries.append((_entry(sender, instance.pk, AuditEntry.ACTION_UPDATE,
+                                       fields[name], old, new, user_id, now), *scope))
+    record(entries, using=using)
+    snapshot(sender, instance)
+
+
+@receiver(post_delete, sender=Issue, dispatch_uid="audit_issue_deleted")
+@receiver(post_delete, sender=InfraActivity, dispatch_uid="audit_activity_deleted")
+def deleted(sender, instance, using=DEFAULT_DB_ALIAS, **kwargs):
+    record([(
+        _entry(sender, instance.pk, AuditEntry.ACTION_DELETE,
+               old=_label(instance), user_id=_current_user_id()),
+        *_scope(sender, instance.__dict__),
+    )], using=using)
+
+
+# ---------- Timelines ----------
+
+def _decoded(rows):
+    for row in rows:
+        row["model"] = MODEL_BY_CODE[row["model_code"]]._meta.model_name
+        row["field"] = FIELD_NAMES[row["model_code"]].get(row["field_code"], "")
+        yield row
+
+
+TIMELINE_FIELDS = (
+    "ts", "model_code", "object_id", "action", "field_code",
+    "old_value", "new_value", "user_id", "partner_id",
+)
+
+
+def object_timeline(model, pk, limit=200):
+    """
+    Newest-first history of one object (uses the object index).
+    """
+    rows = (
+        AuditEntry.objects
+        .filter(model_code=AUDITED_MODELS[model][0], object_id=pk)
+        .order_by("-ts", "-id")
+        .values(*TIMELINE_FIELDS)[:limit]
+    )
+    return list(_decoded(rows))
+
+
+def tenant_timeline(partner_id, since=None, until=None, limit=500):
+    """
+    Newest-first history of everything under one partner (tenant index).
+    """
+    qs = AuditEntry.objects.filter(partner_id=partner_id)
+    if since is not None:
+        qs = qs.filter(ts__gte=since)
+    if until is not None:
+        qs = qs.filter(ts__lt=until)
+    rows = qs.order_by("-ts", "-id").values(*TIMELINE_FIELDS)[:limit]
+    return list(_decoded(rows))
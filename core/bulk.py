@@ -0,0 +1,299 @@
+"""
+Bulk ingest of InfraActivity rows.
+
+A whole batch (JSON or CSV, hundreds of rows across many issues) is
+validated against one prefetched issue map, inserted with a single
+``bulk_create`` and rolled up into the issues with a single UPDATE, all
+inside one transaction. An issue only takes the batch's status when no
+activity already logged for it is dated later.
+"""
+import csv
+import io
+import json
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.db import connection, transaction
+from django.db.models import Case, DateField, DecimalField, F, Max, OuterRef, Q, Subquery, Value, When
+from django.db.models.lookups import GreaterThan
+from django.utils import timezone
+
+from . import audit
+from .models import Issue, InfraActivity
+from .signals import bulk_changed
+
+
+MAX_BULK_ROWS = 5000
+ACTIVITY_FIELDS = ("issue", "activity_date", "status", "note", "hours_spent", "performed_by")
+# Parsed by the model fields, which expect strings (CSV always gives them).
+TEXT_FIELDS = ("activity_date", "status", "note")
+
+
+class BulkIngestError(Exception):
+    """
+    The payload was rejected; ``errors`` maps row number -> messages.
+    """
+
+    def __init__(self, message, errors=None):
+        super().__init__(message)
+        self.errors = errors or {}
+
+
+def parse_activity_payload(body, content_type):
+    """
+    Rows (dicts) from a JSON list / ``{"activities": [...]}`` or a CSV
+    document with a header line.
+    """
+    text = body.decode("utf-8-sig")
+    if content_type.startswith("text/csv"):
+        return list(csv.DictReader(io.StringIO(text)))
+    try:
+        data = json.loads(text)
+    except ValueError as exc:
+        raise BulkIngestError(f"Invalid JSON: {exc}")
+    if isinstance(data, dict):
+        data = data.get("activities")
+    if not isinstance(data, list) or not all(isinstance(r, dict) for r in data):
+        raise BulkIngestError("Expected a list of activity objects.")
+    return data
+
+
+def _performer(value):
+    """
+    ``("pk", id)`` or ``("username", name)`` for a row's ``performed_by``
+    (digit strings are ids), or None when it is blank. ValueError for
+    anything that is neither a string nor an integer.
+    """
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = value.strip()
+        if not value:
+            return None
+        return ("pk", int(value)) if value.isdigit() else ("username", value)
+    if isinstance(value, int) and not isinstance(value, bool):
+        return ("pk", value)
+    raise ValueError(value)
+
+
+def _performers(rows):
+    """
+    ``{_performer key: user id}`` for the users the rows name, in one query.
+    """
+    keys = set()
+    for row in rows:
+        try:
+            keys.add(_performer(row.get("performed_by")))
+        except ValueError:
+            continue
+    keys.discard(None)
+    if not keys:
+        return {}
+    ids = [value for kind, value in keys if kind == "pk"]
+    names = [value for kind, value in keys if kind == "username"]
+    found = {}
+    users = (
+        User.objects
+        .filter(Q(pk__in=ids) | Q(username__in=names))
+        .values_list("pk", "username")
+    )
+    for pk, username in users:
+        found[("pk", pk)] = found[("username", username)] = pk
+    return found
+
+
+def _build_activities(rows, issues, users, performed_by=None):
+    activities, errors = [], {}
+    default_user_id = performed_by.pk if performed_by is not None else None
+    for number, row in enumerate(rows, start=1):
+        if None in row:
+            # csv.DictReader files extra cells under None.
+            errors[number] = ["More cells than header columns."]
+            continue
+        unknown = set(row) - set(ACTIVITY_FIELDS)
+        if unknown:
+            errors[number] = [f"Unknown field(s): {', '.join(sorted(map(str, unknown)))}."]
+            continue
+        wrong_type = [
+            f"{field}: Expected a string."
+            for field in TEXT_FIELDS
+            if row.get(field) is not None and not isinstance(row[field], str)
+        ]
+        if wrong_type:
+            errors[number] = wrong_type
+            continue
+        issue_id = str(row.get("issue") or "").strip()
+        if not issue_id.isdigit() or int(issue_id) not in issues:
+            errors[number] = [f"Unknown issue '{issue_id}'."]
+            continue
+        try:
+            performer = _performer(row.get("performed_by"))
+        except ValueError:
+            errors[number] = ["performed_by: Expected a username or user id."]
+            continue
+        if performer is not None and performer not in users:
+            errors[number] = [f"Unknown user '{performer[1]}'."]
+            continue
+        activity = InfraActivity(
+            issue=issues[int(issue_id)],
+            activity_date=row.get("activity_date") or None,
+            status=(row.get("status") or "").strip(),
+            note=row.get("note") or "",
+            hours_spent=row.get("hours_spent") or 0,
+            performed_by_id=users[performer] if performer else default_user_id,
+        )
+        try:
+            # FK already checked against the issue map; no per-row queries.
+            activity.full_clean(exclude=["issue", "performed_by"], validate_unique=False)
+        except ValidationError as exc:
+            errors[number] = [
+                f"{field}: {message}"
+                for field, messages in exc.message_dict.items()
+                for message in messages
+            ]
+            continue
+        activities.append(activity)
+    return activities, errors
+
+
+def bulk_insert(model, objs, batch_size=500):
+    """
+    ``bulk_create`` that returns the new primary keys, also on backends
+    that can't return them from the INSERT (MySQL). There each batch is
+    one multi-row INSERT, for which InnoDB allocates consecutive ids (in
+    steps of ``auto_increment_increment``) starting at LAST_INSERT_ID(),
+    so rows other sessions insert meanwhile are never picked up.
+    """
+    if connection.features.can_return_rows_from_bulk_insert:
+        model.objects.bulk_create(objs, batch_size=batch_size)
+        return [obj.pk for obj in objs]
+    pks = []
+    for start in range(0, len(objs), batch_size):
+        batch = objs[start:start + batch_size]
+        model.objects.bulk_create(batch)
+        first, step = _first_inserted_id()
+        pks.extend(range(first, first + step * len(batch), step))
+    for obj, pk in zip(objs, pks):
+        obj.pk = pk
+    return pks
+
+
+def _first_inserted_id():
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT LAST_INSERT_ID(), @@auto_increment_increment")
+        return cursor.fetchone()
+
+
+def _rollup(activities):
+    """
+    ``{issue_id: (hours_added, new_status_or_None, latest_date)}``; the
+    status comes from the latest activity when it is a valid Issue
+    status, ``latest_date`` is that activity's date.
+    """
+    valid_statuses = {key for key, _ in Issue.STATUS_CHOICES}
+    rollup = {}
+    for activity in sorted(activities, key=lambda a: a.activity_date):
+        hours, status, latest = rollup.get(activity.issue_id, (Decimal("0"), None, None))
+        if activity.status in valid_statuses:
+            status, latest = activity.status, activity.activity_date
+        rollup[activity.issue_id] = (hours + Decimal(activity.hours_spent), status, latest)
+    return rollup
+
+
+def _status_update(rollup):
+    """
+    ``Issue.status`` expression for the UPDATE: the batch's status, unless
+    the issue already has an activity dated after the one it came from.
+    """
+    statuses = {pk: (status, latest) for pk, (_, status, latest) in rollup.items() if status is not None}
+    if not statuses:
+        return None
+    newest_logged = Subquery(
+        InfraActivity.objects
+        .filter(issue_id=OuterRef("pk"))
+        .order_by()
+        .values("issue_id")
+        .annotate(newest=Max("activity_date"))
+        .values("newest")
+    )
+    status_date = Case(
+        *[When(pk=pk, then=Value(latest)) for pk, (_, latest) in statuses.items()],
+        output_field=DateField(),
+    )
+    return Case(
+        When(GreaterThan(newest_logged, status_date), then=F("status")),
+        *[When(pk=pk, then=Value(status)) for pk, (status, _) in statuses.items()],
+        default=F("status"),
+    )
+
+
+def ingest_activities(rows, performed_by=None):
+    """
+    Validate and store a batch; all rows or none. A row may name who did
+    the work in ``performed_by`` (a username or user id); rows that don't
+    are recorded as ``performed_by`` (the uploading user).
+
+    Returns ``{"created": n, "issues_updated": m}``.
+    """
+    if not rows:
+        raise BulkIngestError("No activities given.")
+    if len(rows) > MAX_BULK_ROWS:
+        raise BulkIngestError(f"At most {MAX_BULK_ROWS} activities per request.")
+
+    issue_ids = {
+        int(str(row.get("issue")).strip())
+        for row in rows
+        if str(row.get("issue") or "").strip().isdigit()
+    }
+
+    with transaction.atomic():
+        issues = (
+            Issue.objects
+            .only("id", "project_id", "status", "actual_hours")
+            .in_bulk(issue_ids)
+        )
+        activities, errors = _build_activities(rows, issues, _performers(rows), performed_by)
+        if errors:
+            raise BulkIngestError("Some activities are invalid.", errors)
+
+        activity_ids = bulk_insert(InfraActivity, activities)
+
+        rollup = _rollup(activities)
+        hours_field = Issue._meta.get_field("actual_hours")
+        decimal = DecimalField(
+            max_digits=hours_field.max_digits,
+            decimal_places=hours_field.decimal_places,
+        )
+        updates = {
+            "actual_hours": F("actual_hours") + Case(
+                *[When(pk=pk, then=Value(hours)) for pk, (hours, _, _) in rollup.items()],
+                default=Value(Decimal("0")),
+                output_field=decimal,
+            ),
+            "updated_at": timezone.now(),
+        }
+        status = _status_update(rollup)
+        if status is not None:
+            updates["status"] = status
+        Issue.objects.filter(pk__in=rollup).update(**updates)
+
+        # The UPDATE may have kept some statuses; audit what it stored.
+        statuses = dict(
+            Issue.objects.filter(pk__in=rollup).values_list("pk", "status")
+        ) if status is not None else {}
+        changes = []
+        for pk, (hours, _, _) in rollup.items():
+            issue, scope = issues[pk], {"project_id": issues[pk].project_id}
+            changes.append((pk, "actual_hours", issue.actual_hours,
+                            issue.actual_hours + hours, scope))
+            if statuses.get(pk, issue.status) != issue.status:
+                changes.append((pk, "status", issue.status, statuses[pk], scope))
+        audit.record_bulk_update(Issue, changes)
+
+        transaction.on_commit(lambda: (
+            bulk_changed.send(sender=InfraActivity, pks=activity_ids),
+            bulk_changed.send(sender=Issue, pks=list(rollup)),
+        ))
+
+    return {"created": len(activities), "issues_updated": len(rollup)}
@@ -0,0 +1,163 @@
+"""
+Interval index for the planning calendar.
+
+An issue occupies the days from ``activity_date`` to ``due_date`` (or
+just ``activity_date``). "Overlaps next week" is an OR across two
+unindexable date comparisons, so each issue is also written as one
+``IssueWeekBucket`` row per week it covers, keyed by client and
+assignee. A month view is then one query: an index range scan over
+the month's weeks, joined back to the issues.
+
+Spans longer than ``MAX_WEEKS`` (usually a typo'd due date) get a single
+``OPEN_ENDED`` bucket instead, which every range query also reads and
+then trims exactly, so they are never dropped. Issues that predate the
+index are bucketed by migration 0014; ``manage.py rebuild_calendar_index``
+rebuilds everything.
+"""
+from datetime import date, timedelta
+
+from django.db.models import Q
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from .models import Project, Issue, IssueWeekBucket
+from .signals import bulk_changed
+from .tenancy import project_tenants
+
+
+# Longer spans get one OPEN_ENDED bucket (week 0 is 0001-01-01) rather
+# than thousands of rows.
+MAX_WEEKS = 104
+OPEN_ENDED = 0
+
+CALENDAR_FIELDS = ("id", "title", "status", "priority", "start", "end", "assignee", "project")
+
+
+def week_key(day):
+    return (day.toordinal() - 1) // 7
+
+
+def week_start(key):
+    return date.fromordinal(key * 7 + 1)
+
+
+def issue_span(activity_date, due_date):
+    if due_date is None:
+        return activity_date, activity_date
+    return min(activity_date, due_date), max(activity_date, due_date)
+
+
+def bucket_weeks(activity_date, due_date):
+    start, end = issue_span(activity_date, due_date)
+    first, last = week_key(start), week_key(end)
+    if last - first >= MAX_WEEKS:
+        return [OPEN_ENDED]
+    return list(range(first, last + 1))
+
+
+def buckets_for(pk, activity_date, due_date, client_id, assignee_id):
+    return [
+        IssueWeekBucket(issue_id=pk, week=week, client_id=client_id, assignee_id=assignee_id)
+        for week in bucket_weeks(activity_date, due_date)
+    ]
+
+
+def reindex_rows(rows):
+    """
+    Replace the buckets of ``(pk, project_id, activity_date, due_date,
+    assigned_to_id)`` rows: one DELETE and one INSERT per call (plus
+    one query for the projects' clients).
+    """
+    tenants = project_tenants(row[1] for row in rows)
+    buckets = []
+    for pk, project_id, activity_date, due_date, assignee_id in rows:
+        client_id, _ = tenants.get(project_id, (None, None))
+        buckets.extend(buckets_for(pk, activity_date, due_date, client_id, assignee_id))
+    IssueWeekBucket.objects.filter(issue_id__in=[row[0] for row in rows]).delete()
+    IssueWeekBucket.objects.bulk_create(buckets, batch_size=1000)
+    return len(buckets)
+
+
+ROW_FIELDS = ("pk", "project_id", "activity_date", "due_date", "assigned_to_id")
+
+
+def reindex_issues(issue_ids):
+    rows = list(Issue.objects.filter(pk__in=issue_ids).values_list(*ROW_FIELDS))
+    return reindex_rows(rows) if rows else 0
+
+
+def rebuild_all(batch_size=1000):
+    """
+    Rebuild every issue's buckets in pk batches; returns issues indexed.
+    """
+    base = Issue.objects.order_by("pk")
+    last_pk, indexed = 0, 0
+    while True:
+        rows = list(base.filter(pk__gt=last_pk).values_list(*ROW_FIELDS)[:batch_size])
+        if not rows:
+            return indexed
+        reindex_rows(rows)
+        last_pk = rows[-1][0]
+        indexed += len(rows)
+
+
+def issues_between(start, end, client_id=None, assignee_id=None, partner_id=None):
+    """
+    Issues overlapping ``[start, end]`` for a client, assignee or partner,
+    as compact rows in ``CALENDAR_FIELDS`` order. One query.
+    """
+    buckets = IssueWeekBucket.objects.filter(
+        Q(week__range=(week_key(start), week_key(end))) | Q(week=OPEN_ENDED),
+    )
+    if client_id is not None:
+        buckets = buckets.filter(client_id=client_id)
+    if assignee_id is not None:
+        buckets = buckets.filter(assignee_id=assignee_id)
+    if partner_id is not None:
+        buckets = buckets.filter(issue__project__client__partner_id=partner_id)
+
+    rows = (
+        Issue.objects
+        .filter(pk__in=buckets.values("issue_id"))
+        .order_by("activity_date", "pk")
+        .values_list("pk", "title", "status", "priority", "activity_date",
+                     "due_date", "assigned_to_id", "project_id")
+    )
+    result = []
+    for pk, title, status, priority, activity_date, due_date, assignee, project in rows:
+        first, last = issue_span(activity_date, due_date)
+        # Buckets are week-grained (or open-ended); trim to the exact range.
+        if first <= end and last >= start:
+            result.append([pk, title, status, priority, first, last, assignee, project])
+    return result
+
+
+def month_range(year, month):
+    start = date(year, month, 1)
+    end = (start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+    return start, end
+
+
+@receiver(post_save, sender=Issue, dispatch_uid="calendar_issue_saved")
+def issue_saved(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    reindex_rows([(
+        instance.pk, instance.project_id, instance.activity_date,
+        instance.due_date, instance.assigned_to_id,
+    )])
+
+
+@receiver(post_save, sender=Project, dispatch_uid="calendar_project_saved")
+def project_saved(sender, instance, created=False, raw=False, **kwargs):
+    if not raw and not created:
+        # The project may have moved to another client.
+        IssueWeekBucket.objects.filter(issue__project=instance).update(
+            client_id=instance.client_id,
+        )
+
+
+@receiver(bulk_changed, dispatch_uid="calendar_bulk_changed")
+def issues_bulk_changed(sender, pks, **kwargs):
+    if sender is Issue and pks:
+        reindex_issues(pks)
@@ -0,0 +1,207 @@
+"""
+In-process change feed for Issue / InfraActivity rows.
+
+Save/delete signals (and ``bulk_changed``) publish compact events into a
+bounded ring buffer once the transaction commits; the SSE view in
+``core.views`` streams them to dashboards. Events live in the worker's
+memory only, so each process has its own feed and ids restart on reload.
+Event ids sent to clients carry the feed's epoch (random per process),
+``<epoch>-<id>``: a client resuming from an id the buffer no longer
+holds, from another process or from before a restart gets a ``reset``
+event and should refetch.
+"""
+import asyncio
+import itertools
+import os
+import threading
+import uuid
+from collections import deque
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import Issue, InfraActivity
+from .signals import bulk_changed
+from .tenancy import project_tenant
+
+
+class ChangeFeed:
+    """
+    Bounded, thread-safe ring buffer of events with async waiters.
+    """
+
+    def __init__(self, size):
+        self._events = deque(maxlen=size)
+        self.restart()
+
+    def restart(self):
+        """
+        Start over empty under a new epoch (also run in forked children).
+        """
+        self.epoch = uuid.uuid4().hex[:8]
+        self._events.clear()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._waiters = set()  # (loop, asyncio.Event)
+
+    def cursor(self, event):
+        """
+        The client-facing id of ``event``: ``<epoch>-<id>``.
+        """
+        return f"{self.epoch}-{event['id']}"
+
+    def parse_cursor(self, value):
+        """
+        The event id in a client's cursor: None if there is none, -1 if it
+        belongs to another epoch (or is malformed).
+        """
+        if not value:
+            return None
+        epoch, _, event_id = value.partition("-")
+        if epoch != self.epoch or not event_id.isdigit():
+            return -1
+        return int(event_id)
+
+    def publish(self, event):
+        with self._lock:
+            event["id"] = next(self._ids)
+            self._events.append(event)
+            waiters = list(self._waiters)
+        for loop, ready in waiters:
+            # Signals fire in sync threads; wake the subscribers' loops.
+            loop.call_soon_threadsafe(ready.set)
+        return event["id"]
+
+    def last_id(self):
+        with self._lock:
+            return self._events[-1]["id"] if self._events else 0
+
+    def since(self, last_id):
+        """
+        ``(events after last_id, reset)``; ``reset`` is True when some
+        events after ``last_id`` already fell out of the buffer, or when
+        ``last_id`` isn't one of this feed's (-1, or ahead of the newest
+        event) - then every buffered event is returned.
+        """
+        with self._lock:
+            newest = self._events[-1]["id"] if self._events else 0
+            if last_id < 0 or last_id > newest:
+                return list(self._events), True
+            if not self._events:
+                return [], False
+            reset = last_id + 1 < self._events[0]["id"]
+            return [e for e in self._events if e["id"] > last_id], reset
+
+    async def wait(self, last_id, timeout):
+        """
+        Wait until an event newer than ``last_id`` exists (or timeout).
+        """
+        ready = asyncio.Event()
+        waiter = (asyncio.get_running_loop(), ready)
+        with self._lock:
+            self._waiters.add(waiter)
+        try:
+            if self.last_id() > last_id:
+                return
+            try:
+                await asyncio.wait_for(ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        finally:
+            with self._lock:
+                self._waiters.discard(waiter)
+
+
+feed = ChangeFeed(getattr(settings, "CHANGE_FEED_SIZE", 1000))
+# Workers forked from a preloaded master must not share its epoch.
+os.register_at_fork(after_in_child=feed.restart)
+
+
+def _issue_event(op, issue_id, project_id, client_id, partner_id, status, priority, title):
+    return {
+        "model": "issue",
+        "op": op,
+        "pk": issue_id,
+        "issue": issue_id,
+        "project": project_id,
+        "client": client_id,
+        "partner": partner_id,
+        "status": status,
+        "priority": priority,
+        "title": title,
+        "ts": timezone.now().isoformat(),
+    }
+
+
+def _activity_event(op, activity_id, issue_id, project_id, client_id, partner_id, hours, status):
+    return {
+        "model": "infraactivity",
+        "op": op,
+        "pk": activity_id,
+        "issue": issue_id,
+        "project": project_id,
+        "client": client_id,
+        "partner": partner_id,
+        "status": status,
+        "hours_spent": str(hours),
+        "ts": timezone.now().isoformat(),
+    }
+
+
+def _publish_on_commit(build):
+    transaction.on_commit(lambda: feed.publish(build()))
+
+
+def _op(created, kwargs):
+    if kwargs.get("signal") is post_delete:
+        return "deleted"
+    return "created" if created else "updated"
+
+
+# The tenant is looked up in the receiver, not after commit: a cascade
+# delete (project -> issues -> activities) removes the rows it is read
+# from before the transaction commits.
+
+@receiver(post_save, sender=Issue, dispatch_uid="changefeed_issue_saved")
+@receiver(post_delete, sender=Issue, dispatch_uid="changefeed_issue_deleted")
+def issue_changed(sender, instance, created=False, **kwargs):
+    args = (_op(created, kwargs), instance.pk, instance.project_id,
+            *project_tenant(instance.project_id),
+            instance.status, instance.priority, instance.title)
+    _publish_on_commit(lambda: _issue_event(*args))
+
+
+@receiver(post_save, sender=InfraActivity, dispatch_uid="changefeed_activity_saved")
+@receiver(post_delete, sender=InfraActivity, dispatch_uid="changefeed_activity_deleted")
+def activity_changed(sender, instance, created=False, **kwargs):
+    project_id, client_id, partner_id = (
+        Issue.objects.filter(pk=instance.issue_id)
+        .values_list("project_id", "project__client_id", "project__client__partner_id")
+        .first()
+    ) or (None, None, None)
+    args = (_op(created, kwargs), instance.pk, instance.issue_id, project_id,
+            client_id, partner_id, instance.hours_spent, instance.status)
+    _publish_on_commit(lambda: _activity_event(*args))
+
+
+@receiver(bulk_changed, dispatch_uid="changefeed_bulk_changed")
+def rows_bulk_changed(sender, pks, **kwargs):
+    if not pks:
+        return
+    if sender is Issue:
+        rows = Issue.objects.filter(pk__in=pks).values_list(
+            "pk", "project_id", "project__client_id", "project__client__partner_id",
+            "status", "priority", "title",
+        )
+        for row in rows:
+            feed.publish(_issue_event("updated", *row))
+    elif sender is InfraActivity:
+        rows = InfraActivity.objects.filter(pk__in=pks).values_list(
+            "pk", "issue_id", "issue__project_id", "issue__project__client_id",
+            "issue__project__client__partner_id", "hours_spent", "status",
+        )
+        for row in rows:
+            feed.publish(_activity_event("created", *row))
@@ -0,0 +1,131 @@
+"""
+Deep copy of a Project: environments, servers, resources and optionally
+its open issues.
+
+Each level is read with one query and written with one ``bulk_create``;
+new parent ids are mapped onto the children in memory, so the number of
+queries doesn't grow with the number of rows. On backends that can't
+return ids from a bulk insert (MySQL), the new rows of a level are read
+back in primary-key order - they all hang off brand new parents, so
+nothing else can be mixed in.
+"""
+from django.db import transaction
+
+from . import impact
+from .models import Environment, Server, Resource, Issue
+from .signals import bulk_changed
+
+
+OPEN_STATUSES = ("open", "in_progress", "blocked")
+
+
+def _copy(obj, **overrides):
+    values = {
+        field.attname: getattr(obj, field.attname)
+        for field in obj._meta.concrete_fields
+        if not field.primary_key
+    }
+    values.update(overrides)
+    return type(obj)(**values)
+
+
+def _insert(model, originals, copies, parent_field, parent_ids):
+    """
+    Bulk insert ``copies`` and return ``{original.pk: copy.pk}``.
+    """
+    model.objects.bulk_create(copies, batch_size=500)
+    if copies and copies[0].pk is None:
+        new_ids = (
+            model.objects
+            .filter(**{f"{parent_field}__in": parent_ids})
+            .order_by("pk")
+            .values_list("pk", flat=True)
+        )
+        for copy, pk in zip(copies, new_ids):
+            copy.pk = pk
+    return {original.pk: copy.pk for original, copy in zip(originals, copies)}
+
+
+def clone_project(source, client, name, code, with_issues=False):
+    """
+    Copy ``source`` into ``client`` as a new project; returns
+    ``(project, counts)``.
+    """
+    with transaction.atomic():
+        project = _copy(source, client_id=client.pk, name=name, code=code)
+        project.save()
+
+        environments = list(Environment.objects.filter(project=source).order_by("pk"))
+        env_map = _insert(
+            Environment,
+            environments,
+            [_copy(env, project_id=project.pk) for env in environments],
+            "project_id",
+            [project.pk],
+        )
+
+        servers = list(Server.objects.filter(environment__project=source).order_by("pk"))
+        server_map = _insert(
+            Server,
+            servers,
+            [_copy(s, environment_id=env_map[s.environment_id]) for s in servers],
+            "environment_id",
+            list(env_map.values()),
+        )
+
+        resources = list(Resource.objects.filter(environment__project=source).order_by("pk"))
+        resource_map = _insert(
+            Resource,
+            resources,
+            [_copy(r, environment_id=env_map[r.environment_id]) for r in resources],
+            "environment_id",
+            list(env_map.values()),
+        )
+
+        issue_ids = []
+        if with_issues:
+            issues = list(
+                Issue.objects
+                .filter(project=source, status__in=OPEN_STATUSES)
+                .order_by("pk")
+            )
+            issue_map = _insert(
+                Issue,
+                issues,
+                [
+                    _copy(
+                        issue,
+                        project_id=project.pk,
+                        environment_id=env_map.get(issue.environment_id),
+                        resource_id=resource_map.get(issue.resource_id),
+                        actual_hours=0,
+                        occurrence_key=None,
+                    )
+                    for issue in issues
+                ],
+                "project_id",
+                [project.pk],
+            )
+            issue_ids = list(issue_map.values())
+
+        created = {
+            Environment: list(env_map.values()),
+            Server: list(server_map.values()),
+            Resource: list(resource_map.values()),
+            Issue: issue_ids,
+        }
+
+        def rebuild_derived():
+            for model, pks in created.items():
+                if pks:
+                    bulk_changed.send(sender=model, pks=pks)
+            impact.rebuild(created[Environment])
+
+        transaction.on_commit(rebuild_derived)
+
+    return project, {
+        "environments": len(environments),
+        "servers": len(servers),
+        "resources": len(resources),
+        "issues": len(issue_ids),
+    }
@@ -0,0 +1,10 @@
+from django.db.backends.mysql import base
+
+from ..pooled import PooledDatabaseWrapperMixin
+
+
+class DatabaseWrapper(PooledDatabaseWrapperMixin, base.DatabaseWrapper):
+
+    def ping_raw_connection(self, conn):
+        conn.ping()
+        return True
@@ -0,0 +1,37 @@
+from ..pool import get_pool
+
+
+class PooledDatabaseWrapperMixin:
+    """
+    Borrow raw connections from :mod:`core.db.pool` instead of opening a
+    new one on every ``connect()``; ``close()`` gives them back.
+
+    Pool sizing lives in the alias' ``POOL`` dict (see settings.py).
+    """
+
+    def _pool(self):
+        return get_pool(
+            self.alias,
+            self.settings_dict.get("POOL") or {},
+            connect=lambda: super(PooledDatabaseWrapperMixin, self).get_new_connection(
+                self.get_connection_params()
+            ),
+            ping=self.ping_raw_connection,
+        )
+
+    def ping_raw_connection(self, conn):
+        raise NotImplementedError
+
+    def get_new_connection(self, conn_params):
+        return self._pool().acquire()
+
+    def _close(self):
+        if self.connection is None:
+            return
+        # A connection closed mid-transaction or after an error is not
+        # handed to the next request.
+        discard = self.in_atomic_block or not self.autocommit
+        if self.errors_occurred and not discard:
+            discard = not self.is_usable()
+        with self.wrap_database_errors:
+            self._pool().release(self.connection, discard=discard)
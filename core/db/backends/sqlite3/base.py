@@ -0,0 +1,21 @@
+from django.db.backends.sqlite3 import base
+
+from ..pooled import PooledDatabaseWrapperMixin
+
+
+class DatabaseWrapper(PooledDatabaseWrapperMixin, base.DatabaseWrapper):
+
+    def ping_raw_connection(self, conn):
+        conn.execute("SELECT 1").close()
+        return True
+
+    def get_new_connection(self, conn_params):
+        # In-memory databases (tests) live and die with their connection.
+        if self.is_in_memory_db():
+            return base.DatabaseWrapper.get_new_connection(self, conn_params)
+        return super().get_new_connection(conn_params)
+
+    def _close(self):
+        if self.is_in_memory_db():
+            return base.DatabaseWrapper._close(self)
+        return super()._close()
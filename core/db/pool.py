@@ -0,0 +1,207 @@
+"""
+Small in-process pool of raw DB-API connections.
+
+Used by the ``core.db.backends.*`` engines when ``DB_POOL=1``. Django
+still opens/closes "its" connection per request (CONN_MAX_AGE=0), but
+closing hands the socket back to the pool instead of tearing it down, so
+bursty ASGI/WSGI traffic reuses a handful of authenticated connections.
+"""
+import threading
+import time
+
+from django.core.exceptions import ImproperlyConfigured
+
+
+class PoolTimeout(Exception):
+    """
+    No connection became free within the pool timeout.
+    """
+
+
+class ConnectionPool:
+    """
+    LIFO pool with idle/lifetime expiry and a lazy health check.
+
+    ``connect()`` opens a new raw connection and ``ping(conn)`` returns
+    whether an idle connection is still usable; it is only called for
+    connections that sat idle for more than ``check_after`` seconds.
+    """
+
+    def __init__(self, connect, ping, max_size=10, timeout=10.0,
+                 max_idle=300.0, max_lifetime=3600.0, check_after=30.0):
+        if max_size < 1:
+            raise ImproperlyConfigured("DB pool MAX_SIZE must be at least 1.")
+        self._connect = connect
+        self._ping = ping
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.max_lifetime = max_lifetime
+        self.check_after = check_after
+
+        self._cond = threading.Condition()
+        self._idle = []          # [(conn, created_at, released_at)]
+        self._born = {}          # id(conn) -> created_at, for checked-out conns
+        self._size = 0           # idle + checked out
+        self._counters = {
+            "connects": 0,
+            "reuses": 0,
+            "discards": 0,
+            "failed_checks": 0,
+            "waits": 0,
+            "timeouts": 0,
+            "wait_seconds": 0.0,
+        }
+
+    def acquire(self):
+        deadline = time.monotonic() + self.timeout
+        waited = False
+        while True:
+            with self._cond:
+                conn = self._take_idle()
+                if conn is None and self._size >= self.max_size:
+                    if not waited:
+                        waited = True
+                        self._counters["waits"] += 1
+                    started = time.monotonic()
+                    remaining = deadline - started
+                    if remaining <= 0 or not self._cond.wait(remaining):
+                        self._counters["timeouts"] += 1
+                        raise PoolTimeout(
+                            f"No database connection free after {self.timeout}s "
+                            f"(pool size {self.max_size})."
+                        )
+                    self._counters["wait_seconds"] += time.monotonic() - started
+                    continue
+                if conn is None:
+                    # Reserve a slot, connect outside the lock.
+                    self._size += 1
+            if conn is not None:
+                conn, created_at, released_at = conn
+                if (time.monotonic() - released_at > self.check_after
+                        and not self._safe_ping(conn)):
+                    with self._cond:
+                        self._counters["failed_checks"] += 1
+                        self._drop(conn)
+                    continue
+                with self._cond:
+                    self._born[id(conn)] = created_at
+                    self._counters["reuses"] += 1
+                return conn
+            return self._open()
+
+    def release(self, conn, discard=False):
+        with self._cond:
+            created_at = self._born.pop(id(conn), None)
+            if created_at is None:
+                # Not ours (e.g. opened before the pool existed).
+                discard = True
+                self._size += 1
+            if discard or time.monotonic() - created_at > self.max_lifetime:
+                self._drop(conn)
+            else:
+                self._idle.append((conn, created_at, time.monotonic()))
+            self._cond.notify()
+
+    def close_all(self):
+        with self._cond:
+            idle, self._idle = self._idle, []
+            for conn, _, _ in idle:
+                self._drop(conn)
+
+    def stats(self):
+        with self._cond:
+            return {
+                "max_size": self.max_size,
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": self._size - len(self._idle),
+                **self._counters,
+            }
+
+    # ----- internals (call with the lock held unless noted) -----
+
+    def _take_idle(self):
+        now = time.monotonic()
+        while self._idle:
+            conn, created_at, released_at = self._idle.pop()
+            if (now - released_at > self.max_idle
+                    or now - created_at > self.max_lifetime):
+                self._drop(conn)
+                continue
+            return conn, created_at, released_at
+        return None
+
+    def _drop(self, conn):
+        self._size -= 1
+        self._counters["discards"] += 1
+        try:
+            conn.close()
+        except Exception:
+            pass
+        self._cond.notify()
+
+    def _safe_ping(self, conn):
+        # Called without the lock: a ping is a network round trip.
+        try:
+            return bool(self._ping(conn))
+        except Exception:
+            return False
+
+    def _open(self):
+        # Called without the lock; the slot is already reserved.
+        try:
+            conn = self._connect()
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self._born[id(conn)] = time.monotonic()
+            self._counters["connects"] += 1
+        return conn
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(alias, options, connect, ping):
+    """
+    Process-wide pool for a database alias, created on first use.
+    """
+    with _pools_lock:
+        pool = _pools.get(alias)
+        if pool is None:
+            pool = _pools[alias] = ConnectionPool(
+                connect,
+                ping,
+                max_size=int(options.get("MAX_SIZE", 10)),
+                timeout=float(options.get("TIMEOUT", 10)),
+                max_idle=float(options.get("MAX_IDLE", 300)),
+                max_lifetime=float(options.get("MAX_LIFETIME", 3600)),
+                check_after=float(options.get("CHECK_AFTER", 30)),
+            )
+        return pool
+
+
+def pool_stats():
+    """
+    ``{alias: stats}`` for every pool opened in this process.
+    """
+    with _pools_lock:
+        pools = dict(_pools)
+    return {alias: pool.stats() for alias, pool in pools.items()}
+
+
+def close_pools():
+    """
+    Close every idle pooled connection and forget the pools; a preforking
+    server calls this in its master so no worker inherits a socket.
+    """
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close_all()
@@ -0,0 +1,103 @@
+"""
+Read/write splitting across the primary database and its read replicas.
+
+Every query goes to ``default`` unless the code path explicitly opts in
+with :func:`replica_safe` (views) or :func:`use_replica` (blocks of code).
+Even then reads fall back to the primary while the request is "pinned",
+which happens for a few seconds after the user saved something, so admin
+forms never show data older than the user's own last write.
+"""
+import contextvars
+import functools
+import random
+from contextlib import contextmanager
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+
+
+_read_from_replica = contextvars.ContextVar("read_from_replica", default=False)
+_pinned_to_primary = contextvars.ContextVar("pinned_to_primary", default=False)
+
+
+def replica_aliases():
+    return list(getattr(settings, "DATABASE_REPLICAS", []))
+
+
+@contextmanager
+def use_replica():
+    """
+    Allow reads inside the block to be served by a read replica.
+    """
+    token = _read_from_replica.set(True)
+    try:
+        yield
+    finally:
+        _read_from_replica.reset(token)
+
+
+@contextmanager
+def use_primary():
+    """
+    Force every read inside the block to the primary (read-your-writes).
+    """
+    token = _pinned_to_primary.set(True)
+    try:
+        yield
+    finally:
+        _pinned_to_primary.reset(token)
+
+
+def replica_safe(view_func):
+    """
+    Mark a read-only view as safe to serve from a read replica.
+    """
+    if iscoroutinefunction(view_func):
+        @functools.wraps(view_func)
+        async def _async_wrapped(*args, **kwargs):
+            with use_replica():
+                return await view_func(*args, **kwargs)
+        return _async_wrapped
+
+    @functools.wraps(view_func)
+    def _wrapped(*args, **kwargs):
+        with use_replica():
+            return view_func(*args, **kwargs)
+    return _wrapped
+
+
+def read_alias():
+    """
+    Alias the router would pick for a read right now.
+    """
+    replicas = replica_aliases()
+    if not replicas or not _read_from_replica.get() or _pinned_to_primary.get():
+        return "default"
+    return random.choice(replicas)
+
+
+class ReadReplicaRouter:
+    """
+    Writes always go to ``default``; reads go to a random replica only
+    inside replica-safe code that is not pinned to the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        instance = hints.get("instance")
+        if instance is not None and instance._state.db:
+            # Follow-up reads on an object (e.g. related managers) stay on
+            # the database the object came from.
+            return instance._state.db
+        return read_alias()
+
+    def db_for_write(self, model, **hints):
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas receive schema changes through replication (or, for the
+        # local sqlite setup, by copying the primary file).
+        return db not in replica_aliases()
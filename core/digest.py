@@ -0,0 +1,195 @@
+"""
+Morning digest: one email per assignee / project manager listing their
+overdue, due-today and other open issues.
+
+All digests are built from a single query over open issues (recipient
+columns included), split by section in SQL and grouped per recipient in
+Python. An issue that shows up in several digests (assignee and project
+manager) is rendered once. Messages go out over one backend connection
+in batches.
+"""
+from datetime import date
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db.models import Case, IntegerField, Q, Value, When
+from django.template.loader import get_template
+from django.urls import reverse
+from django.utils.safestring import mark_safe
+
+from .models import Issue
+
+
+OPEN_STATUSES = ("open", "in_progress", "blocked")
+
+OVERDUE, DUE_TODAY, OPEN = 0, 1, 2
+SECTIONS = (
+    (OVERDUE, "overdue", "Overdue"),
+    (DUE_TODAY, "due_today", "Due today"),
+    (OPEN, "open", "Open"),
+)
+
+# Per section; the rest is summarised as "and N more".
+MAX_ITEMS = 50
+SEND_BATCH_SIZE = 100
+
+ISSUE_COLUMNS = (
+    "pk", "title", "status", "priority", "due_date",
+    "project__code", "project__client__name", "section",
+)
+RECIPIENT_COLUMNS = ("id", "email", "first_name", "username", "is_active")
+ROLES = ("assigned_to", "project_manager")
+
+
+class Digest:
+    """
+    One recipient's issues, by section.
+    """
+
+    def __init__(self, user):
+        self.user = user
+        self.items = {key: [] for _, key, _ in SECTIONS}
+        self.totals = {key: 0 for _, key, _ in SECTIONS}
+        self.roles = {}  # issue pk -> {"assignee", "manager"}
+
+    def add(self, section, issue, role):
+        if issue["pk"] in self.roles:
+            self.roles[issue["pk"]].add(role)
+            return
+        self.roles[issue["pk"]] = {role}
+        self.totals[section] += 1
+        if len(self.items[section]) < MAX_ITEMS:
+            self.items[section].append(issue)
+
+    @property
+    def total(self):
+        return sum(self.totals.values())
+
+    @property
+    def subject(self):
+        parts = [
+            f"{self.totals[key]} {title.lower()}"
+            for _, key, title in SECTIONS if self.totals[key]
+        ]
+        return "Infra Desk digest: " + ", ".join(parts)
+
+
+def _issues(today):
+    return (
+        Issue.objects
+        .filter(status__in=OPEN_STATUSES)
+        .filter(Q(assigned_to__isnull=False) | Q(project_manager__isnull=False))
+        .annotate(section=Case(
+            When(due_date__lt=today, then=Value(OVERDUE)),
+            When(due_date=today, then=Value(DUE_TODAY)),
+            default=Value(OPEN),
+            output_field=IntegerField(),
+        ))
+        .order_by("section", "due_date", "pk")
+        .values_list(
+            *ISSUE_COLUMNS,
+            *[f"{role}__{column}" for role in ROLES for column in RECIPIENT_COLUMNS],
+        )
+    )
+
+
+def build(today=None, user_ids=None):
+    """
+    ``[Digest]`` for every active user with an email and at least one
+    open issue, from one query.
+    """
+    today = today or date.today()
+    section_keys = {number: key for number, key, _ in SECTIONS}
+    width = len(RECIPIENT_COLUMNS)
+    digests = {}
+    for row in _issues(today).iterator(chunk_size=2000):
+        issue = dict(zip(ISSUE_COLUMNS, row[:len(ISSUE_COLUMNS)]))
+        section = section_keys[issue["section"]]
+        for index, role in enumerate(("assignee", "manager")):
+            start = len(ISSUE_COLUMNS) + index * width
+            user = dict(zip(RECIPIENT_COLUMNS, row[start:start + width]))
+            if user["id"] is None or not user["is_active"] or not user["email"]:
+                continue
+            if user_ids is not None and user["id"] not in user_ids:
+                continue
+            digest = digests.get(user["id"])
+            if digest is None:
+                digest = digests[user["id"]] = Digest(user)
+            digest.add(section, issue, role)
+    return list(digests.values())
+
+
+class Renderer:
+    """
+    Renders digests into messages; each issue's fragment is rendered
+    once and reused by every digest that lists it.
+    """
+
+    def __init__(self, today=None):
+        self.today = today or date.today()
+        self.site_url = getattr(settings, "SITE_URL", "").rstrip("/")
+        self.item_text = get_template("emails/digest_issue.txt")
+        self.item_html = get_template("emails/digest_issue.html")
+        self.body_text = get_template("emails/digest.txt")
+        self.body_html = get_template("emails/digest.html")
+        self.fragments = {}
+
+    def _fragment(self, issue):
+        fragment = self.fragments.get(issue["pk"])
+        if fragment is None:
+            context = {
+                "issue": issue,
+                "url": self.site_url + reverse("admin:core_issue_change", args=[issue["pk"]]),
+                "days_overdue": (self.today - issue["due_date"]).days if issue["due_date"] else 0,
+            }
+            fragment = self.fragments[issue["pk"]] = (
+                self.item_text.render(context).strip(),
+                mark_safe(self.item_html.render(context).strip()),
+            )
+        return fragment
+
+    def message(self, digest):
+        sections = []
+        for _, key, title in SECTIONS:
+            if not digest.totals[key]:
+                continue
+            fragments = [self._fragment(issue) for issue in digest.items[key]]
+            sections.append({
+                "title": title,
+                "total": digest.totals[key],
+                "more": digest.totals[key] - len(fragments),
+                "text": [text for text, _ in fragments],
+                "html": [html for _, html in fragments],
+            })
+        context = {
+            "user": digest.user,
+            "today": self.today,
+            "sections": sections,
+            "site_url": self.site_url,
+        }
+        message = EmailMultiAlternatives(
+            subject=digest.subject,
+            body=self.body_text.render(context),
+            to=[digest.user["email"]],
+        )
+        message.attach_alternative(self.body_html.render(context), "text/html")
+        return message
+
+
+def send(digests, today=None, connection=None, batch_size=SEND_BATCH_SIZE):
+    """
+    Render and send ``digests`` over one connection; returns the number
+    of messages sent.
+    """
+    renderer = Renderer(today)
+    sent = 0
+    with connection or get_connection() as connection:
+        batch = []
+        for digest in digests:
+            batch.append(renderer.message(digest))
+            if len(batch) == batch_size:
+                sent += connection.send_messages(batch) or 0
+                batch = []
+        if batch:
+            sent += connection.send_messages(batch) or 0
+    return sent
@@ -0,0 +1,199 @@
+"""
+Cached page chrome and dashboard counts.
+
+The admin header and the home page widgets are cached under keys that
+carry the generation counters of the models they show (the counters
+``core.search`` keeps) plus the user or tenant they are for. Saving,
+deleting or bulk-changing one of those models moves the key on, so
+nothing is purged explicitly and stale entries age out. Once warm,
+rendering them costs cache reads only, no queries.
+
+The header's "My issues" link only depends on the user's own issues, so
+it is keyed on a per-assignee generation instead: saving an issue (or
+its SLA row changing) moves on the keys of its old and new assignee
+only, not every user's header.
+
+Anything per request (the CSRF token, the search box value) stays
+outside the cached fragments.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import search
+from .models import Issue, IssueSLA, Resource, UserProfile
+from .signals import bulk_changed
+
+
+OPEN_STATUSES = ("open", "in_progress", "blocked")
+
+# Models each cached value is built from; their generations are in the key.
+TENANT_MODELS = (UserProfile,)
+COUNT_MODELS = (Issue, IssueSLA, Resource)
+
+
+def cache_seconds():
+    return getattr(settings, "FRAGMENT_CACHE_SECONDS", 600)
+
+
+def _cached(key, stamp, compute):
+    key = f"fragments:{key}:{stamp}"
+    result = cache.get(key)
+    if result is None:
+        result = compute()
+        cache.set(key, result, cache_seconds())
+    return result
+
+
+@receiver(post_save, sender=UserProfile, dispatch_uid="fragments_profile_saved")
+@receiver(post_delete, sender=UserProfile, dispatch_uid="fragments_profile_deleted")
+def profile_changed(sender, raw=False, **kwargs):
+    # The other fragment models are already bumped by core.search.
+    if not raw:
+        search.bump(UserProfile)
+
+
+@receiver(bulk_changed, sender=UserProfile, dispatch_uid="fragments_profile_bulk_changed")
+def profiles_bulk_changed(sender, pks, **kwargs):
+    search.bump(UserProfile)
+
+
+# ---------- Per-assignee generations ----------
+
+def _assignee_key(user_id):
+    return f"fragments:gen:assignee:{user_id}"
+
+
+def assignee_generation(user_id):
+    return cache.get(_assignee_key(user_id), 0)
+
+
+def bump_assignees(user_ids):
+    for user_id in set(user_ids) - {None}:
+        key = _assignee_key(user_id)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, 1, timeout=None)
+
+
+@receiver(pre_save, sender=Issue, dispatch_uid="fragments_issue_pre_save")
+def read_stored_assignee(sender, instance, raw=False, update_fields=None, **kwargs):
+    # A reassigned issue also leaves its previous assignee's counts.
+    if raw or instance._state.adding:
+        return
+    if update_fields is not None and not {"assigned_to", "assigned_to_id"} & set(update_fields):
+        return
+    instance._fragments_assignee_id = (
+        Issue.objects.filter(pk=instance.pk).values_list("assigned_to_id", flat=True).first()
+    )
+
+
+@receiver(post_save, sender=Issue, dispatch_uid="fragments_issue_saved")
+@receiver(post_delete, sender=Issue, dispatch_uid="fragments_issue_deleted")
+def issue_changed(sender, instance, raw=False, **kwargs):
+    if not raw:
+        bump_assignees([
+            instance.assigned_to_id,
+            instance.__dict__.pop("_fragments_assignee_id", None),
+        ])
+
+
+@receiver(bulk_changed, sender=Issue, dispatch_uid="fragments_issue_bulk_changed")
+@receiver(bulk_changed, sender=IssueSLA, dispatch_uid="fragments_sla_bulk_changed")
+def issues_bulk_changed(sender, pks, **kwargs):
+    # SLA rows are keyed by issue id. Reassignments in bulk (core.triage)
+    # bump the previous assignees themselves.
+    if pks:
+        bump_assignees(
+            Issue.objects.filter(pk__in=pks)
+            .order_by()
+            .values_list("assigned_to_id", flat=True)
+            .distinct()
+        )
+
+
+# ---------- Tenant ----------
+
+def tenant_for(user):
+    """
+    ``(partner_id, client_id)`` from the user's profile; ``(None, None)``
+    for users without one (they see everything).
+    """
+    def compute():
+        profile = (
+            UserProfile.objects
+            .filter(user_id=user.pk)
+            .values_list("partner_id", "client_id")
+            .first()
+        )
+        return list(profile or (None, None))
+
+    return tuple(_cached(f"tenant:{user.pk}", search.stamp(TENANT_MODELS), compute))
+
+
+def tenant_key(user):
+    """
+    Cache key part shared by every user of the same tenant.
+    """
+    partner_id, client_id = tenant_for(user)
+    if client_id:
+        return f"c{client_id}"
+    if partner_id:
+        return f"p{partner_id}"
+    return "all"
+
+
+def _tenant_filter(user, path):
+    partner_id, client_id = tenant_for(user)
+    if client_id:
+        return Q(**{f"{path}client_id": client_id})
+    if partner_id:
+        return Q(**{f"{path}client__partner_id": partner_id})
+    return Q()
+
+
+# ---------- Counts ----------
+
+def tenant_counts(user):
+    """
+    Open / at-risk / breached issues and critical resources of the
+    user's tenant (two queries when not cached).
+    """
+    def compute():
+        counts = (
+            Issue.objects
+            .filter(_tenant_filter(user, "project__"), status__in=OPEN_STATUSES)
+            .aggregate(
+                open=Count("pk"),
+                at_risk=Count("pk", filter=Q(sla__state=IssueSLA.STATE_AT_RISK)),
+                breached=Count("pk", filter=Q(sla__state=IssueSLA.STATE_BREACHED)),
+            )
+        )
+        counts["critical_resources"] = (
+            Resource.objects
+            .filter(_tenant_filter(user, "environment__project__"), is_critical=True, is_active=True)
+            .count()
+        )
+        return counts
+
+    return _cached(f"counts:{tenant_key(user)}", search.stamp(COUNT_MODELS), compute)
+
+
+def user_counts(user):
+    """
+    The user's own open and breached issues (one query when not cached).
+    """
+    def compute():
+        return (
+            Issue.objects
+            .filter(assigned_to_id=user.pk, status__in=OPEN_STATUSES)
+            .aggregate(
+                open=Count("pk"),
+                breached=Count("pk", filter=Q(sla__state=IssueSLA.STATE_BREACHED)),
+            )
+        )
+
+    return _cached(f"mine:{user.pk}", assignee_generation(user.pk), compute)
@@ -0,0 +1,369 @@
+"""
+Impact index: per-environment adjacency of servers, resources and open
+issues, stored as one ``ImpactIndex`` row per environment. An open issue
+is listed in its own environment and in its resource's, so one filed
+only against a resource still shows up there.
+
+A saved or deleted server, resource or issue is patched into the stored
+graphs after commit: only its own entry is replaced, in the environments
+it left and the ones it now belongs to. Saves that touch none of the
+indexed fields are skipped. Environment and project changes, resources
+moving or going away, and environments without a row yet rebuild the
+whole graph. Migration 0016 builds the environments that predate the
+index; ``manage.py rebuild_impact_index`` rebuilds everything.
+Answering "what is affected if X breaks" is then a single indexed lookup.
+"""
+import threading
+
+from django.db import connection, transaction
+from django.db.models import Q
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import Project, Environment, Server, Resource, Issue, ImpactIndex
+from .signals import bulk_changed
+
+
+OPEN_STATUSES = ("open", "in_progress", "blocked")
+
+# Graph list and indexed columns of each node type.
+NODE_LISTS = {Server: "servers", Resource: "resources", Issue: "open_issues"}
+NODE_FIELDS = {
+    Server: ("id", "name", "ip_address", "is_active"),
+    Resource: ("id", "name", "resource_type", "is_critical", "is_active"),
+    Issue: ("id", "resource_id", "title", "status", "priority", "due_date"),
+}
+SORT_KEYS = {
+    "servers": lambda entry: entry["name"],
+    "resources": lambda entry: (not entry["is_critical"], entry["name"]),
+    "open_issues": lambda entry: (entry["due_date"] is None, entry["due_date"] or "", entry["id"]),
+}
+
+
+def _entry(model, row):
+    entry = {field: row[field] for field in NODE_FIELDS[model]}
+    if entry.get("due_date"):
+        entry["due_date"] = entry["due_date"].isoformat()
+    return entry
+
+
+def _location_fields(model):
+    # Issues are also listed in their resource's environment.
+    if model is Issue:
+        return ("environment_id", "resource__environment_id")
+    return ("environment_id",)
+
+
+def _belongs(model, row, environment_id):
+    if model is Issue and row["status"] not in OPEN_STATUSES:
+        return False
+    return environment_id in (row[field] for field in _location_fields(model))
+
+
+def build_graphs(environment_ids):
+    """
+    ``{environment_id: graph}`` for the given environments, using one
+    query per node type regardless of how many environments are built.
+    """
+    environment_ids = list(environment_ids)
+    graphs = {}
+    environments = (
+        Environment.objects
+        .filter(pk__in=environment_ids)
+        .values(
+            "id", "name", "env_type", "is_active", "project_id",
+            "project__name", "project__client_id", "project__client__partner_id",
+        )
+    )
+    for env in environments:
+        graphs[env["id"]] = {
+            "environment": {
+                "id": env["id"],
+                "name": env["name"],
+                "env_type": env["env_type"],
+                "is_active": env["is_active"],
+                "project_id": env["project_id"],
+                "project": env["project__name"],
+                "client_id": env["project__client_id"],
+                "partner_id": env["project__client__partner_id"],
+            },
+            "servers": [],
+            "resources": [],
+            "open_issues": [],
+        }
+
+    nodes = {
+        Server: Server.objects.filter(environment_id__in=graphs),
+        Resource: Resource.objects.filter(environment_id__in=graphs),
+        # An issue belongs to its own environment and to its resource's,
+        # which may differ (or the issue may name only the resource).
+        Issue: Issue.objects.filter(
+            Q(environment_id__in=graphs) | Q(resource__environment_id__in=graphs),
+            status__in=OPEN_STATUSES,
+        ),
+    }
+    for model, queryset in nodes.items():
+        key = NODE_LISTS[model]
+        for row in queryset.values(*NODE_FIELDS[model], *_location_fields(model)):
+            entry = _entry(model, row)
+            for pk in {row[field] for field in _location_fields(model)}:
+                if pk in graphs:
+                    graphs[pk][key].append(entry)
+    # Sorted here rather than in SQL so patched graphs keep the same order.
+    for graph in graphs.values():
+        for key, sort_key in SORT_KEYS.items():
+            graph[key].sort(key=sort_key)
+
+    return graphs
+
+
+def rebuild(environment_ids, batch_size=500):
+    """
+    Rebuild (upsert) the index rows of the given environments.
+    """
+    environment_ids = sorted({pk for pk in environment_ids if pk})
+    kwargs = {"update_conflicts": True, "update_fields": ["graph", "updated_at"]}
+    if connection.features.supports_update_conflicts_with_target:
+        kwargs["unique_fields"] = ["environment"]
+    built = 0
+    for start in range(0, len(environment_ids), batch_size):
+        graphs = build_graphs(environment_ids[start:start + batch_size])
+        ImpactIndex.objects.bulk_create(
+            [ImpactIndex(environment_id=pk, graph=graph) for pk, graph in graphs.items()],
+            **kwargs,
+        )
+        built += len(graphs)
+    return built
+
+
+def rebuild_all(batch_size=500):
+    ids = list(Environment.objects.order_by("pk").values_list("pk", flat=True))
+    return rebuild(ids, batch_size=batch_size)
+
+
+# Tried in order; an issue without an environment of its own is found
+# through its resource.
+LOOKUPS = {
+    "environment": ("environment_id",),
+    "server": ("environment__servers",),
+    "resource": ("environment__resources",),
+    "issue": ("environment__issues", "environment__resources__issues"),
+}
+
+
+def blast_radius(kind, pk):
+    """
+    Everything affected by ``kind`` #``pk`` (one query; two for an issue
+    filed only against a resource), or None.
+
+    For a resource or server the result also names the open issues that
+    touch it directly; the siblings are the rest of its environment.
+    """
+    if kind not in LOOKUPS:
+        raise ValueError(f"Unknown node type '{kind}'.")
+    for lookup in LOOKUPS[kind]:
+        graph = (
+            ImpactIndex.objects
+            .filter(**{lookup: pk})
+            .values_list("graph", flat=True)
+            .first()
+        )
+        if graph is not None:
+            break
+    else:
+        return None
+
+    result = {"node": {"type": kind, "id": pk}, **graph}
+    if kind == "resource":
+        result["direct_issues"] = [
+            issue for issue in graph["open_issues"] if issue["resource_id"] == pk
+        ]
+        result["resources"] = [r for r in graph["resources"] if r["id"] != pk]
+        result["node"]["is_critical"] = any(
+            r["is_critical"] for r in graph["resources"] if r["id"] == pk
+        )
+    elif kind == "server":
+        result["servers"] = [s for s in graph["servers"] if s["id"] != pk]
+    elif kind == "issue":
+        result["open_issues"] = [i for i in graph["open_issues"] if i["id"] != pk]
+    return result
+
+
+
+
+# ---------- Incremental maintenance ----------
+
+_pending = threading.local()
+
+
+def _state():
+    state = getattr(_pending, "state", None)
+    if state is None:
+        state = _pending.state = {
+            "rebuild": set(),
+            "environments": set(),
+            "resources": set(),
+            "nodes": {},
+        }
+    return state
+
+
+def _flush():
+    state = getattr(_pending, "state", None)
+    _pending.state = None
+    if state is None:
+        return
+
+    environment_ids = set(state["environments"])
+    rows = {}
+    for model, pks in state["nodes"].items():
+        rows[model] = list(
+            model.objects.filter(pk__in=pks)
+            .values(*NODE_FIELDS[model], *_location_fields(model))
+        )
+        for row in rows[model]:
+            environment_ids.update(row[field] for field in _location_fields(model))
+    if state["resources"]:
+        # Issues that were deleted still drop out of their resource's graph.
+        environment_ids.update(
+            Resource.objects.filter(pk__in=state["resources"])
+            .values_list("environment_id", flat=True)
+        )
+    environment_ids.discard(None)
+    environment_ids -= state["rebuild"]
+
+    indexes = list(ImpactIndex.objects.filter(environment_id__in=environment_ids)) if environment_ids else []
+    now = timezone.now()
+    for index in indexes:
+        for model, pks in state["nodes"].items():
+            key = NODE_LISTS[model]
+            entries = [entry for entry in index.graph[key] if entry["id"] not in pks]
+            entries.extend(
+                _entry(model, row) for row in rows[model]
+                if _belongs(model, row, index.environment_id)
+            )
+            entries.sort(key=SORT_KEYS[key])
+            index.graph[key] = entries
+        index.updated_at = now
+    if indexes:
+        ImpactIndex.objects.bulk_update(indexes, ["graph", "updated_at"])
+
+    missing = environment_ids - {index.environment_id for index in indexes}
+    if state["rebuild"] or missing:
+        rebuild(state["rebuild"] | missing)
+
+
+def schedule_rebuild(*environment_ids):
+    """
+    Rebuild these environments once the current transaction commits.
+    """
+    _state()["rebuild"].update(pk for pk in environment_ids if pk)
+    # Every change registers a callback; the first one to run does the
+    # work for everything touched in the transaction.
+    transaction.on_commit(_flush)
+
+
+def schedule_patch(model, pks, environment_ids=(), resource_ids=()):
+    """
+    Replace the entries of ``model`` #``pks`` once the current
+    transaction commits, in the environments they are in by then and in
+    ``environment_ids`` (and the environments of ``resource_ids``),
+    which are where they were before.
+    """
+    state = _state()
+    state["nodes"].setdefault(model, set()).update(pks)
+    state["environments"].update(pk for pk in environment_ids if pk)
+    state["resources"].update(pk for pk in resource_ids if pk)
+    transaction.on_commit(_flush)
+
+
+def _tracked(model, update_fields):
+    if update_fields is None:
+        return True
+    fields = {"environment", "environment_id"}
+    for name in NODE_FIELDS[model]:
+        fields.update((name, name.removesuffix("_id")))
+    return bool(fields & set(update_fields))
+
+
+@receiver(pre_save, sender=Server, dispatch_uid="impact_server_pre_save")
+@receiver(pre_save, sender=Resource, dispatch_uid="impact_resource_pre_save")
+@receiver(pre_save, sender=Issue, dispatch_uid="impact_issue_pre_save")
+def read_stored_node(sender, instance, raw=False, update_fields=None, **kwargs):
+    # The stored row, so an unchanged save is skipped and a moved node is
+    # also removed from where it was.
+    if raw or instance._state.adding or not _tracked(sender, update_fields):
+        return
+    instance._impact_stored = (
+        sender.objects.filter(pk=instance.pk)
+        .values(*NODE_FIELDS[sender], *_location_fields(sender))
+        .first()
+    )
+
+
+@receiver(post_save, sender=Server, dispatch_uid="impact_server_saved")
+@receiver(post_save, sender=Resource, dispatch_uid="impact_resource_saved")
+@receiver(post_save, sender=Issue, dispatch_uid="impact_issue_saved")
+def node_saved(sender, instance, created=False, raw=False, update_fields=None, **kwargs):
+    stored = instance.__dict__.pop("_impact_stored", None)
+    if raw or not _tracked(sender, update_fields):
+        return
+    if stored is None:
+        schedule_patch(sender, [instance.pk])
+        return
+    if all(
+        getattr(instance, field) == stored[field]
+        for field in NODE_FIELDS[sender] + ("environment_id",)
+    ):
+        return
+    if sender is Resource and instance.environment_id != stored["environment_id"]:
+        # Its issues move with it.
+        schedule_rebuild(instance.environment_id, stored["environment_id"])
+        return
+    schedule_patch(
+        sender, [instance.pk],
+        environment_ids=[stored[field] for field in _location_fields(sender)],
+    )
+
+
+@receiver(pre_delete, sender=Resource, dispatch_uid="impact_resource_pre_delete")
+def resource_deleting(sender, instance, **kwargs):
+    # Its issues lose their resource through an UPDATE that sends no
+    # signals, so every graph listing them is rebuilt.
+    instance._impact_environments = {instance.environment_id, *(
+        Issue.objects.filter(resource=instance).values_list("environment_id", flat=True)
+    )}
+
+
+@receiver(post_delete, sender=Server, dispatch_uid="impact_server_deleted")
+@receiver(post_delete, sender=Resource, dispatch_uid="impact_resource_deleted")
+@receiver(post_delete, sender=Issue, dispatch_uid="impact_issue_deleted")
+def node_deleted(sender, instance, **kwargs):
+    if sender is Resource:
+        schedule_rebuild(*getattr(instance, "_impact_environments", {instance.environment_id}))
+    else:
+        schedule_patch(
+            sender, [instance.pk],
+            environment_ids=[instance.environment_id],
+            resource_ids=[getattr(instance, "resource_id", None)],
+        )
+
+
+@receiver(post_save, sender=Environment, dispatch_uid="impact_environment_saved")
+def environment_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        schedule_rebuild(instance.pk)
+
+
+@receiver(post_save, sender=Project, dispatch_uid="impact_project_saved")
+def project_saved(sender, instance, created=False, raw=False, **kwargs):
+    # The project name is denormalized into its environments' graphs.
+    if not raw and not created:
+        schedule_rebuild(*instance.environments.values_list("pk", flat=True))
+
+
+@receiver(bulk_changed, dispatch_uid="impact_bulk_changed")
+def nodes_bulk_changed(sender, pks, **kwargs):
+    if sender is Issue and pks:
+        schedule_patch(Issue, pks)
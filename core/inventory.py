@@ -0,0 +1,182 @@
+"""
+Inventory export: the Partner > Client > Project > Environment >
+Server / Resource tree as one nested JSON document.
+
+Each node type is read with a single query, ordered by its ancestors'
+ids and then its own, so every level is a stream in depth-first order.
+The writer walks the partner stream and, for each node, takes the
+matching run of rows from the child streams - a merge of sorted
+cursors. Six queries in total whatever the size of the tree, and only
+the current row of each level plus an output buffer is held in memory
+(MySQL drivers buffer each result set client side, as plain tuples).
+
+Resource ``connection_info`` is left out: it tends to hold endpoints
+and credentials that don't belong in a CMDB feed.
+"""
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DEFAULT_DB_ALIAS
+from django.utils import timezone
+
+from .models import Partner, Client, Project, Environment, Server, Resource
+
+
+CHUNK_ROWS = 2000
+FLUSH_BYTES = 64 * 1024
+
+
+class Level:
+    """
+    One node type: its fields, the lookup from it to its parent and to
+    each ancestor (root first), and its child levels.
+    """
+
+    def __init__(self, key, model, fields, ancestors=(), children=()):
+        self.key = key
+        self.model = model
+        self.fields = fields
+        self.ancestors = ancestors
+        self.children = children
+
+    def rows(self, scope, using):
+        queryset = self.model._base_manager.using(using).filter(**scope)
+        # Leading column: the parent id the merge matches on.
+        parent = [self.ancestors[-1]] if self.ancestors else []
+        return (
+            queryset
+            .order_by(*self.ancestors, "pk")
+            .values_list(*parent, *self.fields)
+            .iterator(chunk_size=CHUNK_ROWS)
+        )
+
+
+SERVERS = Level(
+    "servers", Server,
+    ("id", "name", "ip_address", "provider", "region", "ssh_user", "ssh_port", "is_active"),
+    ancestors=(
+        "environment__project__client__partner_id",
+        "environment__project__client_id",
+        "environment__project_id",
+        "environment_id",
+    ),
+)
+RESOURCES = Level(
+    "resources", Resource,
+    ("id", "name", "resource_type", "provider", "identifier", "is_critical", "is_active"),
+    ancestors=SERVERS.ancestors,
+)
+ENVIRONMENTS = Level(
+    "environments", Environment,
+    ("id", "name", "env_type", "base_url", "is_active"),
+    ancestors=("project__client__partner_id", "project__client_id", "project_id"),
+    children=(SERVERS, RESOURCES),
+)
+PROJECTS = Level(
+    "projects", Project,
+    ("id", "code", "name", "repo_url", "is_active"),
+    ancestors=("client__partner_id", "client_id"),
+    children=(ENVIRONMENTS,),
+)
+CLIENTS = Level(
+    "clients", Client,
+    ("id", "code", "name", "active"),
+    ancestors=("partner_id",),
+    children=(PROJECTS,),
+)
+PARTNERS = Level(
+    "partners", Partner,
+    ("id", "code", "name", "active"),
+    children=(CLIENTS,),
+)
+
+
+def _scope(level, partner_id=None, client_id=None):
+    """
+    Filter kwargs limiting ``level`` to a partner or client.
+    """
+    if level is PARTNERS:
+        if partner_id is not None:
+            return {"pk": partner_id}
+        if client_id is not None:
+            return {"pk__in": Client.objects.filter(pk=client_id).values("partner_id")}
+        return {}
+    if partner_id is not None:
+        return {level.ancestors[0]: partner_id}
+    if client_id is not None:
+        return {level.ancestors[1] if level is not CLIENTS else "pk": client_id}
+    return {}
+
+
+class _Cursor:
+    """
+    A sorted row stream that hands out the run of rows for one parent.
+    """
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.row = next(rows, None)
+
+    def take(self, parent_id):
+        while self.row is not None and self.row[0] == parent_id:
+            row, self.row = self.row, next(self.rows, None)
+            yield row[1:]
+
+
+def _levels(level):
+    yield level
+    for child in level.children:
+        yield from _levels(child)
+
+
+def stream(partner_id=None, client_id=None, using=DEFAULT_DB_ALIAS):
+    """
+    Yield the JSON document in chunks of roughly FLUSH_BYTES.
+    """
+    encoder = DjangoJSONEncoder(separators=(",", ":"))
+    cursors = {
+        level: _Cursor(level.rows(_scope(level, partner_id, client_id), using))
+        for level in _levels(PARTNERS) if level is not PARTNERS
+    }
+
+    buffer, size = [], 0
+
+    def write(text):
+        nonlocal size
+        buffer.append(text)
+        size += len(text)
+
+    def nodes(level, rows):
+        nonlocal size
+        first = True
+        for row in rows:
+            node = encoder.encode(dict(zip(level.fields, row)))
+            write(node[:-1] if first else "," + node[:-1])
+            first = False
+            for child in level.children:
+                write(f',"{child.key}":[')
+                yield from nodes(child, cursors[child].take(row[0]))
+                write("]")
+            write("}")
+            if size >= FLUSH_BYTES:
+                yield "".join(buffer)
+                buffer.clear()
+                size = 0
+
+    header = encoder.encode({
+        "generated_at": timezone.now(),
+        "scope": {"partner": partner_id, "client": client_id},
+    })
+    write(header[:-1] + ',"partners":[')
+    yield from nodes(PARTNERS, PARTNERS.rows(_scope(PARTNERS, partner_id, client_id), using))
+    write("]}")
+    yield "".join(buffer)
+
+
+def export(out, partner_id=None, client_id=None, using=DEFAULT_DB_ALIAS):
+    """
+    Write the document to the text file ``out``; returns characters written.
+    """
+    written = 0
+    for chunk in stream(partner_id, client_id, using):
+        out.write(chunk)
+        written += len(chunk)
+    return written
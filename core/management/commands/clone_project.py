@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.clone import clone_project
+from core.models import Client, Project
+
+
+class Command(BaseCommand):
+    help = "Copy a project's environments, servers and resources (and open issues) into a new project."
+
+    def add_arguments(self, parser):
+        parser.add_argument("project", type=int, help="Id of the project to copy.")
+        parser.add_argument("--client", type=int, help="Target client id (default: same client).")
+        parser.add_argument("--name", required=True, help="Name of the new project.")
+        parser.add_argument("--code", required=True, help="Code of the new project (unique per client).")
+        parser.add_argument(
+            "--with-issues",
+            action="store_true",
+            help="Also copy open / in progress / blocked issues.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            source = Project.objects.get(pk=options["project"])
+            client = Client.objects.get(pk=options["client"] or source.client_id)
+        except (Project.DoesNotExist, Client.DoesNotExist) as exc:
+            raise CommandError(str(exc))
+        if Project.objects.filter(client=client, code=options["code"]).exists():
+            raise CommandError(f"{client} already has a project with code '{options['code']}'.")
+
+        project, counts = clone_project(
+            source, client, options["name"], options["code"],
+            with_issues=options["with_issues"],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Created project {project.pk} ({project}): "
+            + ", ".join(f"{n} {label}" for label, n in counts.items())
+            + "."
+        ))
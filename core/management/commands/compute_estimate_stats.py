@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from core.analytics import compute_stats
+
+
+class Command(BaseCommand):
+    help = "Recompute estimate-vs-actual statistics (run periodically, e.g. nightly)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=20000,
+            help="Issues read per query (default: 20000).",
+        )
+
+    def handle(self, *args, **options):
+        written = compute_stats(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Wrote {written} estimate statistics."))
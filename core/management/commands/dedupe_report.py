@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand
+
+from core.models import Issue
+from core.similarity import duplicate_groups, rebuild_all
+
+
+class Command(BaseCommand):
+    help = "Report clusters of near-duplicate issues from the MinHash/LSH index."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=0.7,
+            help="Minimum estimated similarity, 0-1 (default: 0.7).",
+        )
+        parser.add_argument(
+            "--client",
+            type=int,
+            help="Only issues of this client id.",
+        )
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=50,
+            help="Clusters to print (default: 50).",
+        )
+        parser.add_argument(
+            "--rebuild",
+            action="store_true",
+            help="Re-index every issue before reporting.",
+        )
+
+    def handle(self, *args, **options):
+        if options["rebuild"]:
+            indexed = rebuild_all()
+            self.stdout.write(f"Indexed {indexed} issues.")
+
+        groups = duplicate_groups(options["threshold"], client_id=options["client"])
+        shown = groups[:options["limit"]]
+        issues = Issue.objects.select_related("project__client").in_bulk(
+            [pk for group in shown for pk in group]
+        )
+        for number, group in enumerate(shown, start=1):
+            self.stdout.write(f"\n#{number} ({len(group)} issues)")
+            for pk in group:
+                issue = issues[pk]
+                self.stdout.write(
+                    f"  {pk:>7}  {issue.project.client.name:<20.20}  {issue.status:<12}  {issue.title}"
+                )
+        self.stdout.write(self.style.SUCCESS(
+            f"\n{len(groups)} duplicate clusters ({sum(map(len, groups))} issues)."
+        ))
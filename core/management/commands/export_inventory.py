@@ -0,0 +1,40 @@
+import sys
+
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+
+from core.inventory import export
+
+
+class Command(BaseCommand):
+    help = "Write the partner > ... > server / resource tree as nested JSON."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "path",
+            nargs="?",
+            default="-",
+            help="Output file (default: stdout).",
+        )
+        scope = parser.add_mutually_exclusive_group()
+        scope.add_argument("--partner", type=int, help="Only this partner id.")
+        scope.add_argument("--client", type=int, help="Only this client id.")
+        parser.add_argument(
+            "--database",
+            default=DEFAULT_DB_ALIAS,
+            help="Database to read from (default: default).",
+        )
+
+    def handle(self, *args, **options):
+        scope = {
+            "partner_id": options["partner"],
+            "client_id": options["client"],
+            "using": options["database"],
+        }
+        if options["path"] == "-":
+            export(sys.stdout, **scope)
+            sys.stdout.write("\n")
+            return
+        with open(options["path"], "w", encoding="utf-8") as out:
+            written = export(out, **scope)
+        self.stderr.write(self.style.SUCCESS(f"Wrote {written} characters to {options['path']}."))
@@ -0,0 +1,42 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.timesheet import closed_until, freeze_closed, freeze_month
+
+
+class Command(BaseCommand):
+    help = "Freeze the timesheet totals of closed months."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--month",
+            help="Only this month, YYYY-MM (default: every closed month not yet frozen).",
+        )
+        parser.add_argument(
+            "--refresh",
+            action="store_true",
+            help="Recompute --month even if it is already frozen (after late corrections).",
+        )
+
+    def handle(self, *args, **options):
+        if options["refresh"] and not options["month"]:
+            raise CommandError("--refresh needs --month.")
+
+        if options["month"]:
+            try:
+                month = date.fromisoformat(options["month"] + "-01")
+            except ValueError:
+                raise CommandError("--month must be YYYY-MM.")
+            if month > closed_until():
+                raise CommandError(f"{options['month']} is not closed yet.")
+            frozen = freeze_month(month, refresh=options["refresh"])
+            self.stdout.write(self.style.SUCCESS(
+                f"{frozen.month:%Y-%m}: {frozen.hours}h in {frozen.entries} activities."
+            ))
+            return
+
+        months = freeze_closed()
+        for month in months:
+            self.stdout.write(f"  {month:%Y-%m}")
+        self.stdout.write(self.style.SUCCESS(f"Froze {len(months)} month(s)."))
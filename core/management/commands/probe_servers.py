@@ -0,0 +1,61 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from core.models import Server
+from core.probe import probe_servers, prune_probes
+
+
+class Command(BaseCommand):
+    help = "TCP-probe the SSH port of every active server and store the results."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--concurrency", type=int, default=500,
+            help="Maximum probes in flight (default: 500; mind `ulimit -n`).",
+        )
+        parser.add_argument(
+            "--timeout", type=float, default=3.0,
+            help="Per-host connect timeout in seconds (default: 3).",
+        )
+        parser.add_argument(
+            "--jitter", type=float, default=0.5,
+            help="Random start delay per probe, in seconds (default: 0.5).",
+        )
+        parser.add_argument(
+            "--environment", type=int,
+            help="Only probe servers of this environment id.",
+        )
+        parser.add_argument(
+            "--interval", type=int, default=0,
+            help="Keep running, probing every N seconds (background job mode).",
+        )
+        parser.add_argument(
+            "--keep-days", type=int, default=30,
+            help="Delete probe history older than this after each run (default: 30).",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            queryset = Server.objects.filter(is_active=True)
+            if options["environment"]:
+                queryset = queryset.filter(environment_id=options["environment"])
+
+            started = time.monotonic()
+            probed, up = probe_servers(
+                queryset,
+                concurrency=options["concurrency"],
+                timeout=options["timeout"],
+                jitter=options["jitter"],
+            )
+            pruned = prune_probes(options["keep_days"])
+            self.stdout.write(
+                f"Probed {probed} servers in {time.monotonic() - started:.1f}s: "
+                f"{up} up, {probed - up} down ({pruned} old probes pruned)."
+            )
+
+            if not options["interval"]:
+                break
+            close_old_connections()
+            time.sleep(options["interval"])
@@ -0,0 +1,51 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import Partner, Client
+from core.purge import DEFAULT_BATCH_SIZE, PurgeBlocked, PurgePlan
+
+
+class Command(BaseCommand):
+    help = "Delete a partner or client and everything under it, in batches."
+
+    def add_arguments(self, parser):
+        scope = parser.add_mutually_exclusive_group(required=True)
+        scope.add_argument("--partner", type=int, help="Partner id to purge.")
+        scope.add_argument("--client", type=int, help="Client id to purge.")
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help=f"Rows deleted per statement (default: {DEFAULT_BATCH_SIZE}).",
+        )
+        parser.add_argument(
+            "--yes",
+            action="store_true",
+            help="Don't ask for confirmation.",
+        )
+
+    def handle(self, *args, **options):
+        model, pk = (Partner, options["partner"]) if options["partner"] else (Client, options["client"])
+        root = model.objects.filter(pk=pk).first()
+        if root is None:
+            raise CommandError(f"No {model._meta.verbose_name} {pk}.")
+
+        plan = PurgePlan(root)
+        self.stdout.write(f"Purging {model._meta.verbose_name} {root}:")
+        for counted, deleted, unlinked in plan.counts():
+            name = counted._meta.verbose_name_plural
+            if deleted:
+                self.stdout.write(f"  {name}: {deleted} to delete")
+            if unlinked:
+                self.stdout.write(f"  {name}: {unlinked} to unlink")
+
+        if not options["yes"] and input("Type 'yes' to continue: ").strip() != "yes":
+            raise CommandError("Cancelled.")
+
+        try:
+            deleted = plan.execute(
+                batch_size=options["batch_size"],
+                progress=lambda m, done: self.stdout.write(f"  {m._meta.verbose_name_plural}: {done}"),
+            )
+        except PurgeBlocked as exc:
+            raise CommandError(str(exc))
+        self.stdout.write(self.style.SUCCESS(f"Deleted {sum(deleted.values())} rows."))
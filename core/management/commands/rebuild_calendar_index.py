@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from core.calendar_index import rebuild_all
+
+
+class Command(BaseCommand):
+    help = "Rebuild the issue week buckets behind the calendar endpoint."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Issues indexed per batch (default: 1000).",
+        )
+
+    def handle(self, *args, **options):
+        indexed = rebuild_all(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Indexed {indexed} issues."))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from core.impact import rebuild_all
+
+
+class Command(BaseCommand):
+    help = "Rebuild the impact index (environment -> servers/resources/open issues)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Environments built per batch (default: 500).",
+        )
+
+    def handle(self, *args, **options):
+        built = rebuild_all(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Indexed {built} environments."))
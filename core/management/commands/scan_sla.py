@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from core.sla import scan
+
+
+class Command(BaseCommand):
+    help = "Recompute SLA deadlines and breach state for all open issues."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Issues loaded and upserted per batch (default: 1000).",
+        )
+
+    def handle(self, *args, **options):
+        scanned, breached = 0, 0
+        for scanned, batch_breached in scan(batch_size=options["batch_size"]):
+            breached += batch_breached
+            if options["verbosity"] > 1:
+                self.stdout.write(f"  {scanned} issues scanned")
+        self.stdout.write(self.style.SUCCESS(
+            f"Scanned {scanned} open issues, {breached} breached."
+        ))
@@ -0,0 +1,45 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.digest import build, send, Renderer
+
+
+class Command(BaseCommand):
+    help = "Email each assignee / project manager a digest of their open issues."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--date",
+            help="Day the digest is for, YYYY-MM-DD (default: today).",
+        )
+        parser.add_argument(
+            "--user",
+            type=int,
+            action="append",
+            dest="users",
+            help="Only this user id (repeatable).",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Build and render the digests without sending them.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            today = date.fromisoformat(options["date"]) if options["date"] else date.today()
+        except ValueError:
+            raise CommandError("--date must be YYYY-MM-DD.")
+
+        digests = build(today, user_ids=set(options["users"]) if options["users"] else None)
+        if options["dry_run"]:
+            renderer = Renderer(today)
+            for digest in digests:
+                message = renderer.message(digest)
+                self.stdout.write(f"  {digest.user['email']}: {message.subject}")
+            self.stdout.write(self.style.SUCCESS(f"{len(digests)} digests built (dry run)."))
+            return
+
+        sent = send(digests, today)
+        self.stdout.write(self.style.SUCCESS(f"Sent {sent} of {len(digests)} digests."))
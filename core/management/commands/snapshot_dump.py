@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+from core.models import Partner, Client
+from core.snapshot import dump
+
+
+class Command(BaseCommand):
+    help = (
+        "Dump the core tables (optionally one partner or client) to a compressed "
+        "snapshot file. Snapshots contain connection details: store them like secrets."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Output file, e.g. kilowott.snapshot.gz")
+        scope = parser.add_mutually_exclusive_group()
+        scope.add_argument("--partner", type=int, help="Only this partner id.")
+        scope.add_argument("--client", type=int, help="Only this client id.")
+        parser.add_argument(
+            "--no-history",
+            action="store_true",
+            help="Leave out server probes and audit entries.",
+        )
+        parser.add_argument(
+            "--database",
+            default=DEFAULT_DB_ALIAS,
+            help="Database to read from (default: default).",
+        )
+
+    def handle(self, *args, **options):
+        if options["partner"] and not Partner.objects.filter(pk=options["partner"]).exists():
+            raise CommandError(f"No partner {options['partner']}.")
+        if options["client"] and not Client.objects.filter(pk=options["client"]).exists():
+            raise CommandError(f"No client {options['client']}.")
+
+        counts = dump(
+            options["path"],
+            partner_id=options["partner"],
+            client_id=options["client"],
+            history=not options["no_history"],
+            using=options["database"],
+            progress=lambda label, rows: self.stdout.write(f"  {label}: {rows}"),
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {sum(counts.values())} rows from {len(counts)} tables to {options['path']}."
+        ))
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+from core.snapshot import SnapshotError, restore
+
+
+class Command(BaseCommand):
+    help = (
+        "Restore a snapshot written by snapshot_dump, in one transaction. "
+        "The tenant's rows must not exist in the target database yet."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Snapshot file.")
+        parser.add_argument(
+            "--database",
+            default=DEFAULT_DB_ALIAS,
+            help="Database to restore into (default: default).",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            counts = restore(
+                options["path"],
+                using=options["database"],
+                progress=lambda label, rows: self.stdout.write(f"  {label}: {rows}"),
+            )
+        except (OSError, ValueError, SnapshotError) as exc:
+            raise CommandError(f"Restore failed, nothing was changed: {exc}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Restored {sum(counts.values())} rows into {len(counts)} tables."
+        ))
@@ -0,0 +1,76 @@
+import time
+
+from django.conf import settings
+
+from . import profiling
+from .audit import reset_current_request, set_current_request
+from .db.routers import replica_aliases, use_primary
+
+
+class ReplicaStickinessMiddleware:
+    """
+    Read-your-writes for replica-safe views.
+
+    Any unsafe request (admin save, delete, bulk action...) sets a short
+    lived cookie; while it is present, reads for that browser are pinned
+    to the primary so the user never sees a replica that lags behind the
+    change they just made.
+    """
+    cookie_name = "infra_db_pin"
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not replica_aliases():
+            return self.get_response(request)
+
+        pinned_until = request.COOKIES.get(self.cookie_name, "")
+        if pinned_until.isdigit() and int(pinned_until) > time.time():
+            with use_primary():
+                response = self.get_response(request)
+        else:
+            response = self.get_response(request)
+
+        if request.method not in ("GET", "HEAD", "OPTIONS", "TRACE"):
+            seconds = getattr(settings, "DATABASE_REPLICA_STICKY_SECONDS", 5)
+            response.set_cookie(
+                self.cookie_name,
+                str(int(time.time() + seconds)),
+                max_age=seconds,
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
+
+
+class AuditRequestMiddleware:
+    """
+    Credit audit entries written during the request to its user.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = set_current_request(request)
+        try:
+            return self.get_response(request)
+        finally:
+            reset_current_request(token)
+
+
+class ProfilingMiddleware:
+    """
+    Run requests selected by a ProfileTrigger under the sampling
+    profiler (core.profiling); everything else passes straight through.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        trigger_id = profiling.match(request)
+        if trigger_id is None:
+            return self.get_response(request)
+        return profiling.run(request, self.get_response, trigger_id)
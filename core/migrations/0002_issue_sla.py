@@ -0,0 +1,41 @@
+# Generated by Django 5.2.8 on 2026-10-19 06:05
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IssueSLA',
+            fields=[
+                ('issue', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='sla', serialize=False, to='core.issue')),
+                ('deadline', models.DateTimeField(help_text='Earlier of created_at + priority SLA and the due date.')),
+                ('state', models.PositiveSmallIntegerField(choices=[(0, 'On track'), (1, 'At risk'), (2, 'Breached')], default=0)),
+                ('checked_at', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name': 'Issue SLA',
+                'verbose_name_plural': 'Issue SLAs',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='issue',
+            index=models.Index(fields=['status', 'priority', 'due_date'], name='issue_status_prio_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='issuesla',
+            index=models.Index(fields=['deadline'], name='issuesla_deadline_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='issuesla',
+            index=models.Index(fields=['state', 'deadline'], name='issuesla_state_deadline_idx'),
+        ),
+    ]
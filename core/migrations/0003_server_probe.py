@@ -0,0 +1,29 @@
+# Generated by Django 5.2.8 on 2026-10-19 06:06
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_issue_sla'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ServerProbe',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('checked_at', models.DateTimeField()),
+                ('is_up', models.BooleanField()),
+                ('latency_ms', models.PositiveIntegerField(blank=True, null=True)),
+                ('error', models.CharField(blank=True, max_length=60)),
+                ('server', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='probes', to='core.server')),
+            ],
+            options={
+                'ordering': ['-checked_at'],
+                'indexes': [models.Index(fields=['server', '-checked_at'], name='serverprobe_latest_idx'), models.Index(fields=['checked_at'], name='serverprobe_checked_idx')],
+            },
+        ),
+    ]
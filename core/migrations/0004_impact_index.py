@@ -0,0 +1,26 @@
+# Generated by Django 5.2.8 on 2026-10-19 06:07
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_server_probe'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImpactIndex',
+            fields=[
+                ('environment', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='impact_index', serialize=False, to='core.environment')),
+                ('graph', models.JSONField(default=dict)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Impact index',
+                'verbose_name_plural': 'Impact index',
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.8 on 2026-10-19 06:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_impact_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuditEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ts', models.DateTimeField()),
+                ('model_code', models.PositiveSmallIntegerField()),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('action', models.PositiveSmallIntegerField(choices=[(1, 'Created'), (2, 'Updated'), (3, 'Deleted')])),
+                ('field_code', models.PositiveSmallIntegerField(default=0)),
+                ('old_value', models.CharField(blank=True, max_length=255)),
+                ('new_value', models.CharField(blank=True, max_length=255)),
+                ('partner_id', models.PositiveBigIntegerField(blank=True, null=True)),
+                ('user_id', models.PositiveIntegerField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Audit entry',
+                'verbose_name_plural': 'Audit entries',
+                'indexes': [models.Index(fields=['model_code', 'object_id', 'ts'], name='audit_object_idx'), models.Index(fields=['partner_id', 'ts'], name='audit_tenant_idx')],
+            },
+        ),
+    ]
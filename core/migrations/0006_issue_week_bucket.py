@@ -0,0 +1,28 @@
+# Generated by Django 5.2.8 on 2026-10-19 06:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_audit_entry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IssueWeekBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('week', models.PositiveIntegerField(help_text='Monday-based week number (date.toordinal() - 1) // 7.')),
+                ('client_id', models.PositiveBigIntegerField()),
+                ('assignee_id', models.PositiveIntegerField(blank=True, null=True)),
+                ('issue', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='week_buckets', to='core.issue')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['client_id', 'week'], name='weekbucket_client_idx'), models.Index(fields=['assignee_id', 'week'], name='weekbucket_assignee_idx')],
+                'unique_together': {('issue', 'week')},
+            },
+        ),
+    ]
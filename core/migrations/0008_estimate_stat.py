@@ -0,0 +1,34 @@
+# Generated by Django 5.2.8 on 2026-10-19 06:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_issue_similarity'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EstimateStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dimension', models.CharField(choices=[('all', 'All issues'), ('activity_type', 'Activity type'), ('client', 'Client'), ('assignee', 'Assignee')], max_length=20)),
+                ('key', models.CharField(blank=True, help_text='Lower-cased activity type, or the client / user id.', max_length=100)),
+                ('sample_size', models.PositiveIntegerField()),
+                ('ratio_mean', models.FloatField()),
+                ('ratio_p50', models.FloatField()),
+                ('ratio_p80', models.FloatField()),
+                ('ratio_p90', models.FloatField()),
+                ('hours_p50', models.FloatField(help_text='Median actual hours.')),
+                ('hours_p80', models.FloatField()),
+                ('overrun_share', models.FloatField(help_text='Share of issues over their estimate.')),
+                ('computed_at', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name': 'Estimate statistic',
+                'unique_together': {('dimension', 'key')},
+            },
+        ),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 5.2.8 on 2026-10-19 06:30
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_saved_search'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TimesheetDay',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('month', models.DateField(help_text='First day of the month.')),
+                ('client_id', models.PositiveBigIntegerField()),
+                ('hours', models.DecimalField(decimal_places=2, max_digits=9)),
+                ('entries', models.PositiveIntegerField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='TimesheetMonth',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(help_text='First day of the month.', unique=True)),
+                ('frozen_at', models.DateTimeField()),
+                ('hours', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('entries', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['-month'],
+            },
+        ),
+        migrations.AddField(
+            model_name='infraactivity',
+            name='performed_by',
+            field=models.ForeignKey(blank=True, help_text='Who did the work (timesheets bill these hours to them).', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='activities_performed', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='infraactivity',
+            index=models.Index(fields=['activity_date', 'performed_by'], name='activity_date_user_idx'),
+        ),
+        migrations.AddField(
+            model_name='timesheetday',
+            name='project',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='timesheet_days', to='core.project'),
+        ),
+        migrations.AddField(
+            model_name='timesheetday',
+            name='user',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='timesheet_days', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='timesheetday',
+            index=models.Index(fields=['day', 'user'], name='timesheet_day_user_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='timesheetday',
+            index=models.Index(fields=['month'], name='timesheet_month_idx'),
+        ),
+    ]
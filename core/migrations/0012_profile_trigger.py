@@ -0,0 +1,33 @@
+# Generated by Django 5.2.8 on 2026-10-19 06:36
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_typeahead_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProfileTrigger',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('path_pattern', models.CharField(blank=True, help_text='Regular expression searched in the request path (blank: any path).', max_length=200)),
+                ('sample_rate', models.PositiveIntegerField(default=1, help_text='Profile 1 in N matching requests.')),
+                ('active', models.BooleanField(default=True)),
+                ('expires_at', models.DateTimeField(blank=True, help_text='Stop profiling after this time (blank: until deactivated).', null=True)),
+                ('note', models.CharField(blank=True, max_length=200)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('user', models.ForeignKey(blank=True, help_text="Only this user's requests (blank: anyone's).", null=True, on_delete=django.db.models.deletion.CASCADE, related_name='profile_triggers', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.8 on 2026-10-19 06:40
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_profile_trigger'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='issue',
+            name='occurrence_key',
+            field=models.CharField(blank=True, editable=False, help_text='Set on issues generated from a RecurrenceRule: rule and date.', max_length=40, null=True, unique=True),
+        ),
+        migrations.CreateModel(
+            name='RecurrenceRule',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=255)),
+                ('description', models.TextField(blank=True)),
+                ('activity_type', models.CharField(blank=True, max_length=100)),
+                ('priority', models.CharField(choices=[('low', 'Low'), ('medium', 'Medium'), ('high', 'High'), ('critical', 'Critical')], default='medium', max_length=20)),
+                ('estimate_hours', models.DecimalField(decimal_places=2, default=0, max_digits=5)),
+                ('frequency', models.CharField(choices=[('daily', 'Daily'), ('weekly', 'Weekly'), ('monthly', 'Monthly'), ('quarterly', 'Quarterly'), ('yearly', 'Yearly')], max_length=10)),
+                ('interval', models.PositiveSmallIntegerField(default=1, help_text='Every N days / weeks / months / quarters / years.')),
+                ('start_date', models.DateField(help_text='First occurrence; later ones keep its weekday / day of month.')),
+                ('end_date', models.DateField(blank=True, null=True)),
+                ('due_after_days', models.PositiveSmallIntegerField(default=0, help_text='Due date = occurrence date + this many days.')),
+                ('active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('assigned_to', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='recurrence_rules', to=settings.AUTH_USER_MODEL)),
+                ('environment', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='recurrence_rules', to='core.environment')),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recurrence_rules', to='core.project')),
+                ('project_manager', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='managed_recurrence_rules', to=settings.AUTH_USER_MODEL)),
+                ('resource', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='recurrence_rules', to='core.resource')),
+            ],
+            options={
+                'ordering': ['project', 'title'],
+            },
+        ),
+    ]
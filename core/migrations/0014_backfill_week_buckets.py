@@ -0,0 +1,42 @@
+# Generated by Django 5.2.8 on 2026-10-19 09:40
+
+from django.db import migrations
+
+
+def backfill(apps, schema_editor):
+    """
+    Bucket the issues that existed before the calendar index (0006); new
+    ones are indexed as they are saved.
+    """
+    from core.calendar_index import bucket_weeks
+
+    Issue = apps.get_model("core", "Issue")
+    IssueWeekBucket = apps.get_model("core", "IssueWeekBucket")
+    base = (
+        Issue.objects
+        .filter(week_buckets__isnull=True)
+        .order_by("pk")
+        .values_list("pk", "project__client_id", "activity_date", "due_date", "assigned_to_id")
+    )
+    last_pk = 0
+    while True:
+        rows = list(base.filter(pk__gt=last_pk)[:1000])
+        if not rows:
+            return
+        IssueWeekBucket.objects.bulk_create([
+            IssueWeekBucket(issue_id=pk, week=week, client_id=client_id, assignee_id=assignee_id)
+            for pk, client_id, activity_date, due_date, assignee_id in rows
+            for week in bucket_weeks(activity_date, due_date)
+        ], batch_size=1000)
+        last_pk = rows[-1][0]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_recurrence'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill, migrations.RunPython.noop, elidable=True),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.8 on 2026-10-19 09:55
+
+from django.db import migrations
+from django.utils import timezone
+
+
+def backfill(apps, schema_editor):
+    """
+    SLA rows for the open issues that existed before the SLA engine
+    (0002); ``manage.py scan_sla`` keeps them current from then on.
+    """
+    from core.sla import OPEN_STATUSES, at_risk_window, compute_deadline, compute_state, sla_hours
+
+    Issue = apps.get_model("core", "Issue")
+    IssueSLA = apps.get_model("core", "IssueSLA")
+    now, targets, window = timezone.now(), sla_hours(), at_risk_window()
+    base = (
+        Issue.objects
+        .filter(status__in=OPEN_STATUSES, sla__isnull=True)
+        .order_by("pk")
+        .values_list("pk", "priority", "created_at", "due_date")
+    )
+    last_pk = 0
+    while True:
+        rows = list(base.filter(pk__gt=last_pk)[:1000])
+        if not rows:
+            return
+        slas = []
+        for pk, priority, created_at, due_date in rows:
+            deadline = compute_deadline(priority, created_at, due_date, targets)
+            slas.append(IssueSLA(
+                issue_id=pk,
+                deadline=deadline,
+                state=compute_state(deadline, now, window),
+                checked_at=now,
+            ))
+        IssueSLA.objects.bulk_create(slas)
+        last_pk = rows[-1][0]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_backfill_week_buckets'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill, migrations.RunPython.noop, elidable=True),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.8 on 2026-10-19 10:10
+
+from django.db import migrations
+
+
+def backfill(apps, schema_editor):
+    """
+    Graphs for the environments that existed before the impact index
+    (0004). The graph format belongs to core.impact, so its current
+    ``rebuild`` builds them; nothing runs on a database without any.
+    """
+    Environment = apps.get_model("core", "Environment")
+    missing = list(
+        Environment.objects
+        .filter(impact_index__isnull=True)
+        .order_by("pk")
+        .values_list("pk", flat=True)
+    )
+    if missing:
+        from core.impact import rebuild
+
+        rebuild(missing)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_backfill_issue_sla'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill, migrations.RunPython.noop, elidable=True),
+    ]
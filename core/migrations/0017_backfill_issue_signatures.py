@@ -0,0 +1,38 @@
+# Generated by Django 5.2.8 on 2026-10-19 10:25
+
+from django.db import migrations
+
+
+def backfill(apps, schema_editor):
+    """
+    Signatures and LSH buckets for the issues that existed before the
+    similarity index (0007). The hashing belongs to core.similarity, so
+    its current ``index_rows`` writes them.
+    """
+    from core.similarity import ROW_FIELDS, index_rows
+
+    Issue = apps.get_model("core", "Issue")
+    base = (
+        Issue.objects
+        .filter(signature__isnull=True)
+        .order_by("pk")
+        .values_list(*ROW_FIELDS)
+    )
+    last_pk = 0
+    while True:
+        rows = list(base.filter(pk__gt=last_pk)[:500])
+        if not rows:
+            return
+        index_rows(rows)
+        last_pk = rows[-1][0]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0016_backfill_impact_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill, migrations.RunPython.noop, elidable=True),
+    ]
@@ -1,7 +1,10 @@
+import re
 from datetime import date
 
+from django.core.exceptions import ValidationError
 from django.db import models
 from django.contrib.auth.models import User
+from django.utils import timezone
 
 
 class Partner(models.Model):
@@ -47,6 +50,10 @@ class Client(models.Model):
     class Meta:
         unique_together = ("partner", "code")
         ordering = ["partner", "name"]
+        indexes = [
+            # Header typeahead: name prefix lookups.
+            models.Index(fields=["name"], name="client_name_idx"),
+        ]
 
     def __str__(self) -> str:
         return f"{self.partner.name} / {self.name}"
@@ -74,6 +81,9 @@ class Project(models.Model):
     class Meta:
         unique_together = ("client", "code")
         ordering = ["client", "name"]
+        indexes = [
+            models.Index(fields=["name"], name="project_name_idx"),
+        ]
 
     def __str__(self) -> str:
         return f"{self.client} / {self.name}"
@@ -162,6 +172,9 @@ class Server(models.Model):
 
     class Meta:
         ordering = ["environment", "name"]
+        indexes = [
+            models.Index(fields=["name"], name="server_name_idx"),
+        ]
 
     def __str__(self) -> str:
         return f"{self.name} ({self.ip_address})"
@@ -211,6 +224,9 @@ class Resource(models.Model):
 
     class Meta:
         ordering = ["environment", "resource_type", "name"]
+        indexes = [
+            models.Index(fields=["name"], name="resource_name_idx"),
+        ]
 
     def __str__(self) -> str:
         return f"{self.name} ({self.resource_type})"
@@ -351,11 +367,28 @@ class Issue(models.Model):
         help_text="Person actually working on this issue.",
     )
 
+    occurrence_key = models.CharField(
+        max_length=40,
+        null=True,
+        blank=True,
+        unique=True,
+        editable=False,
+        help_text="Set on issues generated from a RecurrenceRule: rule and date.",
+    )
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ["-activity_date", "-created_at"]
+        indexes = [
+            # SLA scans walk open work by status, then priority/due date.
+            models.Index(
+                fields=["status", "priority", "due_date"],
+                name="issue_status_prio_due_idx",
+            ),
+            models.Index(fields=["title"], name="issue_title_idx"),
+        ]
 
     def __str__(self) -> str:
         return f"{self.project} - {self.title}"
@@ -407,10 +440,496 @@ class InfraActivity(models.Model):
         default=0,
         help_text="Hours spent for this activity.",
     )
+    performed_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="activities_performed",
+        help_text="Who did the work (timesheets bill these hours to them).",
+    )
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         ordering = ["-activity_date", "-created_at"]
+        indexes = [
+            # Timesheets: date range first, grouped by user.
+            models.Index(fields=["activity_date", "performed_by"], name="activity_date_user_idx"),
+        ]
 
     def __str__(self) -> str:
         return f"{self.activity_date} - {self.issue.title}"
+
+
+class IssueSLA(models.Model):
+    """
+    SLA deadline and breach state of an open issue.
+    Maintained by core.sla (on save and by `manage.py scan_sla`).
+    """
+    STATE_OK = 0
+    STATE_AT_RISK = 1
+    STATE_BREACHED = 2
+    STATE_CHOICES = [
+        (STATE_OK, "On track"),
+        (STATE_AT_RISK, "At risk"),
+        (STATE_BREACHED, "Breached"),
+    ]
+
+    issue = models.OneToOneField(
+        Issue,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="sla",
+    )
+    deadline = models.DateTimeField(
+        help_text="Earlier of created_at + priority SLA and the due date.",
+    )
+    state = models.PositiveSmallIntegerField(
+        choices=STATE_CHOICES,
+        default=STATE_OK,
+    )
+    checked_at = models.DateTimeField()
+
+    class Meta:
+        verbose_name = "Issue SLA"
+        verbose_name_plural = "Issue SLAs"
+        indexes = [
+            models.Index(fields=["deadline"], name="issuesla_deadline_idx"),
+            models.Index(fields=["state", "deadline"], name="issuesla_state_deadline_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"SLA for issue {self.issue_id} ({self.get_state_display()})"
+
+    @property
+    def time_to_breach(self):
+        """
+        Remaining time until the deadline (negative once breached).
+        """
+        return self.deadline - timezone.now()
+
+
+class ServerProbe(models.Model):
+    """
+    One TCP reachability check of a server's SSH port.
+    Written in bulk by `manage.py probe_servers`.
+    """
+    server = models.ForeignKey(
+        Server,
+        on_delete=models.CASCADE,
+        related_name="probes",
+    )
+    checked_at = models.DateTimeField()
+    is_up = models.BooleanField()
+    latency_ms = models.PositiveIntegerField(null=True, blank=True)
+    error = models.CharField(max_length=60, blank=True)
+
+    class Meta:
+        ordering = ["-checked_at"]
+        indexes = [
+            models.Index(fields=["server", "-checked_at"], name="serverprobe_latest_idx"),
+            models.Index(fields=["checked_at"], name="serverprobe_checked_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.server_id} {'up' if self.is_up else 'down'} @ {self.checked_at:%Y-%m-%d %H:%M}"
+
+
+class ImpactIndex(models.Model):
+    """
+    Precomputed adjacency of one environment: its servers, resources and
+    open issues, so "blast radius of X" is a single row lookup.
+    Maintained by core.impact.
+    """
+    environment = models.OneToOneField(
+        Environment,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="impact_index",
+    )
+    graph = models.JSONField(default=dict)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Impact index"
+        verbose_name_plural = "Impact index"
+
+    def __str__(self) -> str:
+        return f"Impact index for environment {self.environment_id}"
+
+
+class AuditEntry(models.Model):
+    """
+    Append-only, field-level change history (see core.audit).
+    Models and fields are stored as small integer codes; ids are plain
+    integers so history survives deletes.
+    """
+    ACTION_CREATE = 1
+    ACTION_UPDATE = 2
+    ACTION_DELETE = 3
+    ACTION_CHOICES = [
+        (ACTION_CREATE, "Created"),
+        (ACTION_UPDATE, "Updated"),
+        (ACTION_DELETE, "Deleted"),
+    ]
+
+    ts = models.DateTimeField()
+    model_code = models.PositiveSmallIntegerField()
+    object_id = models.PositiveBigIntegerField()
+    action = models.PositiveSmallIntegerField(choices=ACTION_CHOICES)
+    field_code = models.PositiveSmallIntegerField(default=0)
+    old_value = models.CharField(max_length=255, blank=True)
+    new_value = models.CharField(max_length=255, blank=True)
+    partner_id = models.PositiveBigIntegerField(null=True, blank=True)
+    user_id = models.PositiveIntegerField(null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Audit entry"
+        verbose_name_plural = "Audit entries"
+        indexes = [
+            models.Index(fields=["model_code", "object_id", "ts"], name="audit_object_idx"),
+            models.Index(fields=["partner_id", "ts"], name="audit_tenant_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.ts:%Y-%m-%d %H:%M} {self.model_code}:{self.object_id} {self.get_action_display()}"
+
+
+class IssueWeekBucket(models.Model):
+    """
+    One row per calendar week an issue spans (activity_date..due_date),
+    with its client and assignee copied in, so "everything overlapping
+    these weeks" is an index range scan. Maintained by core.calendar_index.
+    """
+    issue = models.ForeignKey(
+        Issue,
+        on_delete=models.CASCADE,
+        related_name="week_buckets",
+    )
+    week = models.PositiveIntegerField(
+        help_text="Monday-based week number (date.toordinal() - 1) // 7.",
+    )
+    client_id = models.PositiveBigIntegerField()
+    assignee_id = models.PositiveIntegerField(null=True, blank=True)
+
+    class Meta:
+        unique_together = ("issue", "week")
+        indexes = [
+            models.Index(fields=["client_id", "week"], name="weekbucket_client_idx"),
+            models.Index(fields=["assignee_id", "week"], name="weekbucket_assignee_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"Issue {self.issue_id} in week {self.week}"
+
+
+class IssueSignature(models.Model):
+    """
+    MinHash signature of an issue's title / activity type / description,
+    maintained by core.similarity.
+    """
+    issue = models.OneToOneField(
+        Issue,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="signature",
+    )
+    minhash = models.BinaryField(help_text="Packed little-endian uint32 minimums.")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self) -> str:
+        return f"Signature of issue {self.issue_id}"
+
+
+class IssueLSHBucket(models.Model):
+    """
+    One row per (issue, LSH band): issues sharing any (band, bucket) pair
+    are similarity candidates.
+    """
+    issue = models.ForeignKey(
+        Issue,
+        on_delete=models.CASCADE,
+        related_name="lsh_buckets",
+    )
+    band = models.PositiveSmallIntegerField()
+    bucket = models.BigIntegerField()
+
+    class Meta:
+        unique_together = ("issue", "band")
+        indexes = [
+            models.Index(fields=["band", "bucket"], name="lsh_band_bucket_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"Issue {self.issue_id} band {self.band}"
+
+
+class EstimateStat(models.Model):
+    """
+    Estimate-vs-actual distribution of finished issues for one activity
+    type, client or assignee (or all issues). Recomputed periodically by
+    ``manage.py compute_estimate_stats``; see core.analytics.
+    """
+    DIMENSION_CHOICES = [
+        ("all", "All issues"),
+        ("activity_type", "Activity type"),
+        ("client", "Client"),
+        ("assignee", "Assignee"),
+    ]
+
+    dimension = models.CharField(max_length=20, choices=DIMENSION_CHOICES)
+    key = models.CharField(
+        max_length=100,
+        blank=True,
+        help_text="Lower-cased activity type, or the client / user id.",
+    )
+    sample_size = models.PositiveIntegerField()
+
+    # actual_hours / estimate_hours
+    ratio_mean = models.FloatField()
+    ratio_p50 = models.FloatField()
+    ratio_p80 = models.FloatField()
+    ratio_p90 = models.FloatField()
+
+    hours_p50 = models.FloatField(help_text="Median actual hours.")
+    hours_p80 = models.FloatField()
+    overrun_share = models.FloatField(help_text="Share of issues over their estimate.")
+
+    computed_at = models.DateTimeField()
+
+    class Meta:
+        unique_together = ("dimension", "key")
+        verbose_name = "Estimate statistic"
+
+    def __str__(self) -> str:
+        return f"{self.get_dimension_display()} {self.key}".strip()
+
+
+class SavedSearch(models.Model):
+    """
+    A user's named global search or Issue list filter (see core.search).
+    """
+    KIND_SEARCH = "search"
+    KIND_ISSUES = "issues"
+    KIND_CHOICES = [
+        (KIND_SEARCH, "Global search"),
+        (KIND_ISSUES, "Issue filter"),
+    ]
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="saved_searches",
+    )
+    name = models.CharField(max_length=100)
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    query = models.CharField(
+        max_length=1000,
+        help_text="Search text, or the Issue list query string.",
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["name"]
+        unique_together = ("user", "name")
+        verbose_name_plural = "Saved searches"
+
+    def __str__(self) -> str:
+        return self.name
+
+
+class TimesheetMonth(models.Model):
+    """
+    A frozen (closed) month of timesheet data; see TimesheetDay.
+    """
+    month = models.DateField(unique=True, help_text="First day of the month.")
+    frozen_at = models.DateTimeField()
+    hours = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    entries = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ["-month"]
+
+    def __str__(self) -> str:
+        return f"{self.month:%Y-%m} (frozen {self.frozen_at:%Y-%m-%d})"
+
+
+class TimesheetDay(models.Model):
+    """
+    Activity hours per day, user and project of a closed month, written
+    once by core.timesheet when the month is frozen. Reports over closed
+    periods read these rows instead of re-aggregating the activities.
+    """
+    day = models.DateField()
+    month = models.DateField(help_text="First day of the month.")
+    user = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="timesheet_days",
+    )
+    project = models.ForeignKey(
+        Project,
+        on_delete=models.CASCADE,
+        related_name="timesheet_days",
+    )
+    client_id = models.PositiveBigIntegerField()
+    hours = models.DecimalField(max_digits=9, decimal_places=2)
+    entries = models.PositiveIntegerField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["day", "user"], name="timesheet_day_user_idx"),
+            models.Index(fields=["month"], name="timesheet_month_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.day} user {self.user_id} project {self.project_id}: {self.hours}h"
+
+
+class ProfileTrigger(models.Model):
+    """
+    Which requests the sampling profiler (core.profiling) runs on: a
+    user's, those whose path matches a pattern, or 1 in N of them.
+    """
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="profile_triggers",
+        help_text="Only this user's requests (blank: anyone's).",
+    )
+    path_pattern = models.CharField(
+        max_length=200,
+        blank=True,
+        help_text="Regular expression searched in the request path (blank: any path).",
+    )
+    sample_rate = models.PositiveIntegerField(
+        default=1,
+        help_text="Profile 1 in N matching requests.",
+    )
+    active = models.BooleanField(default=True)
+    expires_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="Stop profiling after this time (blank: until deactivated).",
+    )
+    note = models.CharField(max_length=200, blank=True)
+    created_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    def clean(self):
+        if self.sample_rate is not None and self.sample_rate < 1:
+            raise ValidationError({"sample_rate": "Must be at least 1."})
+        try:
+            re.compile(self.path_pattern)
+        except re.error as exc:
+            raise ValidationError({"path_pattern": f"Invalid regular expression: {exc}"})
+
+    def __str__(self) -> str:
+        who = self.user or "anyone"
+        return f"{self.path_pattern or '*'} for {who}, 1 in {self.sample_rate}"
+
+
+class RecurrenceRule(models.Model):
+    """
+    Recurring maintenance (SSL renewals, backups, patch windows) on a
+    project, environment or resource; ``manage.py schedule_recurring``
+    turns its occurrences into Issues (see core.recurrence).
+    """
+    FREQUENCY_CHOICES = [
+        ("daily", "Daily"),
+        ("weekly", "Weekly"),
+        ("monthly", "Monthly"),
+        ("quarterly", "Quarterly"),
+        ("yearly", "Yearly"),
+    ]
+
+    project = models.ForeignKey(
+        Project,
+        on_delete=models.CASCADE,
+        related_name="recurrence_rules",
+    )
+    environment = models.ForeignKey(
+        Environment,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="recurrence_rules",
+    )
+    resource = models.ForeignKey(
+        Resource,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="recurrence_rules",
+    )
+
+    title = models.CharField(max_length=255)
+    description = models.TextField(blank=True)
+    activity_type = models.CharField(max_length=100, blank=True)
+    priority = models.CharField(
+        max_length=20,
+        choices=Issue.PRIORITY_CHOICES,
+        default="medium",
+    )
+    estimate_hours = models.DecimalField(max_digits=5, decimal_places=2, default=0)
+    assigned_to = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="recurrence_rules",
+    )
+    project_manager = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="managed_recurrence_rules",
+    )
+
+    frequency = models.CharField(max_length=10, choices=FREQUENCY_CHOICES)
+    interval = models.PositiveSmallIntegerField(
+        default=1,
+        help_text="Every N days / weeks / months / quarters / years.",
+    )
+    start_date = models.DateField(help_text="First occurrence; later ones keep its weekday / day of month.")
+    end_date = models.DateField(null=True, blank=True)
+    due_after_days = models.PositiveSmallIntegerField(
+        default=0,
+        help_text="Due date = occurrence date + this many days.",
+    )
+    active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["project", "title"]
+
+    def clean(self):
+        if self.interval is not None and self.interval < 1:
+            raise ValidationError({"interval": "Must be at least 1."})
+        if self.end_date and self.start_date and self.end_date < self.start_date:
+            raise ValidationError({"end_date": "Must not be before the start date."})
+        if self.resource_id and self.environment_id and self.resource.environment_id != self.environment_id:
+            raise ValidationError({"resource": "The resource belongs to another environment."})
+        environment = self.resource.environment if self.resource_id else self.environment
+        if environment is not None and self.project_id and environment.project_id != self.project_id:
+            raise ValidationError({"environment": "The environment belongs to another project."})
+
+    def __str__(self) -> str:
+        every = self.get_frequency_display().lower()
+        if self.interval > 1:
+            every = f"every {self.interval} ({every})"
+        return f"{self.title} - {every}"
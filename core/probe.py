@@ -0,0 +1,106 @@
+"""
+Concurrent TCP reachability checks for the Server inventory.
+
+Every active server's ``ip_address:ssh_port`` gets one asyncio
+``open_connection`` attempt; a semaphore bounds how many are in flight,
+each attempt has its own timeout, and a random start delay (jitter)
+spreads the SYNs out. Results are written with one ``bulk_create``.
+"""
+import asyncio
+import random
+import time
+from datetime import timedelta
+
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
+
+from .models import Server, ServerProbe
+
+
+async def probe_one(host, port, timeout, jitter, semaphore):
+    """
+    ``(is_up, latency_ms, error)`` for one TCP connect attempt.
+    """
+    if jitter:
+        await asyncio.sleep(random.uniform(0, jitter))
+    async with semaphore:
+        started = time.perf_counter()
+        try:
+            _, writer = await asyncio.wait_for(
+                asyncio.open_connection(host, port), timeout,
+            )
+        except asyncio.TimeoutError:
+            return False, None, "timeout"
+        except ConnectionRefusedError:
+            return False, None, "refused"
+        except OSError as exc:
+            return False, None, (exc.strerror or str(exc))[:60]
+        latency_ms = int((time.perf_counter() - started) * 1000)
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except OSError:
+            pass
+        return True, latency_ms, ""
+
+
+async def probe_targets(targets, concurrency=500, timeout=3.0, jitter=0.5):
+    """
+    Probe ``[(key, host, port), ...]``; returns ``{key: (is_up, ms, error)}``.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    results = await asyncio.gather(*[
+        probe_one(host, port, timeout, jitter, semaphore)
+        for _, host, port in targets
+    ])
+    return {key: result for (key, _, _), result in zip(targets, results)}
+
+
+def probe_servers(queryset=None, concurrency=500, timeout=3.0, jitter=0.5):
+    """
+    Probe servers and store one ServerProbe row per server.
+
+    Returns ``(probed, up)``.
+    """
+    if queryset is None:
+        queryset = Server.objects.filter(is_active=True)
+    targets = list(queryset.values_list("pk", "ip_address", "ssh_port"))
+    if not targets:
+        return 0, 0
+
+    results = asyncio.run(probe_targets(targets, concurrency, timeout, jitter))
+
+    checked_at = timezone.now()
+    ServerProbe.objects.bulk_create(
+        [
+            ServerProbe(
+                server_id=pk,
+                checked_at=checked_at,
+                is_up=is_up,
+                latency_ms=latency_ms,
+                error=error,
+            )
+            for pk, (is_up, latency_ms, error) in results.items()
+        ],
+        batch_size=1000,
+    )
+    return len(results), sum(1 for is_up, _, _ in results.values() if is_up)
+
+
+def prune_probes(keep_days):
+    cutoff = timezone.now() - timedelta(days=keep_days)
+    deleted, _ = ServerProbe.objects.filter(checked_at__lt=cutoff).delete()
+    return deleted
+
+
+def with_last_probe(queryset):
+    """
+    Annotate servers with ``last_probe_up`` / ``last_probe_at`` /
+    ``last_probe_ms`` from their most recent probe.
+    """
+    latest = ServerProbe.objects.filter(server=OuterRef("pk")).order_by("-checked_at")
+    return queryset.annotate(
+        last_probe_up=Subquery(latest.values("is_up")[:1]),
+        last_probe_at=Subquery(latest.values("checked_at")[:1]),
+        last_probe_ms=Subquery(latest.values("latency_ms")[:1]),
+    )
@@ -0,0 +1,358 @@
+"""
+On-demand sampling profiler for live requests.
+
+Staff switch it on with ProfileTrigger rows in the admin: for one
+user's requests, for paths matching a pattern, for 1 in N matches. A
+profiled request runs with a sampler thread that reads the request
+thread's stack from ``sys._current_frames()`` every PROFILER_INTERVAL_MS
+and counts collapsed stacks, while an ``execute_wrapper`` on each of the
+thread's database connections records the SQL timeline (statements
+without their parameters). The profile is written to PROFILER_DIR,
+which keeps only the newest PROFILER_MAX_PROFILES; the stacks download
+in the collapsed format flamegraph.pl, inferno and speedscope read.
+
+Requests that match no trigger pay one in-memory check: each process
+holds the active triggers and re-reads them from the database (one
+small query) every PROFILER_REFRESH_SECONDS, so a change reaches every
+worker within that time whatever the cache backend; the worker that
+saved it reloads at once.
+
+The sampler needs the GIL to look, so it tends to land where the
+request thread lets go of it (database calls, other I/O): treat stack
+shares as wall-clock time, and read database time off the SQL timeline.
+Only the view's work is covered; a streaming response body is produced
+after the middleware returns and isn't sampled.
+"""
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import ExitStack
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connections
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import ProfileTrigger
+
+
+MAX_QUERIES = 5000
+SQL_CHARS = 2000
+NAME_RE = re.compile(r"^\d{8}T\d{6}-[0-9a-f]{8}$")
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def profile_dir():
+    return Path(_setting("PROFILER_DIR", Path(settings.BASE_DIR) / "profiles"))
+
+
+def max_profiles():
+    return _setting("PROFILER_MAX_PROFILES", 200)
+
+
+# ---------- Triggers ----------
+
+class _Triggers:
+    """
+    The active triggers of this process, reloaded every
+    PROFILER_REFRESH_SECONDS.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.checked = None
+        self.rules = ()
+
+    def current(self):
+        now = time.monotonic()
+        refresh = _setting("PROFILER_REFRESH_SECONDS", 5)
+        if self.checked is not None and now - self.checked < refresh:
+            return self.rules
+        with self.lock:
+            if self.checked is None or now - self.checked >= refresh:
+                self.rules = self._load()
+                self.checked = now
+        return self.rules
+
+    def _load(self):
+        rows = (
+            ProfileTrigger.objects
+            .filter(active=True)
+            .exclude(expires_at__lte=timezone.now())
+            .values_list("pk", "user_id", "path_pattern", "sample_rate", "expires_at")
+        )
+        rules = []
+        for pk, user_id, pattern, rate, expires_at in rows:
+            try:
+                compiled = re.compile(pattern) if pattern else None
+            except re.error:
+                continue
+            rules.append((pk, user_id, compiled, max(rate, 1), expires_at))
+        return tuple(rules)
+
+    def reset(self):
+        self.checked = None
+
+
+_triggers = _Triggers()
+
+
+@receiver(post_save, sender=ProfileTrigger, dispatch_uid="profiling_trigger_saved")
+@receiver(post_delete, sender=ProfileTrigger, dispatch_uid="profiling_trigger_deleted")
+def trigger_changed(sender, raw=False, **kwargs):
+    if not raw:
+        _triggers.reset()
+
+
+def match(request):
+    """
+    The id of the trigger that selects ``request`` for profiling, or None.
+    """
+    rules = _triggers.current()
+    if not rules:
+        return None
+    user = getattr(request, "user", None)
+    user_id = user.pk if user is not None and user.is_authenticated else None
+    for pk, trigger_user_id, pattern, rate, expires_at in rules:
+        if trigger_user_id is not None and trigger_user_id != user_id:
+            continue
+        if pattern is not None and not pattern.search(request.path):
+            continue
+        if expires_at is not None and expires_at <= timezone.now():
+            continue
+        if rate > 1 and random.randrange(rate):
+            continue
+        return pk
+    return None
+
+
+# ---------- Sampling ----------
+
+def _roots():
+    roots = {str(settings.BASE_DIR)} | {p for p in sys.path if p and os.path.isdir(p)}
+    return sorted((os.path.join(root, "") for root in roots), key=len, reverse=True)
+
+
+class Sampler(threading.Thread):
+    """
+    Counts the collapsed stacks of one thread, sampled every ``interval``
+    seconds until stopped or ``max_seconds`` have passed.
+    """
+
+    def __init__(self, thread_id, interval, max_seconds):
+        super().__init__(name="infra-profiler", daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.deadline = time.monotonic() + max_seconds
+        self.stacks = Counter()
+        self.samples = 0
+        self.labels = {}  # code object -> frame label
+        self.roots = _roots()
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            if time.monotonic() > self.deadline:
+                break
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None or self.stopped.is_set():
+                break
+            self.stacks[self._collapse(frame)] += 1
+            self.samples += 1
+            del frame
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+    def _label(self, code):
+        filename = code.co_filename
+        for root in self.roots:
+            if filename.startswith(root):
+                filename = filename[len(root):]
+                break
+        return f"{code.co_qualname} ({filename}:{code.co_firstlineno})".replace(";", ",")
+
+    def _collapse(self, frame):
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            label = self.labels.get(code)
+            if label is None:
+                label = self.labels[code] = self._label(code)
+            names.append(label)
+            frame = frame.f_back
+        names.reverse()
+        return ";".join(names)
+
+
+class QueryTimeline:
+    """
+    ``execute_wrapper`` recording when each statement ran and for how long.
+    """
+
+    def __init__(self, started):
+        self.started = started
+        self.queries = []
+        self.count = 0
+        self.seconds = 0.0
+
+    def wrapper(self, alias):
+        def execute(execute, sql, params, many, context):
+            start = time.perf_counter()
+            error = None
+            try:
+                return execute(sql, params, many, context)
+            except Exception as exc:
+                error = type(exc).__name__
+                raise
+            finally:
+                duration = time.perf_counter() - start
+                self.count += 1
+                self.seconds += duration
+                if len(self.queries) < MAX_QUERIES:
+                    self.queries.append({
+                        "at_ms": round((start - self.started) * 1000, 3),
+                        "ms": round(duration * 1000, 3),
+                        "db": alias,
+                        "sql": sql[:SQL_CHARS],
+                        "many": many,
+                        "error": error,
+                    })
+
+        return execute
+
+
+def run(request, get_response, trigger_id):
+    """
+    ``get_response(request)`` under the profiler; the profile is saved
+    and its name returned in the ``X-Profile`` header.
+    """
+    sampler = Sampler(
+        threading.get_ident(),
+        _setting("PROFILER_INTERVAL_MS", 5) / 1000,
+        _setting("PROFILER_MAX_SECONDS", 60),
+    )
+    started_at = timezone.now()
+    timeline = QueryTimeline(time.perf_counter())
+    cpu = time.thread_time()
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(timeline.wrapper(connection.alias)))
+        sampler.start()
+        try:
+            response = get_response(request)
+        finally:
+            sampler.stop()
+    wall = time.perf_counter() - timeline.started
+    cpu = time.thread_time() - cpu
+
+    user = getattr(request, "user", None)
+    meta = {
+        "started_at": started_at.isoformat(),
+        "method": request.method,
+        "path": request.path,
+        "query_string": request.META.get("QUERY_STRING", "")[:500],
+        "user": user.get_username() if user is not None and user.is_authenticated else None,
+        "status": response.status_code,
+        "trigger": trigger_id,
+        "pid": os.getpid(),
+        "wall_ms": round(wall * 1000, 1),
+        "cpu_ms": round(cpu * 1000, 1),
+        "samples": sampler.samples,
+        "interval_ms": round(sampler.interval * 1000, 3),
+        "queries": timeline.count,
+        "sql_ms": round(timeline.seconds * 1000, 1),
+    }
+    response["X-Profile"] = save(meta, sampler.stacks, timeline.queries)
+    return response
+
+
+# ---------- Store ----------
+
+def _path(name):
+    if not NAME_RE.match(name):
+        raise FileNotFoundError(name)
+    return profile_dir() / f"{name}.jsonl"
+
+
+def save(meta, stacks, queries):
+    """
+    Write one profile - three JSON lines: summary, stacks, SQL timeline -
+    and drop the oldest beyond PROFILER_MAX_PROFILES; returns its name.
+    """
+    directory = profile_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    name = f"{timezone.now():%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}"
+    path = directory / f"{name}.jsonl"
+    partial = path.with_suffix(".tmp")
+    with open(partial, "w", encoding="utf-8") as out:
+        out.write(json.dumps({"name": name, **meta}) + "\n")
+        out.write(json.dumps(stacks.most_common()) + "\n")
+        out.write(json.dumps(queries) + "\n")
+    os.replace(partial, path)
+
+    for old in sorted(directory.glob("*.jsonl"))[:-max_profiles()]:
+        old.unlink(missing_ok=True)
+    return name
+
+
+def listing():
+    """
+    Summaries of the stored profiles, newest first (first line of each).
+    """
+    directory = profile_dir()
+    if not directory.is_dir():
+        return []
+    summaries = []
+    for path in sorted(directory.glob("*.jsonl"), reverse=True):
+        try:
+            with open(path, encoding="utf-8") as f:
+                summaries.append(json.loads(f.readline()))
+        except (OSError, ValueError):
+            continue
+    return summaries
+
+
+def load(name):
+    """
+    ``(summary, [(stack, count)], [query])``; FileNotFoundError if gone.
+    """
+    with open(_path(name), encoding="utf-8") as f:
+        meta, stacks, queries = (json.loads(line) for line in f)
+    return meta, stacks, queries
+
+
+def delete(name):
+    _path(name).unlink(missing_ok=True)
+
+
+def collapsed(stacks):
+    """
+    ``frame;frame;frame count`` lines, one per distinct stack.
+    """
+    return "".join(f"{stack} {count}\n" for stack, count in stacks)
+
+
+def hot_frames(stacks, limit=30):
+    """
+    ``[(frame, self samples, total samples)]``, by self samples.
+    """
+    own, total = Counter(), Counter()
+    for stack, count in stacks:
+        frames = stack.split(";")
+        own[frames[-1]] += count
+        for frame in set(frames):
+            total[frame] += count
+    return [(frame, count, total[frame]) for frame, count in own.most_common(limit)]
@@ -0,0 +1,142 @@
+"""
+Recurring maintenance: expanding RecurrenceRules into Issues.
+
+``schedule()`` reads every active rule once and computes its occurrence
+dates in the horizon arithmetically (no walking from the start date).
+Each occurrence is keyed ``r<rule id>:<date>``; keys that already have
+an issue are read back with a few batched IN queries and the rest go in
+with ``bulk_create``. ``ignore_conflicts`` on the unique
+``Issue.occurrence_key`` makes an overlapping run harmless, and running
+it again over the same horizon creates nothing. New issues are announced
+with ``bulk_changed`` so the SLA, calendar, similarity and search
+indexes pick them up.
+"""
+import calendar
+from datetime import date, timedelta
+
+from django.db import transaction
+
+from .models import Issue, RecurrenceRule
+from .signals import bulk_changed
+
+
+DEFAULT_HORIZON_DAYS = 90
+MONTHS = {"monthly": 1, "quarterly": 3, "yearly": 12}
+KEY_BATCH = 1000
+
+
+def occurrence_key(rule_id, day):
+    return f"r{rule_id}:{day.isoformat()}"
+
+
+def _add_months(day, months):
+    month = day.month - 1 + months
+    year = day.year + month // 12
+    month = month % 12 + 1
+    # Day 31 lands on the last day of shorter months.
+    return date(year, month, min(day.day, calendar.monthrange(year, month)[1]))
+
+
+def occurrences(frequency, interval, start_date, end_date, start, end):
+    """
+    Dates of a rule's occurrences within ``start..end``.
+    """
+    last = min(end, end_date) if end_date else end
+    if frequency in ("daily", "weekly"):
+        step = interval * (7 if frequency == "weekly" else 1)
+        skipped = max(0, -(-(start - start_date).days // step))
+        day = start_date + timedelta(days=skipped * step)
+        while day <= last:
+            yield day
+            day += timedelta(days=step)
+        return
+
+    step = interval * MONTHS[frequency]
+    months = (start.year - start_date.year) * 12 + start.month - start_date.month
+    # Always offset from start_date, so a clamped Feb 28 doesn't stick.
+    index = max(0, months // step)
+    while True:
+        day = _add_months(start_date, index * step)
+        if day > last:
+            return
+        if day >= start:
+            yield day
+        index += 1
+
+
+def _existing(keys):
+    found = set()
+    for i in range(0, len(keys), KEY_BATCH):
+        found.update(
+            Issue.objects
+            .filter(occurrence_key__in=keys[i:i + KEY_BATCH])
+            .values_list("occurrence_key", flat=True)
+        )
+    return found
+
+
+def schedule(start=None, days=DEFAULT_HORIZON_DAYS, rule_ids=None, dry_run=False):
+    """
+    Create the issues for every active rule's occurrences in
+    ``start..start + days`` that don't exist yet; returns
+    ``{"rules", "occurrences", "existing", "created"}``.
+    """
+    start = start or date.today()
+    end = start + timedelta(days=days)
+    rules = (
+        RecurrenceRule.objects
+        .filter(active=True, start_date__lte=end)
+        .exclude(end_date__lt=start)
+        .select_related("resource")
+    )
+    if rule_ids is not None:
+        rules = rules.filter(pk__in=rule_ids)
+
+    pending = {}
+    rule_count = 0
+    for rule in rules.iterator(chunk_size=1000):
+        rule_count += 1
+        environment_id = rule.resource.environment_id if rule.resource_id else rule.environment_id
+        due_after = timedelta(days=rule.due_after_days)
+        for day in occurrences(rule.frequency, rule.interval, rule.start_date, rule.end_date, start, end):
+            key = occurrence_key(rule.pk, day)
+            pending[key] = Issue(
+                project_id=rule.project_id,
+                environment_id=environment_id,
+                resource_id=rule.resource_id,
+                title=rule.title,
+                description=rule.description,
+                priority=rule.priority,
+                activity_type=rule.activity_type,
+                activity_date=day,
+                due_date=day + due_after,
+                estimate_hours=rule.estimate_hours,
+                assigned_to_id=rule.assigned_to_id,
+                project_manager_id=rule.project_manager_id,
+                occurrence_key=key,
+            )
+
+    existing = _existing(list(pending))
+    new = [issue for key, issue in pending.items() if key not in existing]
+    counts = {
+        "rules": rule_count,
+        "occurrences": len(pending),
+        "existing": len(existing),
+        "created": len(new),
+    }
+    if dry_run or not new:
+        return counts
+
+    with transaction.atomic():
+        Issue.objects.bulk_create(new, batch_size=500, ignore_conflicts=True)
+        # ignore_conflicts returns no ids; read them back by key.
+        keys = [issue.occurrence_key for issue in new]
+        pks = []
+        for i in range(0, len(keys), KEY_BATCH):
+            pks.extend(
+                Issue.objects
+                .filter(occurrence_key__in=keys[i:i + KEY_BATCH])
+                .values_list("pk", flat=True)
+            )
+        transaction.on_commit(lambda: bulk_changed.send(sender=Issue, pks=pks))
+    return counts
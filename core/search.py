@@ -0,0 +1,303 @@
+"""
+Global search and saved searches, with cached result sets.
+
+Result sets (global search hits, or the ids an Issue list filter
+matches) are cached under a key that includes a generation counter per
+model they read. Saving, deleting or bulk-changing any of those models
+bumps its counter, so a repeated search is a cache hit until something
+it depends on actually changes; stale entries simply age out.
+
+The counters live in the default cache, so every process must share it
+(REDIS_URL): with per-process LocMem caches a change only invalidates
+the results of the worker that made it.
+"""
+import functools
+import hashlib
+from copy import copy
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db.models import Q
+from django.db.models.functions import Length, Lower
+from django.db.models.signals import post_delete, post_save
+from django.http import QueryDict
+
+from .models import (
+    Partner, Client, Project,
+    Environment, Server, Resource,
+    Issue, InfraActivity, IssueSLA,
+)
+from .signals import bulk_changed
+
+
+SEARCH_MODELS = (Partner, Client, Project, Environment, Server, Resource, Issue, InfraActivity, User)
+# Issue list filters also read the SLA rows (SLAFilter) and the related
+# names shown in the list.
+ISSUE_FILTER_MODELS = (Issue, IssueSLA, Project, Client, Partner, Environment, Resource, User)
+MAX_ISSUE_IDS = 5000
+
+# (label, model, admin path, prefix-matched fields, label fields)
+TYPEAHEAD_SOURCES = (
+    ("Partner", Partner, "partner", ("name", "code"), ("name",)),
+    ("Client", Client, "client", ("name", "code"), ("name", "partner__name")),
+    ("Project", Project, "project", ("name", "code"), ("name", "client__name")),
+    ("Environment", Environment, "environment", ("name",), ("name", "project__name")),
+    ("Server", Server, "server", ("name", "ip_address"), ("name", "ip_address")),
+    ("Resource", Resource, "resource", ("name", "identifier"), ("name", "resource_type")),
+    ("Issue", Issue, "issue", ("title",), ("title", "project__name")),
+)
+TYPEAHEAD_MODELS = tuple(model for _, model, _, _, _ in TYPEAHEAD_SOURCES)
+TYPEAHEAD_MIN_LENGTH = 2
+TYPEAHEAD_LIMIT = 10
+
+
+# ---------- Generations ----------
+
+def _generation_key(model):
+    return f"search:gen:{model._meta.label_lower}"
+
+
+def bump(model):
+    key = _generation_key(model)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 1, timeout=None)
+
+
+def stamp(models):
+    """
+    The current generations of ``models`` as one string, for cache keys.
+    """
+    generations = cache.get_many([_generation_key(m) for m in models])
+    return ".".join(str(generations.get(_generation_key(m), 0)) for m in models)
+
+
+def _cached(namespace, text, models, compute):
+    digest = hashlib.md5(text.encode(), usedforsecurity=False).hexdigest()
+    key = f"search:{namespace}:{digest}:{stamp(models)}"
+    result = cache.get(key)
+    if result is None:
+        result = compute()
+        cache.set(key, result, getattr(settings, "SEARCH_CACHE_SECONDS", 900))
+    return result
+
+
+def model_changed(sender, raw=False, **kwargs):
+    if not raw:
+        bump(sender)
+
+
+def models_bulk_changed(sender, pks, **kwargs):
+    bump(sender)
+
+
+# Connected per model: a post_delete receiver without a sender would stop
+# Django from fast-deleting (one DELETE, no row loading) any model at all.
+# IssueSLA rows are only ever written in bulk by core.sla, which sends
+# bulk_changed, so its deletes stay fast too.
+BULK_ONLY_MODELS = (IssueSLA,)
+
+for _model in {*SEARCH_MODELS, *ISSUE_FILTER_MODELS}:
+    _label = _model._meta.label_lower
+    if _model not in BULK_ONLY_MODELS:
+        post_save.connect(model_changed, sender=_model, dispatch_uid=f"search_saved_{_label}")
+        post_delete.connect(model_changed, sender=_model, dispatch_uid=f"search_deleted_{_label}")
+    bulk_changed.connect(models_bulk_changed, sender=_model, dispatch_uid=f"search_bulk_changed_{_label}")
+del _model, _label
+
+
+# ---------- Global search ----------
+
+def _search(query):
+    results = []
+
+    def add_results(qs, model_label, admin_prefix):
+        for obj in qs[:25]:  # limit per model
+            results.append({
+                "model": model_label,
+                "label": str(obj),
+                "admin_url": f"/admin/core/{admin_prefix}/{obj.pk}/change/",
+            })
+
+    # Partner
+    add_results(
+        Partner.objects.filter(
+            Q(name__icontains=query) |
+            Q(code__icontains=query) |
+            Q(contact_person__icontains=query) |
+            Q(contact_email__icontains=query)
+        ),
+        "Partner",
+        "partner",
+    )
+
+    # Client
+    add_results(
+        Client.objects.filter(
+            Q(name__icontains=query) |
+            Q(code__icontains=query) |
+            Q(contact_person__icontains=query) |
+            Q(contact_email__icontains=query)
+        ),
+        "Client",
+        "client",
+    )
+
+    # Project
+    add_results(
+        Project.objects.filter(
+            Q(name__icontains=query) |
+            Q(code__icontains=query) |
+            Q(description__icontains=query)
+        ),
+        "Project",
+        "project",
+    )
+
+    # Environment
+    add_results(
+        Environment.objects.filter(
+            Q(name__icontains=query) |
+            Q(base_url__icontains=query) |
+            Q(notes__icontains=query)
+        ),
+        "Environment",
+        "environment",
+    )
+
+    # Server
+    add_results(
+        Server.objects.filter(
+            Q(name__icontains=query) |
+            Q(ip_address__icontains=query) |
+            Q(region__icontains=query)
+        ),
+        "Server",
+        "server",
+    )
+
+    # Resource
+    add_results(
+        Resource.objects.filter(
+            Q(name__icontains=query) |
+            Q(resource_type__icontains=query) |
+            Q(provider__icontains=query) |
+            Q(identifier__icontains=query) |
+            Q(connection_info__icontains=query)
+        ),
+        "Resource",
+        "resource",
+    )
+
+    # Issue
+    add_results(
+        Issue.objects.filter(
+            Q(title__icontains=query) |
+            Q(description__icontains=query) |
+            Q(activity_type__icontains=query)
+        ),
+        "Issue",
+        "issue",
+    )
+
+    # InfraActivity
+    add_results(
+        InfraActivity.objects.filter(
+            Q(note__icontains=query) |
+            Q(status__icontains=query)
+        ),
+        "Infra Activity",
+        "infraactivity",
+    )
+
+    # Users
+    for u in User.objects.filter(
+        Q(username__icontains=query) |
+        Q(email__icontains=query) |
+        Q(first_name__icontains=query) |
+        Q(last_name__icontains=query)
+    )[:25]:
+        results.append({
+            "model": "User",
+            "label": f"{u.username} ({u.email})",
+            "admin_url": f"/admin/auth/user/{u.pk}/change/",
+        })
+
+    return results
+
+
+def global_search(query):
+    """
+    Hits across all searchable models (cached until one of them changes).
+    """
+    return _cached("global", query, SEARCH_MODELS, lambda: _search(query))
+
+
+# ---------- Issue list filters ----------
+
+def issue_filter_ids(request, querystring):
+    """
+    Ids of the issues the Issue admin list shows for ``querystring``
+    (filters, search and ordering), at most MAX_ISSUE_IDS.
+
+    Evaluated through IssueAdmin's own ChangeList so saved filters mean
+    exactly what they meant on the list page. Raises
+    ``IncorrectLookupParameters`` for a stale or invalid filter.
+    """
+    from django.contrib import admin
+
+    def compute():
+        model_admin = admin.site._registry[Issue]
+        list_request = copy(request)
+        list_request.GET = QueryDict(querystring)
+        changelist = model_admin.get_changelist_instance(list_request)
+        return list(changelist.queryset.values_list("pk", flat=True)[:MAX_ISSUE_IDS])
+
+    return _cached("issues", querystring, ISSUE_FILTER_MODELS, compute)
+
+
+# ---------- Typeahead ----------
+
+@functools.lru_cache(maxsize=512)
+def _suggestions(prefix, generations, limit):
+    """
+    Per process LRU of hot prefixes. ``generations`` is only part of the
+    key: a change to any source model makes a new entry, the old one
+    just falls out.
+    """
+    results = []
+    for label, model, admin_path, fields, label_fields in TYPEAHEAD_SOURCES:
+        match = Q()
+        for field in fields:
+            match |= Q(**{f"{field}__istartswith": prefix})
+        # Ranked in the query, so each source's ``limit`` rows are its
+        # shortest names rather than whichever the index scan hit first.
+        name_field = label_fields[0]
+        rows = (
+            model.objects
+            .filter(match)
+            .order_by(Length(name_field), Lower(name_field), "pk")
+            .values_list("pk", *label_fields)[:limit]
+        )
+        for pk, *parts in rows:
+            name = str(parts[0])
+            text = f"{name} · {parts[1]}" if len(parts) > 1 and parts[1] else name
+            rank = (len(name), name.lower())
+            results.append((rank, (label, text, f"/admin/core/{admin_path}/{pk}/change/")))
+
+    # Shortest names first: "db" ranks "db-1" above "db-replica-eu-west".
+    results.sort(key=lambda result: result[0])
+    return tuple(row for _, row in results[:limit])
+
+
+def suggest(prefix, limit=TYPEAHEAD_LIMIT):
+    """
+    Up to ``limit`` ``(model, label, admin_url)`` matches whose name,
+    code or title starts with ``prefix``.
+    """
+    prefix = prefix.strip().lower()
+    if len(prefix) < TYPEAHEAD_MIN_LENGTH:
+        return ()
+    return _suggestions(prefix, stamp(TYPEAHEAD_MODELS), limit)
@@ -0,0 +1,8 @@
+from django.dispatch import Signal
+
+
+# Sent (after commit) by bulk write paths that bypass post_save/post_delete:
+# queryset.update(), bulk_create() and raw deletes.
+#   sender: the model class
+#   pks:    primary keys of the rows that were inserted/updated
+bulk_changed = Signal()
@@ -0,0 +1,281 @@
+"""
+Similar / duplicate issue detection.
+
+Each issue's title, activity type and description are normalised and cut
+into character shingles; a MinHash signature of ``NUM_PERM`` minimums
+estimates the Jaccard similarity of two issues. The signature is split
+into ``BANDS`` bands whose hashes are stored in ``IssueLSHBucket``, so
+"issues like this one" only looks at rows sharing a (band, bucket) pair
+through an index instead of comparing against every issue.
+
+Signatures are refreshed when an issue's text changes; issues created by
+bulk paths are picked up from ``bulk_changed``, migration 0017 indexes
+the issues that predate the index, and ``manage.py dedupe_report
+--rebuild`` indexes everything.
+"""
+import hashlib
+import re
+import struct
+import zlib
+
+from django.db import connection, transaction
+from django.db.models import Count, Q
+from django.db.models.signals import post_init, post_save
+from django.dispatch import receiver
+
+from .models import Issue, IssueSignature, IssueLSHBucket
+from .signals import bulk_changed
+
+
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS        # 4 rows/band: ~50% similarity to collide
+SHINGLE_SIZE = 4
+MAX_TEXT = 1000                 # description chars considered
+MAX_CANDIDATES = 500
+
+_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_MIX = (0x9E3779B97F4A7C15 % _PRIME, 0x632BE59BD9B4E019 % _PRIME)  # stored signatures depend on these
+_PACK = struct.Struct(f"<{NUM_PERM}I")
+_WORDS = re.compile(r"[a-z0-9]+")
+TEXT_FIELDS = ("title", "activity_type", "description")
+
+
+def normalise(title, activity_type, description):
+    text = " ".join((title or "", activity_type or "", (description or "")[:MAX_TEXT]))
+    return " ".join(_WORDS.findall(text.lower()))
+
+
+def shingles(text):
+    if len(text) <= SHINGLE_SIZE:
+        return {text} if text else set()
+    return {text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+
+
+def minhash(text):
+    """
+    Tuple of ``NUM_PERM`` 32-bit minimums for the text's shingles.
+
+    One-permutation hashing: each shingle is hashed once and lands in one
+    of ``NUM_PERM`` bins, so the cost is linear in the text rather than
+    text x permutations. Empty bins borrow from the next filled bin
+    (rotation densification) so short titles still compare.
+    """
+    a, b = _MIX
+    bins = [None] * NUM_PERM
+    for shingle in shingles(text):
+        h = (a * zlib.crc32(shingle.encode()) + b) % _PRIME
+        index, value = h % NUM_PERM, (h // NUM_PERM) & _MAX_HASH
+        if bins[index] is None or value < bins[index]:
+            bins[index] = value
+    if all(value is None for value in bins):
+        return (_MAX_HASH,) * NUM_PERM
+    signature = []
+    for index in range(NUM_PERM):
+        distance = 0
+        while bins[(index + distance) % NUM_PERM] is None:
+            distance += 1
+        signature.append((bins[(index + distance) % NUM_PERM] + distance * 0x9E3779B1) & _MAX_HASH)
+    return tuple(signature)
+
+
+def pack(signature):
+    return _PACK.pack(*signature)
+
+
+def unpack(data):
+    return _PACK.unpack(bytes(data))
+
+
+def band_buckets(signature):
+    """
+    ``[(band, bucket)]``: a signed 64-bit hash of each band's rows.
+    """
+    buckets = []
+    for band in range(BANDS):
+        rows = signature[band * ROWS:(band + 1) * ROWS]
+        digest = hashlib.blake2b(struct.pack(f"<H{ROWS}I", band, *rows), digest_size=8).digest()
+        buckets.append((band, struct.unpack("<q", digest)[0]))
+    return buckets
+
+
+def estimate(a, b):
+    """
+    Estimated Jaccard similarity of two signatures.
+    """
+    return sum(x == y for x, y in zip(a, b)) / NUM_PERM
+
+
+# ---------- Index maintenance ----------
+
+def index_rows(rows):
+    """
+    (Re)index ``(pk, title, activity_type, description)`` rows: one
+    signature upsert, one bucket DELETE and one bucket INSERT.
+    """
+    signatures, buckets = [], []
+    for pk, title, activity_type, description in rows:
+        signature = minhash(normalise(title, activity_type, description))
+        signatures.append(IssueSignature(issue_id=pk, minhash=pack(signature)))
+        buckets.extend(
+            IssueLSHBucket(issue_id=pk, band=band, bucket=bucket)
+            for band, bucket in band_buckets(signature)
+        )
+    kwargs = {"update_conflicts": True, "update_fields": ["minhash", "updated_at"]}
+    if connection.features.supports_update_conflicts_with_target:
+        kwargs["unique_fields"] = ["issue"]
+    with transaction.atomic():
+        IssueSignature.objects.bulk_create(signatures, batch_size=500, **kwargs)
+        IssueLSHBucket.objects.filter(issue_id__in=[row[0] for row in rows]).delete()
+        IssueLSHBucket.objects.bulk_create(buckets, batch_size=1000)
+    return len(rows)
+
+
+ROW_FIELDS = ("pk",) + TEXT_FIELDS
+
+
+def index_missing(issue_ids):
+    """
+    Index those of ``issue_ids`` that have no signature yet.
+    """
+    rows = list(
+        Issue.objects
+        .filter(pk__in=issue_ids, signature__isnull=True)
+        .values_list(*ROW_FIELDS)
+    )
+    return index_rows(rows) if rows else 0
+
+
+def rebuild_all(batch_size=500):
+    base = Issue.objects.order_by("pk")
+    last_pk, indexed = 0, 0
+    while True:
+        rows = list(base.filter(pk__gt=last_pk).values_list(*ROW_FIELDS)[:batch_size])
+        if not rows:
+            return indexed
+        indexed += index_rows(rows)
+        last_pk = rows[-1][0]
+
+
+# ---------- Lookups ----------
+
+def _candidates(pk, signature):
+    """
+    ``{issue_id: signature}`` of issues sharing a band bucket, the
+    ``MAX_CANDIDATES`` sharing the most bands (then the newest) if there
+    are more. Two queries.
+    """
+    match = Q()
+    for band, bucket in band_buckets(signature):
+        match |= Q(band=band, bucket=bucket)
+    issue_ids = list(
+        IssueLSHBucket.objects
+        .filter(match)
+        .exclude(issue_id=pk)
+        .values("issue_id")
+        .annotate(hits=Count("pk"))
+        .order_by("-hits", "-issue_id")
+        .values_list("issue_id", flat=True)[:MAX_CANDIDATES]
+    )
+    rows = (
+        IssueSignature.objects
+        .filter(issue_id__in=issue_ids)
+        .values_list("issue_id", "minhash")
+    )
+    return {issue_id: unpack(data) for issue_id, data in rows}
+
+
+def similar_issues(issue, threshold=0.5, limit=10):
+    """
+    ``[(similarity, issue)]`` best first, for an issue or any unsaved
+    Issue with text fields set.
+    """
+    signature = minhash(normalise(issue.title, issue.activity_type, issue.description))
+    scored = sorted(
+        (
+            (estimate(signature, other), other_id)
+            for other_id, other in _candidates(issue.pk, signature).items()
+        ),
+        reverse=True,
+    )
+    scored = [(score, other_id) for score, other_id in scored if score >= threshold][:limit]
+    issues = Issue.objects.select_related("project__client").in_bulk(
+        [other_id for _, other_id in scored]
+    )
+    return [(score, issues[other_id]) for score, other_id in scored if other_id in issues]
+
+
+def duplicate_groups(threshold=0.7, client_id=None, batch_size=1000):
+    """
+    Clusters (lists of issue ids, largest first) of issues at least
+    ``threshold`` similar, found by walking the LSH buckets in order.
+
+    Members of a bucket are compared against its first member only, so
+    the work stays linear in the bucket sizes; other bands pick up the
+    pairs this misses.
+    """
+    buckets = IssueLSHBucket.objects.order_by("band", "bucket", "issue_id")
+    if client_id is not None:
+        buckets = buckets.filter(issue__project__client_id=client_id)
+    pairs, group, key = set(), [], None
+    for band, bucket, issue_id in buckets.values_list("band", "bucket", "issue_id").iterator(chunk_size=batch_size):
+        if (band, bucket) != key:
+            pairs.update((group[0], other) for other in group[1:])
+            group, key = [], (band, bucket)
+        group.append(issue_id)
+    pairs.update((group[0], other) for other in group[1:])
+
+    signatures = {}
+    id_list = sorted({pk for pair in pairs for pk in pair})
+    for start in range(0, len(id_list), batch_size):
+        signatures.update(
+            (pk, unpack(data))
+            for pk, data in IssueSignature.objects
+            .filter(issue_id__in=id_list[start:start + batch_size])
+            .values_list("issue_id", "minhash")
+        )
+
+    parent = {pk: pk for pk in signatures}
+
+    def find(pk):
+        while parent[pk] != pk:
+            parent[pk] = parent[parent[pk]]
+            pk = parent[pk]
+        return pk
+
+    for a, b in pairs:
+        if a in signatures and b in signatures and estimate(signatures[a], signatures[b]) >= threshold:
+            parent[find(b)] = find(a)
+
+    clusters = {}
+    for pk in parent:
+        clusters.setdefault(find(pk), []).append(pk)
+    clusters = [sorted(c) for c in clusters.values() if len(c) > 1]
+    return sorted(clusters, key=len, reverse=True)
+
+
+# ---------- Signal receivers ----------
+
+@receiver(post_init, sender=Issue, dispatch_uid="similarity_issue_init")
+def remember_text(sender, instance, **kwargs):
+    values = instance.__dict__
+    instance._similarity_text = tuple(values.get(name) for name in TEXT_FIELDS)
+
+
+@receiver(post_save, sender=Issue, dispatch_uid="similarity_issue_saved")
+def issue_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    text = tuple(getattr(instance, name) for name in TEXT_FIELDS)
+    if created or text != getattr(instance, "_similarity_text", None):
+        index_rows([(instance.pk, *text)])
+        instance._similarity_text = text
+
+
+@receiver(bulk_changed, dispatch_uid="similarity_bulk_changed")
+def issues_bulk_changed(sender, pks, **kwargs):
+    # Bulk paths don't edit issue text; they only ever create issues
+    # that still need a signature.
+    if sender is Issue and pks:
+        index_missing(pks)
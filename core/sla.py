@@ -0,0 +1,158 @@
+"""
+SLA engine for issues.
+
+Each open issue gets an ``IssueSLA`` row holding its deadline (the earlier
+of ``created_at`` + the priority's SLA target and the end of its due date)
+and a breach state. "Breaching in the next 24h" is then an indexed range
+query on ``deadline`` instead of a per-row Python computation.
+
+Rows are refreshed when an issue is saved and by ``manage.py scan_sla``,
+which walks all open issues in primary-key batches. Migration 0015 adds
+the rows of open issues that predate the engine.
+"""
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import Issue, IssueSLA
+from .signals import bulk_changed
+
+
+OPEN_STATUSES = ("open", "in_progress", "blocked")
+
+DEFAULT_SLA_HOURS = {
+    "critical": 4,
+    "high": 24,
+    "medium": 72,
+    "low": 168,
+}
+
+
+def sla_hours():
+    return {**DEFAULT_SLA_HOURS, **getattr(settings, "ISSUE_SLA_HOURS", {})}
+
+
+def at_risk_window():
+    return timedelta(hours=getattr(settings, "ISSUE_SLA_AT_RISK_HOURS", 24))
+
+
+def compute_deadline(priority, created_at, due_date, targets=None):
+    targets = targets or sla_hours()
+    deadline = created_at + timedelta(hours=targets.get(priority, targets["medium"]))
+    if due_date:
+        end_of_due = timezone.make_aware(
+            datetime.combine(due_date + timedelta(days=1), time.min),
+        )
+        deadline = min(deadline, end_of_due)
+    return deadline
+
+
+def compute_state(deadline, now, window):
+    if deadline <= now:
+        return IssueSLA.STATE_BREACHED
+    if deadline <= now + window:
+        return IssueSLA.STATE_AT_RISK
+    return IssueSLA.STATE_OK
+
+
+def _upsert(rows):
+    kwargs = {
+        "update_conflicts": True,
+        "update_fields": ["deadline", "state", "checked_at"],
+    }
+    if connection.features.supports_update_conflicts_with_target:
+        kwargs["unique_fields"] = ["issue"]
+    IssueSLA.objects.bulk_create(rows, **kwargs)
+
+
+def refresh_rows(rows, now=None):
+    """
+    Upsert SLA rows for ``(pk, status, priority, created_at, due_date)``
+    tuples and drop the rows of issues that are no longer open.
+
+    Returns ``(upserted, removed, breached)`` counts.
+    """
+    now = now or timezone.now()
+    targets, window = sla_hours(), at_risk_window()
+    upserts, closed, breached = [], [], 0
+    for pk, status, priority, created_at, due_date in rows:
+        if status not in OPEN_STATUSES:
+            closed.append(pk)
+            continue
+        deadline = compute_deadline(priority, created_at, due_date, targets)
+        state = compute_state(deadline, now, window)
+        breached += state == IssueSLA.STATE_BREACHED
+        upserts.append(IssueSLA(
+            issue_id=pk,
+            deadline=deadline,
+            state=state,
+            checked_at=now,
+        ))
+    removed = 0
+    if upserts:
+        _upsert(upserts)
+    if closed:
+        removed, _ = IssueSLA.objects.filter(issue_id__in=closed).delete()
+    if upserts or removed:
+        _announce([row.issue_id for row in upserts] + closed)
+    return len(upserts), removed, breached
+
+
+def _announce(issue_ids):
+    # SLA rows are keyed by issue; the search / fragment caches only need
+    # to know that some changed.
+    transaction.on_commit(lambda: bulk_changed.send(sender=IssueSLA, pks=issue_ids))
+
+
+ROW_FIELDS = ("pk", "status", "priority", "created_at", "due_date")
+
+
+def refresh_issues(issue_ids):
+    return refresh_rows(
+        Issue.objects.filter(pk__in=issue_ids).values_list(*ROW_FIELDS)
+    )
+
+
+def scan(batch_size=1000, now=None):
+    """
+    Refresh every open issue's SLA row, ``batch_size`` issues at a time.
+
+    Yields ``(scanned_so_far, breached_in_batch)`` after each batch.
+    """
+    now = now or timezone.now()
+    # Rows of issues that were closed since the last scan.
+    removed, _ = IssueSLA.objects.exclude(issue__status__in=OPEN_STATUSES).delete()
+    if removed:
+        _announce([])  # which issues doesn't matter to the listeners
+
+    base = Issue.objects.filter(status__in=OPEN_STATUSES).order_by("pk")
+    last_pk, scanned = 0, 0
+    while True:
+        rows = list(base.filter(pk__gt=last_pk).values_list(*ROW_FIELDS)[:batch_size])
+        if not rows:
+            break
+        with transaction.atomic():
+            _, _, breached = refresh_rows(rows, now)
+        last_pk = rows[-1][0]
+        scanned += len(rows)
+        yield scanned, breached
+
+
+@receiver(post_save, sender=Issue, dispatch_uid="sla_issue_saved")
+def issue_saved(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    refresh_rows([(
+        instance.pk, instance.status, instance.priority,
+        instance.created_at, instance.due_date,
+    )])
+
+
+@receiver(bulk_changed, dispatch_uid="sla_bulk_changed")
+def issues_bulk_changed(sender, pks, **kwargs):
+    if sender is Issue and pks:
+        refresh_issues(pks)
@@ -0,0 +1,366 @@
+"""
+Tenant snapshots: fast dump / restore of the core tables.
+
+A snapshot is a gzip'd stream of JSON lines::
+
+    {"format": "infra-desk-snapshot", "version": 1, "scope": {...}}
+    {"table": "core.partner", "fields": [...], "types": [...]}
+    [[row], [row], ...]                 # up to CHUNK_ROWS rows per line
+    {"end": "core.partner", "rows": 12}
+    ...
+
+Rows are plain ``values_list`` tuples read in primary-key keyset
+batches of CHUNK_ROWS (``pk > last``), so neither side ever holds more
+than a chunk of a table in memory - MySQL drivers would buffer a whole
+result set client side, iterator or not. Values that JSON can't
+carry (decimals, dates, bytes) are encoded according to the field's
+internal type, recorded in the table header.
+
+Restore inserts each table in dependency order with raw multi-row
+INSERTs (``auto_now`` timestamps are kept), foreign key checks deferred
+and verified once at the end, all in one transaction. Derived tables
+(SLA, calendar, similarity and impact indexes) are not dumped; restore
+sends ``bulk_changed`` so they rebuild themselves.
+
+Recurrence rules travel with their project, so restored issues'
+``occurrence_key`` still names an existing rule. Frozen timesheet days
+travel with their client, but ``TimesheetMonth`` (and the profiler's
+``ProfileTrigger``) are shared by all tenants and only in whole-database
+snapshots: a tenant's frozen days are restored into months the target
+has frozen too, other months stay live until ``freeze_timesheets``.
+"""
+import base64
+import gzip
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+from types import SimpleNamespace
+
+from django.contrib.auth.models import User
+from django.core.management.color import no_style
+from django.db import DEFAULT_DB_ALIAS, IntegrityError, connections, transaction
+from django.db.models import CASCADE, Q
+
+from . import impact
+from .models import (
+    Partner, Client, Project,
+    Environment, Server, Resource, RecurrenceRule,
+    UserProfile, Issue, InfraActivity,
+    TimesheetMonth, TimesheetDay,
+    ServerProbe, AuditEntry, ProfileTrigger,
+)
+from .signals import bulk_changed
+
+
+FORMAT = "infra-desk-snapshot"
+VERSION = 1
+CHUNK_ROWS = 1000
+
+# Dependency order. The path is the lookup from the model to its Client
+# (None: scoped by hand below).
+TABLES = [
+    (Partner, None),
+    (Client, ""),
+    (Project, "client"),
+    (Environment, "project__client"),
+    (Server, "environment__project__client"),
+    (Resource, "environment__project__client"),
+    (RecurrenceRule, "project__client"),
+    (UserProfile, None),
+    (Issue, "project__client"),
+    (InfraActivity, "issue__project__client"),
+    (TimesheetMonth, None),
+    (TimesheetDay, "project__client"),
+    (ServerProbe, "server__environment__project__client"),
+    (AuditEntry, None),
+    (ProfileTrigger, None),
+]
+HISTORY_MODELS = (ServerProbe, AuditEntry)
+MODELS_BY_LABEL = {model._meta.label_lower: model for model, _ in TABLES}
+
+
+class SnapshotError(Exception):
+    pass
+
+
+def _scope_filter(model, path, partner_id=None, client_id=None):
+    """
+    Q selecting ``model`` rows of the scope, or None to skip the table.
+    """
+    if partner_id is None and client_id is None:
+        return Q()
+    if model is Partner:
+        if partner_id is not None:
+            return Q(pk=partner_id)
+        return Q(pk__in=Client.objects.filter(pk=client_id).values("partner_id"))
+    if model is UserProfile:
+        if partner_id is not None:
+            return Q(partner_id=partner_id) | Q(client__partner_id=partner_id)
+        return Q(client_id=client_id)
+    if model is AuditEntry:
+        # Entries only record the partner.
+        return Q(partner_id=partner_id) if partner_id is not None else None
+    if model in (TimesheetMonth, ProfileTrigger):
+        # Not tenant data.
+        return None
+    if partner_id is not None:
+        return Q(**{f"{path}__partner_id" if path else "partner_id": partner_id})
+    return Q(**{f"{path}_id" if path else "pk": client_id})
+
+
+# ---------- Value encoding ----------
+
+def _encoder(internal_type):
+    if internal_type == "DecimalField":
+        return str
+    if internal_type in ("DateField", "DateTimeField", "TimeField"):
+        return lambda value: value.isoformat()
+    if internal_type == "BinaryField":
+        return lambda value: base64.b64encode(bytes(value)).decode("ascii")
+    if internal_type == "UUIDField":
+        return str
+    return None
+
+
+def _decoder(internal_type):
+    if internal_type == "DecimalField":
+        return Decimal
+    if internal_type == "DateField":
+        return date.fromisoformat
+    if internal_type == "DateTimeField":
+        return datetime.fromisoformat
+    if internal_type == "TimeField":
+        return time.fromisoformat
+    if internal_type == "BinaryField":
+        return base64.b64decode
+    return None
+
+
+def _converters(types, factory):
+    return [
+        (index, convert)
+        for index, convert in enumerate(map(factory, types))
+        if convert is not None
+    ]
+
+
+def _convert(row, converters):
+    row = list(row)
+    for index, convert in converters:
+        if row[index] is not None:
+            row[index] = convert(row[index])
+    return row
+
+
+# ---------- Dump ----------
+
+def dump(path, partner_id=None, client_id=None, history=True, using=DEFAULT_DB_ALIAS, progress=None):
+    """
+    Write a snapshot of the scope to ``path``; returns ``{label: rows}``.
+    """
+    connection = connections[using]
+    counts = {}
+    if connection.vendor == "mysql":
+        # Applies to the next transaction: one consistent view of all tables.
+        with connection.cursor() as cursor:
+            cursor.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ")
+
+    with transaction.atomic(using=using), gzip.open(path, "wt", encoding="utf-8") as out:
+        out.write(json.dumps({
+            "format": FORMAT,
+            "version": VERSION,
+            "scope": {"partner": partner_id, "client": client_id},
+        }) + "\n")
+        for model, path_to_client in TABLES:
+            if not history and model in HISTORY_MODELS:
+                continue
+            scope = _scope_filter(model, path_to_client, partner_id, client_id)
+            if scope is None:
+                continue
+            label = model._meta.label_lower
+            fields = model._meta.concrete_fields
+            types = [field.get_internal_type() for field in fields]
+            converters = _converters(types, _encoder)
+            out.write(json.dumps({
+                "table": label,
+                "fields": [field.attname for field in fields],
+                "types": types,
+            }) + "\n")
+
+            base = (
+                model._base_manager.using(using)
+                .filter(scope)
+                .order_by("pk")
+                .values_list(*[field.attname for field in fields])
+            )
+            pk_index = fields.index(model._meta.pk)
+            last_pk, total = None, 0
+            while True:
+                batch = base if last_pk is None else base.filter(pk__gt=last_pk)
+                chunk = list(batch[:CHUNK_ROWS])
+                if not chunk:
+                    break
+                last_pk = chunk[-1][pk_index]
+                if converters:
+                    chunk = [_convert(row, converters) for row in chunk]
+                out.write(json.dumps(chunk, separators=(",", ":")) + "\n")
+                total += len(chunk)
+            out.write(json.dumps({"end": label, "rows": total}) + "\n")
+            counts[label] = total
+            if progress:
+                progress(label, total)
+    return counts
+
+
+# ---------- Restore ----------
+
+def _read(path):
+    with gzip.open(path, "rt", encoding="utf-8") as snapshot:
+        header = json.loads(next(snapshot, "null") or "null")
+        if not isinstance(header, dict) or header.get("format") != FORMAT:
+            raise SnapshotError("Not an infra desk snapshot.")
+        if header.get("version") != VERSION:
+            raise SnapshotError(f"Unsupported snapshot version {header.get('version')}.")
+        yield header
+        for line in snapshot:
+            yield json.loads(line)
+
+
+def _insert(model, rows, fields, using):
+    """
+    Multi-row INSERT that keeps the given values as they are (``raw``:
+    no ``auto_now`` overrides, unlike ``bulk_create``) and doesn't build
+    model instances, so no init/save signals fire per row.
+    """
+    field_objects = [model._meta.get_field(name) for name in fields]
+    objs = [SimpleNamespace(**dict(zip(fields, row))) for row in rows]
+    batch_size = connections[using].ops.bulk_batch_size(field_objects, objs) or len(objs)
+    for start in range(0, len(objs), batch_size):
+        model._base_manager.using(using)._insert(
+            objs[start:start + batch_size], fields=field_objects, raw=True, using=using,
+        )
+
+
+class _Restore:
+    """
+    Per-table row fixups that need the target database's current state.
+    """
+
+    def __init__(self, scope, using):
+        self.using = using
+        self.client_scoped = scope.get("client") is not None
+        self.user_ids = set(User.objects.using(using).values_list("pk", flat=True))
+        self.profiled_users = set(UserProfile.objects.using(using).values_list("user_id", flat=True))
+        self.frozen_months = set(TimesheetMonth.objects.using(using).values_list("month", flat=True))
+
+    def prepare(self, model, fields, rows):
+        """
+        Rows to insert, with missing users cleared or the row dropped.
+        """
+        if model is TimesheetMonth:
+            self.frozen_months.update(row[fields.index("month")] for row in rows)
+        elif model is TimesheetDay:
+            # A month that is live here is computed when it gets frozen.
+            month = fields.index("month")
+            rows = [row for row in rows if row[month] in self.frozen_months]
+
+        if model is Partner and self.client_scoped:
+            # Parent of the restored client: keep an existing partner row.
+            existing = set(
+                Partner.objects.using(self.using)
+                .filter(pk__in=[row[0] for row in rows])
+                .values_list("pk", flat=True)
+            )
+            rows = [row for row in rows if row[0] not in existing]
+
+        # A row that belongs to its user (CASCADE, e.g. a user's profile
+        # trigger) is dropped rather than widened to nobody in particular.
+        user_columns = [
+            (index, field.null and field.remote_field.on_delete is not CASCADE)
+            for index, field in enumerate(map(model._meta.get_field, fields))
+            if getattr(field, "related_model", None) is User
+        ]
+        if not user_columns:
+            return rows
+        kept = []
+        for row in rows:
+            for index, nullable in user_columns:
+                if row[index] is not None and row[index] not in self.user_ids:
+                    if not nullable:
+                        break
+                    row[index] = None
+            else:
+                if model is UserProfile:
+                    if row[fields.index("user_id")] in self.profiled_users:
+                        continue
+                    self.profiled_users.add(row[fields.index("user_id")])
+                kept.append(row)
+        return kept
+
+
+def restore(path, using=DEFAULT_DB_ALIAS, progress=None):
+    """
+    Load a snapshot written by ``dump``; returns ``{label: rows}``.
+
+    Everything happens in one transaction: a clash with existing rows
+    or a dangling reference rolls it all back. Rows of the client's
+    partner that already exist are kept.
+    """
+    connection = connections[using]
+    counts, restored = {}, {}
+    stream = _read(path)
+    header = next(stream)
+
+    with transaction.atomic(using=using):
+        fixups = _Restore(header["scope"], using)
+
+        with connection.constraint_checks_disabled():
+            model = fields = converters = None
+            for item in stream:
+                if isinstance(item, dict) and "table" in item:
+                    model = MODELS_BY_LABEL.get(item["table"])
+                    if model is None:
+                        raise SnapshotError(f"Unknown table {item['table']}.")
+                    fields = item["fields"]
+                    converters = _converters(item["types"], _decoder)
+                    counts[item["table"]] = 0
+                    restored[model] = []
+                elif isinstance(item, dict) and "end" in item:
+                    if progress:
+                        progress(item["end"], counts[item["end"]])
+                    model = None
+                else:
+                    if model is None:
+                        raise SnapshotError("Rows outside of a table section.")
+                    rows = [_convert(row, converters) for row in item]
+                    rows = fixups.prepare(model, fields, rows)
+                    if rows:
+                        try:
+                            _insert(model, rows, fields, using)
+                        except IntegrityError as exc:
+                            raise SnapshotError(
+                                f"{model._meta.label_lower}: {exc}. Restore into a "
+                                f"database without this tenant's rows."
+                            )
+                        counts[model._meta.label_lower] += len(rows)
+                        restored[model].extend(row[0] for row in rows)
+
+        connection.check_constraints(
+            table_names=[model._meta.db_table for model in restored],
+        )
+        # Keep auto-increment sequences past the restored ids (PostgreSQL).
+        statements = connection.ops.sequence_reset_sql(no_style(), list(restored))
+        if statements:
+            with connection.cursor() as cursor:
+                for sql in statements:
+                    cursor.execute(sql)
+
+        def rebuild_derived():
+            for changed_model, pks in restored.items():
+                for start in range(0, len(pks), CHUNK_ROWS):
+                    bulk_changed.send(sender=changed_model, pks=pks[start:start + CHUNK_ROWS])
+            impact.rebuild(restored.get(Environment, []))
+
+        transaction.on_commit(rebuild_derived, using=using)
+
+    return counts
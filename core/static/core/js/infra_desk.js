@@ -0,0 +1,130 @@
+// Admin header behaviour (loaded deferred from admin/base_site.html).
+
+(function () {
+  const btn = document.getElementById("infra-avatar-btn");
+  const menu = document.getElementById("infra-avatar-menu");
+  if (!btn || !menu) {
+    return;  // no user bar (login page)
+  }
+
+  btn.addEventListener("click", function (e) {
+    e.stopPropagation();
+    menu.style.display = menu.style.display === "block" ? "none" : "block";
+  });
+
+  document.addEventListener("click", function () {
+    menu.style.display = "none";
+  });
+})();
+
+// Header typeahead: debounced, and a newer keystroke aborts the
+// request still in flight. Enter without a highlighted suggestion
+// falls through to the full search page.
+(function () {
+  const form = document.getElementById("global-search-form");
+  if (!form) {
+    return;
+  }
+  const input = form.querySelector("input[name=q]");
+  const box = document.getElementById("infra-suggest");
+  const url = form.dataset.suggestUrl;
+  const DEBOUNCE_MS = 150;
+  const MIN_LENGTH = 2;
+  let timer = null;
+  let controller = null;
+  let active = -1;
+
+  function close() {
+    box.hidden = true;
+    box.replaceChildren();
+    active = -1;
+  }
+
+  function highlight(index) {
+    const links = box.querySelectorAll("a");
+    links.forEach(function (link, i) {
+      link.classList.toggle("active", i === index);
+    });
+    active = index;
+  }
+
+  function render(rows) {
+    box.replaceChildren();
+    rows.forEach(function (row) {
+      const link = document.createElement("a");
+      link.href = row[2];
+      const model = document.createElement("span");
+      model.className = "model";
+      model.textContent = row[0];
+      const label = document.createElement("span");
+      label.textContent = row[1];
+      link.append(model, label);
+      box.appendChild(link);
+    });
+    box.hidden = rows.length === 0;
+    active = -1;
+  }
+
+  function fetchSuggestions(query) {
+    if (controller) {
+      controller.abort();
+    }
+    controller = new AbortController();
+    fetch(url + "?q=" + encodeURIComponent(query), {
+      signal: controller.signal,
+      headers: {"Accept": "application/json"},
+      credentials: "same-origin",
+    })
+      .then(function (response) {
+        return response.ok ? response.json() : {results: []};
+      })
+      .then(function (data) {
+        if (input.value.trim() === query) {
+          render(data.results || []);
+        }
+      })
+      .catch(function (error) {
+        if (error.name !== "AbortError") {
+          close();
+        }
+      });
+  }
+
+  input.addEventListener("input", function () {
+    clearTimeout(timer);
+    const query = input.value.trim();
+    if (query.length < MIN_LENGTH) {
+      if (controller) {
+        controller.abort();
+      }
+      close();
+      return;
+    }
+    timer = setTimeout(function () {
+      fetchSuggestions(query);
+    }, DEBOUNCE_MS);
+  });
+
+  input.addEventListener("keydown", function (e) {
+    const links = box.querySelectorAll("a");
+    if (box.hidden || !links.length) {
+      return;
+    }
+    if (e.key === "ArrowDown" || e.key === "ArrowUp") {
+      e.preventDefault();
+      const step = e.key === "ArrowDown" ? 1 : -1;
+      highlight((active + step + links.length) % links.length);
+    } else if (e.key === "Enter" && active >= 0) {
+      e.preventDefault();
+      window.location.href = links[active].href;
+    } else if (e.key === "Escape") {
+      close();
+    }
+  });
+
+  document.addEventListener("click", function (e) {
+    if (!form.contains(e.target)) {
+      close();
+    }
+  });
+})();
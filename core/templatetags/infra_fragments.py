@@ -0,0 +1,50 @@
+"""
+Template helpers for cached fragments (see core/fragments.py).
+
+    {% load cache infra_fragments %}
+    {% fragment_seconds as ttl %}
+    {% generation "core.issue" "core.resource" as gen %}
+    {% cache ttl home_counts tenant gen %}...{% endcache %}
+"""
+from django import template
+from django.apps import apps
+
+from core import fragments, search
+
+register = template.Library()
+
+
+@register.simple_tag
+def fragment_seconds():
+    return fragments.cache_seconds()
+
+
+@register.simple_tag
+def generation(*labels):
+    """
+    Generation stamp of the given models ("app_label.model").
+    """
+    return search.stamp([apps.get_model(label) for label in labels])
+
+
+@register.simple_tag(takes_context=True)
+def assignee_generation(context):
+    """
+    Generation of the current user's own issues (see core/fragments.py).
+    """
+    return fragments.assignee_generation(context["request"].user.pk)
+
+
+@register.simple_tag(takes_context=True)
+def tenant_key(context):
+    return fragments.tenant_key(context["request"].user)
+
+
+@register.simple_tag(takes_context=True)
+def tenant_counts(context):
+    return fragments.tenant_counts(context["request"].user)
+
+
+@register.simple_tag(takes_context=True)
+def user_counts(context):
+    return fragments.user_counts(context["request"].user)
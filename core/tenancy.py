@@ -0,0 +1,31 @@
+"""
+The tenant (client and partner) of a project, read from the database.
+
+Deliberately not cached: a project can move to another client, and a
+per-process cache would never hear about it from the other workers.
+"""
+from .models import Project
+
+
+def project_tenants(project_ids):
+    """
+    ``{project_id: (client_id, partner_id)}`` in one query.
+    """
+    return {
+        pk: (client_id, partner_id)
+        for pk, client_id, partner_id in (
+            Project.objects
+            .filter(pk__in=set(project_ids))
+            .order_by()  # Meta.ordering would join partner just to sort
+            .values_list("pk", "client_id", "client__partner_id")
+        )
+    }
+
+
+def project_tenant(project_id):
+    """
+    ``(client_id, partner_id)`` of a project, ``(None, None)`` if it is gone.
+    """
+    if project_id is None:
+        return None, None
+    return project_tenants([project_id]).get(project_id, (None, None))
@@ -0,0 +1,60 @@
+"""
+Shared fixture for the core tests.
+"""
+from datetime import date
+from types import SimpleNamespace
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+
+from ..models import Partner, Client, Project, Environment, Server, Resource, Issue
+
+
+def create_tenant(code):
+    """
+    partner -> client -> project -> "prod" environment with one server
+    and one critical resource, all named after ``code``.
+    """
+    partner = Partner.objects.create(name=f"Partner {code}", code=f"p-{code}")
+    client = Client.objects.create(partner=partner, name=f"Client {code}", code=code)
+    project = Project.objects.create(client=client, name=f"Project {code}", code=code)
+    environment = Environment.objects.create(project=project, name="prod", env_type="prod")
+    server = Server.objects.create(environment=environment, name=f"{code}-web", ip_address="10.0.0.1")
+    resource = Resource.objects.create(
+        environment=environment, name=f"{code}-db", resource_type="database", is_critical=True,
+    )
+    return SimpleNamespace(
+        partner=partner, client=client, project=project,
+        environment=environment, server=server, resource=resource,
+    )
+
+
+# Pages render without a collectstatic manifest.
+@override_settings(STORAGES={
+    **settings.STORAGES,
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+})
+class CoreTestCase(TestCase):
+    """
+    One tenant ("acme", unpacked onto the class), a staff user and an
+    ``issue()`` helper; ``create_tenant`` makes more tenants.
+    """
+    today = date(2026, 10, 19)
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.tenant = create_tenant("acme")
+        cls.partner = cls.tenant.partner
+        cls.customer = cls.tenant.client
+        cls.project = cls.tenant.project
+        cls.environment = cls.tenant.environment
+        cls.server = cls.tenant.server
+        cls.resource = cls.tenant.resource
+        cls.staff = User.objects.create(username="staff", email="staff@example.com", is_staff=True)
+
+    @classmethod
+    def issue(cls, project=None, **fields):
+        fields.setdefault("title", "Renew certificate")
+        fields.setdefault("activity_date", date(2026, 10, 1))
+        return Issue.objects.create(project=project or cls.project, **fields)
@@ -0,0 +1,61 @@
+from decimal import Decimal
+from io import StringIO
+
+import numpy as np
+from django.contrib.auth.models import User
+from django.core.management import call_command
+
+from .. import analytics
+from ..models import EstimateStat
+from .base import CoreTestCase
+
+
+class EstimateStatsTests(CoreTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.alice = User.objects.create(username="alice")
+        # Six SSL renewals by alice: estimated 2h, took 1..6h.
+        cls.actuals = [1, 2, 3, 4, 5, 6]
+        for hours in cls.actuals:
+            cls.issue(
+                status="done", activity_type=" SSL renew", assigned_to=cls.alice,
+                estimate_hours=Decimal("2"), actual_hours=Decimal(hours),
+            )
+        # Too few for their own rows, but counted in "all" and the client.
+        for hours in (4, 4):
+            cls.issue(status="done", activity_type="backup", estimate_hours=Decimal("4"), actual_hours=Decimal(hours))
+        cls.issue(status="open", activity_type="backup", estimate_hours=Decimal("4"), actual_hours=Decimal("40"))
+
+    def test_compute_stats(self):
+        self.assertEqual(analytics.compute_stats(batch_size=3), 4)
+        stats = {(s.dimension, s.key): s for s in EstimateStat.objects.all()}
+        self.assertEqual(set(stats), {
+            ("all", ""), ("activity_type", "ssl renew"),
+            ("client", str(self.customer.pk)), ("assignee", str(self.alice.pk)),
+        })
+        ssl = stats["activity_type", "ssl renew"]
+        ratios = np.array(self.actuals) / 2
+        self.assertEqual(ssl.sample_size, 6)
+        self.assertAlmostEqual(ssl.ratio_mean, ratios.mean())
+        self.assertAlmostEqual(ssl.ratio_p80, np.percentile(ratios, 80))
+        self.assertAlmostEqual(ssl.hours_p50, 3.5)
+        self.assertAlmostEqual(ssl.overrun_share, 4 / 6)
+        self.assertEqual(stats["all", ""].sample_size, 8)
+
+    def test_suggest(self):
+        analytics.compute_stats()
+        hints = analytics.suggest("SSL Renew", client_id=self.customer.pk, assignee_id=self.alice.pk, estimate=2)
+        self.assertEqual(hints["typical"].hours_p50, 3.5)
+        self.assertEqual(hints["basis"].dimension, "assignee")
+        self.assertEqual(hints["adjusted"], round(2 * 1.75, 2))
+        self.assertEqual(analytics.suggest("unknown", estimate=1)["basis"].dimension, "all")
+
+    def test_command_replaces_old_rows(self):
+        analytics.compute_stats()
+        EstimateStat.objects.update(sample_size=0)
+        out = StringIO()
+        call_command("compute_estimate_stats", stdout=out)
+        self.assertIn("Wrote 4 estimate statistics.", out.getvalue())
+        self.assertFalse(EstimateStat.objects.filter(sample_size=0).exists())
@@ -0,0 +1,96 @@
+from datetime import date
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.urls import reverse
+
+from ..models import InfraActivity
+from .base import CoreTestCase, create_tenant
+
+
+class ApiTests(CoreTestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.staff)
+
+    def get(self, resource, pk=None, **params):
+        if pk is None:
+            url = reverse("api_list", args=[resource])
+        else:
+            url = reverse("api_detail", args=[resource, pk])
+        return self.client.get(url, params)
+
+    def revalidate(self, response, resource, **params):
+        url = reverse("api_list", args=[resource])
+        return self.client.get(url, params, headers={"If-None-Match": response["ETag"]})
+
+    def activity(self, issue, **fields):
+        return InfraActivity.objects.create(issue=issue, activity_date=date(2026, 10, 2), **fields)
+
+    def test_list_fields_filters_and_cursor(self):
+        issues = [self.issue(title=f"Issue {n}") for n in range(3)]
+        other = create_tenant("globex")
+        self.issue(project=other.project)
+
+        response = self.get("issues", fields="title", client=self.customer.pk, limit=2)
+        body = response.json()
+        self.assertEqual(body["data"], [{"id": issues[0].pk, "title": "Issue 0"}, {"id": issues[1].pk, "title": "Issue 1"}])
+        after = body["next"].split("after=")[1]
+        body = self.get("issues", fields="title", client=self.customer.pk, limit=2, after=after).json()
+        self.assertEqual([row["id"] for row in body["data"]], [issues[2].pk])
+        self.assertIsNone(body["next"])
+
+    def test_includes(self):
+        issue = self.issue()
+        self.activity(issue, hours_spent=Decimal("1"))
+        body = self.get("issues", issue.pk, fields="title", include="project,activities").json()
+        self.assertEqual(body["data"]["project"], self.project.pk)
+        self.assertEqual(body["included"]["project"][0]["name"], self.project.name)
+        self.assertEqual(len(body["included"]["activities"]), 1)
+
+    def test_errors(self):
+        self.assertEqual(self.get("widgets").status_code, 404)
+        self.assertEqual(self.get("issues", fields="colour").status_code, 400)
+        self.assertEqual(self.get("issues", include="owner").status_code, 400)
+        self.assertEqual(self.get("issues", project="x").status_code, 400)
+        self.assertEqual(self.get("issues", after="!!").status_code, 400)
+        self.assertEqual(self.get("issues", 0).status_code, 404)
+        self.assertEqual(self.client.post(reverse("api_list", args=["issues"])).status_code, 405)
+        self.client.logout()
+        self.assertEqual(self.get("issues").status_code, 401)
+
+    def test_issues_revalidate_on_updated_at(self):
+        issue = self.issue()
+        response = self.get("issues")
+        self.assertIn("Last-Modified", response)
+        # Session, user, and the marker aggregate; no rows.
+        with self.assertNumQueries(3):
+            self.assertEqual(self.revalidate(response, "issues").status_code, 304)
+        issue.title = "Rotate keys"
+        issue.save()
+        self.assertEqual(self.revalidate(response, "issues").status_code, 200)
+
+    def test_appended_models_revalidate_on_count_and_generation(self):
+        issue = self.issue()
+        activity = self.activity(issue)
+        response = self.get("activities")
+        self.assertNotIn("Last-Modified", response)
+        self.assertEqual(self.revalidate(response, "activities").status_code, 304)
+
+        self.activity(issue)
+        response_after_append = self.revalidate(response, "activities")
+        self.assertEqual(response_after_append.status_code, 200)
+
+        activity.note = "Edited in the admin"
+        activity.save()
+        self.assertEqual(self.revalidate(response_after_append, "activities").status_code, 200)
+
+    def test_includes_revalidate_on_their_generation(self):
+        self.issue()
+        response = self.get("issues", include="project")
+        self.assertNotIn("Last-Modified", response)
+        self.assertEqual(self.revalidate(response, "issues", include="project").status_code, 304)
+        self.project.name = "Renamed"
+        self.project.save()
+        self.assertEqual(self.revalidate(response, "issues", include="project").status_code, 200)
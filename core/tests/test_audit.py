@@ -0,0 +1,106 @@
+from datetime import date
+from decimal import Decimal
+
+from django.db import transaction
+from django.test import RequestFactory
+
+from .. import audit
+from ..models import AuditEntry, InfraActivity, Issue
+from .base import CoreTestCase
+
+
+class AuditTests(CoreTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.target = cls.issue()
+
+    def setUp(self):
+        # The fixture's buffer stays queued on the class-wide transaction,
+        # which never commits; each test starts its own.
+        audit._local.buffer = None
+
+    def entries(self, **filters):
+        return list(
+            AuditEntry.objects.filter(**filters).order_by("id")
+            .values_list("action", "field_code", "old_value", "new_value")
+        )
+
+    def test_saves_in_one_transaction_share_one_insert(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            with transaction.atomic():
+                for day in range(1, 6):
+                    InfraActivity.objects.create(
+                        issue=self.target, activity_date=date(2026, 10, day), hours_spent=1,
+                    )
+        flushes = [func for func in callbacks if isinstance(getattr(func, "__self__", None), audit._Buffer)]
+        self.assertEqual(len(flushes), 1)
+        # Issue -> project, project -> partner, one INSERT.
+        with self.assertNumQueries(3):
+            flushes[0]()
+        self.assertEqual(
+            AuditEntry.objects.filter(model_code=2, action=AuditEntry.ACTION_CREATE).count(), 5,
+        )
+        self.assertEqual(set(AuditEntry.objects.values_list("partner_id", flat=True)), {self.partner.pk})
+
+    def test_new_transaction_gets_a_new_buffer(self):
+        for _ in range(2):
+            with self.captureOnCommitCallbacks(execute=True):
+                with transaction.atomic():
+                    InfraActivity.objects.create(issue=self.target, activity_date=date(2026, 10, 1))
+        self.assertEqual(AuditEntry.objects.filter(model_code=2).count(), 2)
+
+    def test_rolled_back_changes_leave_no_history(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    InfraActivity.objects.create(issue=self.target, activity_date=date(2026, 10, 1))
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+        self.assertFalse(AuditEntry.objects.exists())
+
+    def test_update_records_changed_fields_only(self):
+        issue = Issue.objects.get(pk=self.target.pk)
+        issue.status = "blocked"
+        issue.estimate_hours = Decimal("4.00")
+        with self.captureOnCommitCallbacks(execute=True):
+            issue.save()
+        self.assertEqual(self.entries(object_id=issue.pk), [
+            (AuditEntry.ACTION_UPDATE, 6, "open", "blocked"),
+            (AuditEntry.ACTION_UPDATE, 11, "0.00", "4.00"),
+        ])
+        with self.captureOnCommitCallbacks(execute=True):
+            issue.save()
+        self.assertEqual(len(self.entries(object_id=issue.pk)), 2)
+
+    def test_delete_and_acting_user(self):
+        request = RequestFactory().get("/")
+        request.user = self.staff
+        token = audit.set_current_request(request)
+        try:
+            with self.captureOnCommitCallbacks(execute=True):
+                Issue.objects.get(pk=self.target.pk).delete()
+        finally:
+            audit.reset_current_request(token)
+        entry = AuditEntry.objects.get(object_id=self.target.pk)
+        self.assertEqual((entry.action, entry.old_value, entry.user_id),
+                         (AuditEntry.ACTION_DELETE, "Renew certificate", self.staff.pk))
+
+    def test_bulk_update_skips_unchanged_values(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            audit.record_bulk_update(Issue, [
+                (self.target.pk, "status", "open", "done", {"project_id": self.project.pk}),
+                (self.target.pk, "priority", "medium", "medium", {"project_id": self.project.pk}),
+            ])
+        self.assertEqual(self.entries(), [(AuditEntry.ACTION_UPDATE, 6, "open", "done")])
+
+    def test_timelines(self):
+        issue = Issue.objects.get(pk=self.target.pk)
+        issue.title = "Renew wildcard certificate"
+        with self.captureOnCommitCallbacks(execute=True):
+            issue.save()
+        timeline = audit.object_timeline(Issue, issue.pk)
+        self.assertEqual([(row["model"], row["field"]) for row in timeline], [("issue", "title")])
+        self.assertEqual(len(audit.tenant_timeline(self.partner.pk)), 1)
+        self.assertEqual(audit.tenant_timeline(self.partner.pk + 1), [])
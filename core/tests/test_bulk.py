@@ -0,0 +1,134 @@
+import json
+from datetime import date
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import Client as TestClient, override_settings
+from django.urls import reverse
+
+from .. import bulk
+from ..models import InfraActivity
+from .base import CoreTestCase
+
+
+class BulkIngestTests(CoreTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.alice = User.objects.create(username="alice")
+
+    def setUp(self):
+        self.target = self.issue()
+        self.client.force_login(self.staff)
+        self.url = reverse("bulk_log_activities")
+
+    def post_json(self, rows):
+        return self.client.post(self.url, json.dumps(rows), content_type="application/json")
+
+    def test_stores_rows_and_rolls_up_issue(self):
+        response = self.post_json([
+            {"issue": self.target.pk, "activity_date": "2026-10-02", "hours_spent": "1.5", "status": "in_progress"},
+            {"issue": self.target.pk, "activity_date": "2026-10-03", "hours_spent": "2", "status": "done",
+             "performed_by": "alice"},
+        ])
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json(), {"created": 2, "issues_updated": 1})
+        self.target.refresh_from_db()
+        self.assertEqual(self.target.actual_hours, Decimal("3.5"))
+        self.assertEqual(self.target.status, "done")
+        self.assertEqual(
+            list(InfraActivity.objects.order_by("activity_date").values_list("performed_by__username", flat=True)),
+            ["staff", "alice"],
+        )
+
+    def test_csv(self):
+        body = f"issue,activity_date,hours_spent,status\n{self.target.pk},2026-10-02,1,done\n"
+        response = self.client.post(self.url, body, content_type="text/csv")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(InfraActivity.objects.count(), 1)
+
+    def test_invalid_rows_store_nothing(self):
+        response = self.post_json([
+            {"issue": self.target.pk, "activity_date": "2026-10-02", "hours_spent": "1"},
+            {"issue": 999999, "activity_date": "2026-10-02"},
+            {"issue": self.target.pk, "activity_date": "2026-10-02", "status": 5},
+            {"issue": self.target.pk, "activity_date": "not a date"},
+            {"issue": self.target.pk, "activity_date": "2026-10-02", "colour": "red"},
+            {"issue": self.target.pk, "activity_date": "2026-10-02", "performed_by": "mallory"},
+        ])
+        self.assertEqual(response.status_code, 400)
+        errors = response.json()["rows"]
+        self.assertEqual(set(errors), {"2", "3", "4", "5", "6"})
+        self.assertEqual(errors["2"], ["Unknown issue '999999'."])
+        self.assertEqual(errors["3"], ["status: Expected a string."])
+        self.assertTrue(errors["4"][0].startswith("activity_date:"))
+        self.assertEqual(errors["5"], ["Unknown field(s): colour."])
+        self.assertEqual(errors["6"], ["Unknown user 'mallory'."])
+        self.assertFalse(InfraActivity.objects.exists())
+
+    def test_csv_extra_cells(self):
+        body = f"issue,activity_date\n{self.target.pk},2026-10-02,surplus\n"
+        response = self.client.post(self.url, body, content_type="text/csv")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["rows"], {"1": ["More cells than header columns."]})
+
+    def test_malformed_payloads(self):
+        self.assertEqual(self.client.post(self.url, "{", content_type="application/json").status_code, 400)
+        self.assertEqual(self.post_json({"activities": "nope"}).status_code, 400)
+        self.assertEqual(self.post_json([]).status_code, 400)
+
+    def test_staff_only(self):
+        self.client.force_login(self.alice)
+        self.assertEqual(self.post_json([{"issue": self.target.pk}]).status_code, 403)
+
+    def test_newer_logged_activity_keeps_the_status(self):
+        InfraActivity.objects.create(issue=self.target, activity_date=date(2026, 10, 10), status="blocked")
+        response = self.post_json([
+            {"issue": self.target.pk, "activity_date": "2026-10-03", "hours_spent": "2", "status": "done"},
+        ])
+        self.assertEqual(response.status_code, 201)
+        self.target.refresh_from_db()
+        self.assertEqual((self.target.status, self.target.actual_hours), ("open", Decimal("2")))
+
+        self.post_json([{"issue": self.target.pk, "activity_date": "2026-10-10", "status": "done"}])
+        self.target.refresh_from_db()
+        self.assertEqual(self.target.status, "done")
+
+    def test_ids_read_back_without_returning(self):
+        InfraActivity.objects.create(issue=self.target, activity_date=date(2026, 10, 1))
+        activities = [InfraActivity(issue=self.target, activity_date=date(2026, 10, 2)) for _ in range(3)]
+        last_pk = InfraActivity.objects.order_by("-pk").values_list("pk", flat=True).first()
+
+        def first_inserted_id():
+            # SQLite has no LAST_INSERT_ID(); nothing else inserts here.
+            inserted = InfraActivity.objects.filter(pk__gt=last_pk).exclude(pk__in=pks_seen)
+            first = inserted.order_by("pk").values_list("pk", flat=True).first()
+            pks_seen.extend(inserted.values_list("pk", flat=True))
+            return first, 1
+
+        pks_seen = []
+        with mock.patch.object(type(connection.features), "can_return_rows_from_bulk_insert", False), \
+                mock.patch.object(bulk, "_first_inserted_id", first_inserted_id):
+            pks = bulk.bulk_insert(InfraActivity, activities, batch_size=2)
+        self.assertEqual(pks, sorted(pks_seen))
+        self.assertEqual([activity.pk for activity in activities], pks)
+
+    @override_settings(API_TOKENS={"s3cret": "staff", "weak": "alice"})
+    def test_token_auth_and_csrf(self):
+        client = TestClient(enforce_csrf_checks=True)
+        body = json.dumps([{"issue": self.target.pk, "activity_date": "2026-10-02"}])
+
+        def post(**headers):
+            return client.post(self.url, body, content_type="application/json", headers=headers)
+
+        response = post(Authorization="Bearer s3cret")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(InfraActivity.objects.get().performed_by, self.staff)
+        self.assertEqual(post(Authorization="Bearer wrong").status_code, 403)
+        self.assertEqual(post(Authorization="Bearer weak").status_code, 403)
+        # A browser session still needs its CSRF token.
+        client.force_login(self.staff)
+        self.assertEqual(post().status_code, 403)
+        self.assertEqual(post(Authorization="Bearer s3cret").status_code, 201)
@@ -0,0 +1,82 @@
+from datetime import date, timedelta
+from importlib import import_module
+
+from django.apps import apps
+from django.contrib.auth.models import User
+
+from .. import calendar_index
+from ..calendar_index import OPEN_ENDED, issues_between, month_range, week_key
+from ..models import Client, IssueWeekBucket
+from .base import CoreTestCase, create_tenant
+
+
+class CalendarIndexTests(CoreTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.alice = User.objects.create(username="alice")
+
+    def ids(self, start, end, **filters):
+        return [row[0] for row in issues_between(start, end, **filters)]
+
+    def test_buckets_cover_the_span(self):
+        issue = self.issue(activity_date=date(2026, 10, 1), due_date=date(2026, 10, 20))
+        weeks = list(issue.week_buckets.order_by("week").values_list("week", flat=True))
+        self.assertEqual(weeks, list(range(week_key(date(2026, 10, 1)), week_key(date(2026, 10, 20)) + 1)))
+        self.assertEqual({b.client_id for b in issue.week_buckets.all()}, {self.customer.pk})
+
+    def test_overlap_is_trimmed_to_the_day(self):
+        issue = self.issue(activity_date=date(2026, 10, 5), due_date=date(2026, 10, 7))
+        self.assertEqual(self.ids(date(2026, 10, 7), date(2026, 10, 9), client_id=self.customer.pk), [issue.pk])
+        # Same week, but after the due date.
+        self.assertEqual(self.ids(date(2026, 10, 8), date(2026, 10, 9), client_id=self.customer.pk), [])
+        with self.assertNumQueries(1):
+            [row] = issues_between(*month_range(2026, 10), client_id=self.customer.pk)
+        self.assertEqual(row[4:6], [date(2026, 10, 5), date(2026, 10, 7)])
+
+    def test_long_spans_are_open_ended(self):
+        issue = self.issue(activity_date=date(2026, 10, 1), due_date=date(2036, 10, 1))
+        self.assertEqual(list(issue.week_buckets.values_list("week", flat=True)), [OPEN_ENDED])
+        self.assertEqual(self.ids(*month_range(2031, 3), client_id=self.customer.pk), [issue.pk])
+        self.assertEqual(self.ids(*month_range(2036, 10), client_id=self.customer.pk), [issue.pk])
+        self.assertEqual(self.ids(*month_range(2026, 9), client_id=self.customer.pk), [])
+        self.assertEqual(self.ids(*month_range(2036, 11), client_id=self.customer.pk), [])
+
+    def test_filters(self):
+        mine = self.issue(assigned_to=self.alice)
+        other = create_tenant("globex")
+        theirs = self.issue(project=other.project)
+        october = month_range(2026, 10)
+        self.assertEqual(self.ids(*october, client_id=self.customer.pk), [mine.pk])
+        self.assertEqual(self.ids(*october, assignee_id=self.alice.pk), [mine.pk])
+        self.assertEqual(self.ids(*october, partner_id=other.partner.pk), [theirs.pk])
+
+    def test_reindex_follows_changes(self):
+        issue = self.issue()
+        issue.due_date = issue.activity_date + timedelta(days=14)
+        issue.save()
+        self.assertEqual(issue.week_buckets.count(), 3)
+
+        moved_to = Client.objects.create(partner=self.partner, name="Other", code="other")
+        self.project.client = moved_to
+        self.project.save()
+        self.assertEqual(set(issue.week_buckets.values_list("client_id", flat=True)), {moved_to.pk})
+
+        # DELETE, tenant lookup, INSERT.
+        with self.assertNumQueries(3):
+            calendar_index.reindex_rows([
+                (issue.pk, self.project.pk, issue.activity_date, issue.due_date, None),
+            ])
+
+    def test_backfill_migration(self):
+        indexed = self.issue()
+        missing = self.issue(due_date=date(2026, 10, 14))
+        before = sorted(IssueWeekBucket.objects.values_list("issue_id", "week"))
+        IssueWeekBucket.objects.filter(issue=missing).delete()
+
+        migration = import_module("core.migrations.0014_backfill_week_buckets")
+        migration.backfill(apps, None)
+
+        self.assertEqual(sorted(IssueWeekBucket.objects.values_list("issue_id", "week")), before)
+        self.assertEqual(indexed.week_buckets.count(), 1)
@@ -0,0 +1,118 @@
+from datetime import date
+from decimal import Decimal
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..changefeed import ChangeFeed, feed
+from ..models import Client, Issue, InfraActivity, Project
+from ..signals import bulk_changed
+from ..tenancy import project_tenant
+from .base import CoreTestCase
+
+
+class ChangeFeedBufferTests(CoreTestCase):
+
+    def test_since_and_reset(self):
+        buffer = ChangeFeed(3)
+        for n in range(5):
+            buffer.publish({"n": n})
+        self.assertEqual([e["n"] for e in buffer.since(3)[0]], [3, 4])
+        self.assertEqual(buffer.since(3)[1], False)
+        events, reset = buffer.since(1)
+        self.assertTrue(reset)
+        self.assertEqual([e["n"] for e in events], [2, 3, 4])
+        # Ahead of the newest event, or from another epoch.
+        self.assertTrue(buffer.since(9)[1])
+        self.assertTrue(buffer.since(-1)[1])
+
+    def test_cursor_round_trip(self):
+        buffer = ChangeFeed(3)
+        event_id = buffer.publish({})
+        cursor = buffer.cursor({"id": event_id})
+        self.assertEqual(buffer.parse_cursor(cursor), event_id)
+        self.assertIsNone(buffer.parse_cursor(""))
+        self.assertEqual(buffer.parse_cursor("other-1"), -1)
+        buffer.restart()
+        self.assertEqual(buffer.parse_cursor(cursor), -1)
+
+
+class ChangeFeedEventTests(CoreTestCase):
+
+    def events_after(self, last_id):
+        return feed.since(last_id)[0]
+
+    def test_issue_event_carries_the_tenant(self):
+        last_id = feed.last_id()
+        with self.captureOnCommitCallbacks(execute=True):
+            issue = self.issue()
+        [event] = self.events_after(last_id)
+        self.assertEqual(
+            (event["model"], event["op"], event["pk"], event["client"], event["partner"]),
+            ("issue", "created", issue.pk, self.customer.pk, self.partner.pk),
+        )
+
+    def test_tenant_lookup(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(project_tenant(self.project.pk), (self.customer.pk, self.partner.pk))
+        self.assertNotIn("ORDER BY", queries[0]["sql"])
+        self.assertEqual(project_tenant(0), (None, None))
+        self.assertEqual(project_tenant(None), (None, None))
+
+    def test_tenant_is_read_from_the_row(self):
+        issue = self.issue()
+        other = Client.objects.create(partner=self.partner, name="Other", code="other")
+        # As another worker would: no signal reaches this process.
+        Project.objects.filter(pk=self.project.pk).update(client=other)
+        last_id = feed.last_id()
+        issue.status = "blocked"
+        with self.captureOnCommitCallbacks(execute=True):
+            issue.save()
+        self.assertEqual(self.events_after(last_id)[0]["client"], other.pk)
+
+    def test_cascade_delete_keeps_the_tenant(self):
+        issue = self.issue()
+        activity = InfraActivity.objects.create(
+            issue=issue, activity_date=date(2026, 10, 2), hours_spent=Decimal("1.5"),
+        )
+        project_id, last_id = self.project.pk, feed.last_id()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.project.delete()
+        events = {(e["model"], e["pk"]): e for e in self.events_after(last_id)}
+        deleted = events["infraactivity", activity.pk]
+        self.assertEqual(deleted["op"], "deleted")
+        self.assertEqual(
+            (deleted["issue"], deleted["project"], deleted["client"], deleted["hours_spent"]),
+            (issue.pk, project_id, self.customer.pk, "1.50"),
+        )
+        self.assertEqual(events["issue", issue.pk]["client"], self.customer.pk)
+
+    def test_bulk_changed(self):
+        issue = self.issue()
+        Issue.objects.filter(pk=issue.pk).update(status="blocked")
+        last_id = feed.last_id()
+        bulk_changed.send(sender=Issue, pks=[issue.pk])
+        [event] = self.events_after(last_id)
+        self.assertEqual((event["op"], event["status"], event["client"]), ("updated", "blocked", self.customer.pk))
+
+
+class ChangeStreamViewTests(CoreTestCase):
+
+    def test_wsgi_answers_501(self):
+        self.client.force_login(self.staff)
+        response = self.client.get(reverse("issue_change_stream"))
+        self.assertEqual(response.status_code, 501)
+
+    async def test_asgi_streams(self):
+        url = reverse("issue_change_stream")
+        response = await self.async_client.get(url)
+        self.assertEqual(response.status_code, 403)
+
+        await self.async_client.aforce_login(self.staff)
+        response = await self.async_client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        chunks = aiter(response.streaming_content)
+        self.assertEqual(await anext(chunks), b"retry: 3000\n\n")
+        await chunks.aclose()
@@ -0,0 +1,63 @@
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.db import connection
+
+from ..clone import clone_project
+from ..models import Environment, ImpactIndex, Issue, Project, Resource, Server
+from .base import CoreTestCase
+
+
+class CloneProjectTests(CoreTestCase):
+
+    def setUp(self):
+        self.staging = Environment.objects.create(project=self.project, name="staging", env_type="staging")
+        Server.objects.create(environment=self.staging, name="acme-stg", ip_address="10.0.1.1")
+        self.open_issue = self.issue(environment=self.environment, resource=self.resource, actual_hours=3)
+        self.issue(title="Done already", status="closed")
+
+    def clone(self, **kwargs):
+        with self.captureOnCommitCallbacks(execute=True):
+            return clone_project(self.project, self.customer, "Acme copy", "acme-copy", **kwargs)
+
+    def test_copies_the_tree(self):
+        project, counts = self.clone()
+        self.assertEqual(counts, {"environments": 2, "servers": 2, "resources": 1, "issues": 0})
+        self.assertEqual(
+            sorted(Server.objects.filter(environment__project=project).values_list("environment__name", "name")),
+            [("prod", "acme-web"), ("staging", "acme-stg")],
+        )
+        resource = Resource.objects.get(environment__project=project)
+        self.assertEqual((resource.environment.name, resource.is_critical), ("prod", True))
+        self.assertEqual(Server.objects.filter(environment__project=self.project).count(), 2)
+        self.assertEqual(ImpactIndex.objects.filter(environment__project=project).count(), 2)
+
+    def test_open_issues_point_at_the_copies(self):
+        project, counts = self.clone(with_issues=True)
+        self.assertEqual(counts["issues"], 1)
+        copy = Issue.objects.get(project=project)
+        self.assertEqual(copy.title, self.open_issue.title)
+        self.assertEqual(copy.environment.project_id, project.pk)
+        self.assertEqual(copy.resource.environment_id, copy.environment_id)
+        self.assertEqual(copy.actual_hours, 0)
+
+    def test_query_count_does_not_grow_with_rows(self):
+        for n in range(5):
+            Server.objects.create(environment=self.staging, name=f"acme-extra-{n}", ip_address="10.0.1.2")
+            self.issue(title=f"Issue {n}")
+        # Without RETURNING every level reads its new ids back.
+        reads = 0 if connection.features.can_return_rows_from_bulk_insert else 3
+        with self.assertNumQueries(11 + reads):
+            clone_project(self.project, self.customer, "Acme copy", "acme-copy", with_issues=True)
+
+    def test_command(self):
+        out = StringIO()
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command(
+                "clone_project", self.project.pk, name="Acme copy", code="acme-copy",
+                with_issues=True, stdout=out,
+            )
+        self.assertIn("2 environments, 2 servers, 1 resources, 1 issues", out.getvalue())
+        self.assertTrue(Project.objects.filter(client=self.customer, code="acme-copy").exists())
+        with self.assertRaisesMessage(CommandError, "already has a project"):
+            call_command("clone_project", self.project.pk, name="Again", code="acme-copy")
@@ -0,0 +1,43 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core import mail
+
+from .. import digest
+from .base import CoreTestCase
+
+
+class DigestTests(CoreTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.alice = User.objects.create(username="alice", email="alice@example.com")
+        cls.bob = User.objects.create(username="bob", email="bob@example.com")
+        nobody = User.objects.create(username="nobody")  # no email
+        cls.issue(title="Expired cert", due_date=cls.today - timedelta(days=2),
+                  assigned_to=cls.alice, project_manager=cls.bob)
+        cls.issue(title="Rotate keys", due_date=cls.today,
+                  assigned_to=cls.alice, project_manager=cls.alice)
+        cls.issue(title="Upgrade DB", assigned_to=nobody)
+        cls.issue(title="Done already", status="done", assigned_to=cls.alice)
+
+    def test_build(self):
+        digests = {d.user["username"]: d for d in digest.build(self.today)}
+        self.assertEqual(set(digests), {"alice", "bob"})
+        # Assignee and manager of the same issue: listed once.
+        self.assertEqual(digests["alice"].totals, {"overdue": 1, "due_today": 1, "open": 0})
+        self.assertEqual(digests["bob"].totals, {"overdue": 1, "due_today": 0, "open": 0})
+        self.assertEqual(digests["alice"].subject, "Infra Desk digest: 1 overdue, 1 due today")
+
+    def test_build_is_one_query(self):
+        with self.assertNumQueries(1):
+            digest.build(self.today)
+
+    def test_send(self):
+        sent = digest.send(digest.build(self.today, user_ids={self.alice.pk}), self.today)
+        self.assertEqual(sent, 1)
+        self.assertEqual(len(mail.outbox), 1)
+        message = mail.outbox[0]
+        self.assertEqual(message.to, ["alice@example.com"])
+        self.assertIn("Expired cert", message.body)
+        self.assertIn("Rotate keys", message.alternatives[0][0])
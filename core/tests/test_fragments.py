@@ -0,0 +1,110 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.urls import reverse
+
+from .. import fragments, triage
+from ..models import Issue, IssueSLA, UserProfile
+from ..signals import bulk_changed
+from .base import CoreTestCase, create_tenant
+
+
+class AssigneeHeaderTests(CoreTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.alice = User.objects.create(username="alice", is_staff=True)
+        cls.bob = User.objects.create(username="bob", is_staff=True)
+
+    def setUp(self):
+        cache.clear()
+
+    def generations(self):
+        return [fragments.assignee_generation(user.pk) for user in (self.alice, self.bob, self.staff)]
+
+    def test_saves_bump_only_the_assignees(self):
+        issue = self.issue(assigned_to=self.alice)
+        self.assertEqual(self.generations(), [1, 0, 0])
+        issue.title = "Renew wildcard certificate"
+        issue.save()
+        self.assertEqual(self.generations(), [2, 0, 0])
+        issue.assigned_to = self.bob
+        issue.save()
+        self.assertEqual(self.generations(), [3, 1, 0])
+        issue.delete()
+        self.assertEqual(self.generations(), [3, 2, 0])
+
+    def test_bulk_paths(self):
+        issue = self.issue(assigned_to=self.alice)
+        bulk_changed.send(sender=IssueSLA, pks=[issue.pk])
+        self.assertEqual(self.generations(), [2, 0, 0])
+        with self.captureOnCommitCallbacks(execute=True):
+            triage.reassign([issue.pk], self.bob, assigned_by=self.staff)
+        alice, bob, staff = self.generations()
+        self.assertEqual((alice, staff), (3, 0))
+        self.assertGreater(bob, 0)
+
+    def test_user_counts_survive_other_users_changes(self):
+        self.issue(assigned_to=self.bob)
+        self.assertEqual(fragments.user_counts(self.bob), {"open": 1, "breached": 0})
+        self.issue(assigned_to=self.alice)
+        Issue.objects.filter(assigned_to=self.alice).update(status="blocked")
+        with self.assertNumQueries(0):
+            self.assertEqual(fragments.user_counts(self.bob), {"open": 1, "breached": 0})
+        self.issue(assigned_to=self.bob)
+        self.assertEqual(fragments.user_counts(self.bob)["open"], 2)
+
+    def test_header_shows_own_issues(self):
+        self.issue(assigned_to=self.bob)
+        self.client.force_login(self.bob)
+        response = self.client.get(reverse("admin:index"))
+        self.assertContains(response, "My issues: 1")
+        self.issue(assigned_to=self.bob)
+        self.assertContains(self.client.get(reverse("admin:index")), "My issues: 2")
+
+
+class TenantCountsTests(CoreTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.other = create_tenant("globex")
+        cls.carol = User.objects.create(username="carol", is_staff=True)
+        UserProfile.objects.create(user=cls.carol, client=cls.customer)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_tenant_lookup(self):
+        self.assertEqual(fragments.tenant_key(self.carol), f"c{self.customer.pk}")
+        self.assertEqual(fragments.tenant_key(self.staff), "all")
+        with self.assertNumQueries(0):
+            self.assertEqual(fragments.tenant_for(self.carol), (None, self.customer.pk))
+        UserProfile.objects.filter(user=self.carol).update(client=None, partner=self.other.partner)
+        bulk_changed.send(sender=UserProfile, pks=[])
+        self.assertEqual(fragments.tenant_key(self.carol), f"p{self.other.partner.pk}")
+
+    def test_counts_are_scoped_and_cached(self):
+        breached = self.issue()
+        self.issue(status="closed")
+        self.issue(project=self.other.project)
+        IssueSLA.objects.filter(issue=breached).update(state=IssueSLA.STATE_BREACHED)
+        bulk_changed.send(sender=IssueSLA, pks=[breached.pk])
+
+        expected = {"open": 1, "at_risk": 0, "breached": 1, "critical_resources": 1}
+        self.assertEqual(fragments.tenant_counts(self.carol), expected)
+        with self.assertNumQueries(0):
+            self.assertEqual(fragments.tenant_counts(self.carol), expected)
+        self.assertEqual(fragments.tenant_counts(self.staff)["open"], 2)
+        self.issue()
+        self.assertEqual(fragments.tenant_counts(self.carol)["open"], 2)
+
+    def test_home_page(self):
+        self.issue()
+        self.client.force_login(self.carol)
+        response = self.client.get(reverse("home"))
+        self.assertContains(response, "<strong>1</strong><span>Open issues</span>")
+        with self.assertNumQueries(2):  # session and user only
+            self.client.get(reverse("home"))
+        self.issue()
+        self.assertContains(self.client.get(reverse("home")), "<strong>2</strong><span>Open issues</span>")
@@ -0,0 +1,152 @@
+from datetime import date
+from importlib import import_module
+
+from django.apps import apps
+
+from .. import impact
+from ..models import Environment, Server, Resource, ImpactIndex
+from .base import CoreTestCase, create_tenant
+
+
+class ImpactIndexTests(CoreTestCase):
+
+    def setUp(self):
+        impact._pending.state = None
+        impact.rebuild_all()
+        self.staging = Environment.objects.create(project=self.project, name="staging", env_type="staging")
+        impact.rebuild([self.staging.pk])
+
+    def graph(self, environment):
+        return ImpactIndex.objects.get(environment=environment).graph
+
+    def issue_ids(self, environment):
+        return [entry["id"] for entry in self.graph(environment)["open_issues"]]
+
+    def flushes(self, callbacks):
+        return [callback for callback in callbacks if callback is impact._flush]
+
+    def assertMatchesRebuild(self, *environments):
+        built = impact.build_graphs([env.pk for env in environments])
+        for env in environments:
+            self.assertEqual(self.graph(env), built[env.pk])
+
+    def test_new_issue_is_patched_in(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            later = self.issue(environment=self.environment, due_date=date(2026, 11, 1))
+            sooner = self.issue(environment=self.environment, due_date=date(2026, 10, 25))
+            undated = self.issue(environment=self.environment)
+        self.assertEqual(self.issue_ids(self.environment), [sooner.pk, later.pk, undated.pk])
+        self.assertEqual(self.graph(self.environment)["open_issues"][0]["due_date"], "2026-10-25")
+        self.assertMatchesRebuild(self.environment)
+
+    def test_patch_reads_only_the_changed_rows(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            issue = self.issue(environment=self.environment)
+        issue.title = "Rotate keys"
+        with self.captureOnCommitCallbacks() as callbacks:
+            issue.save()
+        # Changed issue, index row, bulk update.
+        with self.assertNumQueries(3):
+            self.flushes(callbacks)[0]()
+        self.assertEqual(self.graph(self.environment)["open_issues"][0]["title"], "Rotate keys")
+
+    def test_unchanged_or_untracked_saves_are_skipped(self):
+        issue = self.issue(environment=self.environment)
+        with self.captureOnCommitCallbacks() as callbacks:
+            issue.save()
+        self.assertEqual(self.flushes(callbacks), [])
+        issue.description = "Only the description"
+        with self.captureOnCommitCallbacks() as callbacks:
+            issue.save(update_fields=["description"])
+        self.assertEqual(self.flushes(callbacks), [])
+
+    def test_closed_issue_drops_out(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            issue = self.issue(environment=self.environment)
+        issue.status = "done"
+        with self.captureOnCommitCallbacks(execute=True):
+            issue.save(update_fields=["status"])
+        self.assertEqual(self.issue_ids(self.environment), [])
+
+    def test_moved_issue_leaves_its_old_environment(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            issue = self.issue(environment=self.environment)
+        issue.environment = self.staging
+        with self.captureOnCommitCallbacks(execute=True):
+            issue.save()
+        self.assertEqual(self.issue_ids(self.environment), [])
+        self.assertEqual(self.issue_ids(self.staging), [issue.pk])
+
+    def test_issue_is_listed_under_its_resource(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            issue = self.issue(environment=self.staging, resource=self.resource)
+            unplaced = self.issue(resource=self.resource)
+        self.assertEqual(self.issue_ids(self.environment), [issue.pk, unplaced.pk])
+        self.assertEqual(self.issue_ids(self.staging), [issue.pk])
+        self.assertEqual(impact.blast_radius("issue", unplaced.pk)["environment"]["id"], self.environment.pk)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            unplaced.delete()
+        self.assertEqual(self.issue_ids(self.environment), [issue.pk])
+
+    def test_resource_changes(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            issue = self.issue(environment=self.staging, resource=self.resource)
+            cache = Resource.objects.create(environment=self.environment, name="acme-cache", resource_type="cache")
+        names = [entry["name"] for entry in self.graph(self.environment)["resources"]]
+        self.assertEqual(names, ["acme-db", "acme-cache"])
+
+        # Moving a resource takes its issues along.
+        self.resource.environment = self.staging
+        with self.captureOnCommitCallbacks(execute=True):
+            self.resource.save()
+        self.assertMatchesRebuild(self.environment, self.staging)
+        self.assertEqual(self.issue_ids(self.environment), [])
+
+        # Deleting one clears the resource from its issues' entries.
+        with self.captureOnCommitCallbacks(execute=True):
+            self.resource.delete()
+            cache.delete()
+        self.assertMatchesRebuild(self.environment, self.staging)
+        self.assertEqual(self.graph(self.staging)["open_issues"][0]["resource_id"], None)
+        self.assertEqual(self.issue_ids(self.staging), [issue.pk])
+
+    def test_servers_and_blast_radius(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            other = Server.objects.create(environment=self.environment, name="acme-api", ip_address="10.0.0.2")
+            issue = self.issue(environment=self.environment, resource=self.resource)
+        radius = impact.blast_radius("server", self.server.pk)
+        self.assertEqual([s["id"] for s in radius["servers"]], [other.pk])
+        radius = impact.blast_radius("resource", self.resource.pk)
+        self.assertTrue(radius["node"]["is_critical"])
+        self.assertEqual([i["id"] for i in radius["direct_issues"]], [issue.pk])
+        self.assertEqual(radius["resources"], [])
+        self.assertIsNone(impact.blast_radius("server", 0))
+        with self.assertRaises(ValueError):
+            impact.blast_radius("client", self.customer.pk)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            other.delete()
+        self.assertEqual([s["id"] for s in self.graph(self.environment)["servers"]], [self.server.pk])
+
+    def test_environment_without_a_row_is_built(self):
+        other = create_tenant("globex")
+        with self.captureOnCommitCallbacks(execute=True):
+            issue = self.issue(project=other.project, environment=other.environment)
+        self.assertEqual(self.issue_ids(other.environment), [issue.pk])
+        self.assertMatchesRebuild(other.environment)
+
+    def test_project_rename_rebuilds_its_environments(self):
+        self.project.name = "Renamed"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.project.save()
+        self.assertEqual(self.graph(self.staging)["environment"]["project"], "Renamed")
+
+    def test_backfill_migration(self):
+        ImpactIndex.objects.filter(environment=self.staging).delete()
+        ImpactIndex.objects.filter(environment=self.environment).update(graph={})
+
+        import_module("core.migrations.0016_backfill_impact_index").backfill(apps, None)
+
+        self.assertMatchesRebuild(self.staging)
+        self.assertEqual(self.graph(self.environment), {})
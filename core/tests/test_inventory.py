@@ -0,0 +1,67 @@
+import json
+from io import StringIO
+from unittest import mock
+
+from django.urls import reverse
+
+from .. import inventory
+from ..models import Client, Environment, Project
+from .base import CoreTestCase, create_tenant
+
+
+class InventoryTests(CoreTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.other = create_tenant("globex")
+        # A second client of acme's partner, with an empty project.
+        second = Client.objects.create(partner=cls.partner, name="Client initech", code="initech")
+        cls.empty = Project.objects.create(client=second, name="Project initech", code="initech")
+        Environment.objects.create(project=cls.project, name="staging", env_type="staging")
+        cls.resource.connection_info = "postgres://admin:secret@db"
+        cls.resource.save()
+
+    def export(self, **scope):
+        out = StringIO()
+        written = inventory.export(out, **scope)
+        self.assertEqual(written, len(out.getvalue()))
+        return json.loads(out.getvalue())
+
+    def test_nested_tree(self):
+        with self.assertNumQueries(6):
+            document = self.export()
+        self.assertEqual([p["code"] for p in document["partners"]], ["p-acme", "p-globex"])
+        [acme, initech] = document["partners"][0]["clients"]
+        self.assertEqual((acme["code"], initech["code"]), ("acme", "initech"))
+        self.assertEqual(initech["projects"][0]["environments"], [])
+        [prod, staging] = acme["projects"][0]["environments"]
+        self.assertEqual((prod["name"], staging["name"]), ("prod", "staging"))
+        self.assertEqual([s["ip_address"] for s in prod["servers"]], ["10.0.0.1"])
+        self.assertEqual((staging["servers"], staging["resources"]), ([], []))
+        self.assertEqual(prod["resources"][0]["name"], "acme-db")
+        self.assertNotIn("connection_info", prod["resources"][0])
+
+    def test_scopes(self):
+        by_partner = self.export(partner_id=self.other.partner.pk)
+        self.assertEqual([p["code"] for p in by_partner["partners"]], ["p-globex"])
+        by_client = self.export(client_id=self.customer.pk)
+        [partner] = by_client["partners"]
+        self.assertEqual([c["code"] for c in partner["clients"]], ["acme"])
+        self.assertEqual(by_client["scope"], {"partner": None, "client": self.customer.pk})
+
+    def test_streams_in_chunks(self):
+        with mock.patch.object(inventory, "FLUSH_BYTES", 100):
+            chunks = list(inventory.stream())
+        self.assertGreater(len(chunks), 3)
+        self.assertEqual(len(json.loads("".join(chunks))["partners"]), 2)
+
+    def test_view(self):
+        url = reverse("inventory_export")
+        self.assertEqual(self.client.get(url).status_code, 403)
+        self.client.force_login(self.staff)
+        self.assertEqual(self.client.get(url, {"partner": "x"}).status_code, 400)
+        self.assertEqual(self.client.get(url, {"partner": 1, "client": 1}).status_code, 400)
+        response = self.client.get(url, {"client": self.other.client.pk})
+        document = json.loads(b"".join(response.streaming_content))
+        self.assertEqual([p["code"] for p in document["partners"]], ["p-globex"])
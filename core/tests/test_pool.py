@@ -0,0 +1,149 @@
+import os
+import tempfile
+import threading
+from unittest import mock
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connections
+from django.test import SimpleTestCase
+
+from ..db import pool as pool_module
+from ..db.backends.sqlite3.base import DatabaseWrapper
+from ..db.pool import ConnectionPool, PoolTimeout, close_pools, pool_stats
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class ConnectionPoolTests(SimpleTestCase):
+
+    def setUp(self):
+        self.opened, self.healthy, self.reachable = [], True, True
+        self.clock = Clock()
+        patcher = mock.patch.object(pool_module.time, "monotonic", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def connect(self):
+        if not self.reachable:
+            raise OSError("connection refused")
+        conn = FakeConnection()
+        self.opened.append(conn)
+        return conn
+
+    def make_pool(self, **options):
+        return ConnectionPool(self.connect, lambda conn: self.healthy, **options)
+
+    def test_reuses_the_most_recent_connection(self):
+        pool = self.make_pool()
+        first, second = pool.acquire(), pool.acquire()
+        pool.release(first)
+        pool.release(second)
+        self.assertIs(pool.acquire(), second)
+        stats = pool.stats()
+        self.assertEqual((stats["connects"], stats["reuses"], stats["size"], stats["idle"]), (2, 1, 2, 1))
+
+    def test_expired_connections_are_replaced(self):
+        pool = self.make_pool(max_idle=60, max_lifetime=600, check_after=30)
+        conn = pool.acquire()
+        pool.release(conn)
+        self.clock.now += 61
+        self.assertIsNot(pool.acquire(), conn)
+        self.assertTrue(conn.closed)
+
+        # Released after its lifetime: not kept at all.
+        old = pool.acquire()
+        self.clock.now += 601
+        pool.release(old)
+        self.assertTrue(old.closed)
+
+    def test_idle_connections_are_checked(self):
+        pool = self.make_pool(check_after=30)
+        conn = pool.acquire()
+        pool.release(conn)
+        self.clock.now += 10
+        self.assertIs(pool.acquire(), conn)  # too fresh to ping
+        pool.release(conn)
+        self.clock.now += 31
+        self.healthy = False
+        self.assertIsNot(pool.acquire(), conn)
+        self.assertEqual(pool.stats()["failed_checks"], 1)
+
+    def test_waits_for_a_release_then_times_out(self):
+        pool = self.make_pool(max_size=1, timeout=5)
+        conn = pool.acquire()
+        releaser = threading.Timer(0.05, pool.release, args=[conn])
+        releaser.start()
+        self.assertIs(pool.acquire(), conn)
+        releaser.join()
+
+        with mock.patch.object(pool._cond, "wait", return_value=False):
+            with self.assertRaises(PoolTimeout):
+                pool.acquire()
+        stats = pool.stats()
+        self.assertEqual((stats["waits"], stats["timeouts"]), (2, 1))
+
+    def test_failed_connects_and_foreign_connections_free_their_slot(self):
+        pool = self.make_pool(max_size=1)
+        self.reachable = False
+        with self.assertRaises(OSError):
+            pool.acquire()
+        self.reachable = True
+        self.assertEqual(pool.stats()["size"], 0)
+        foreign = FakeConnection()
+        pool.release(foreign)
+        self.assertTrue(foreign.closed)
+        self.assertEqual(pool.stats()["size"], 0)
+        pool.acquire()
+
+    def test_discard_and_close_all(self):
+        pool = self.make_pool()
+        broken, idle = pool.acquire(), pool.acquire()
+        pool.release(broken, discard=True)
+        pool.release(idle)
+        pool.close_all()
+        self.assertTrue(broken.closed and idle.closed)
+        self.assertEqual(pool.stats()["size"], 0)
+
+    def test_size_must_be_positive(self):
+        with self.assertRaises(ImproperlyConfigured):
+            self.make_pool(max_size=0)
+
+
+class PooledBackendTests(SimpleTestCase):
+
+    def test_sqlite_connections_go_back_to_the_pool(self):
+        fd, name = tempfile.mkstemp(suffix=".sqlite3")
+        os.close(fd)
+        self.addCleanup(os.remove, name)
+        self.addCleanup(close_pools)
+        settings_dict = {
+            **connections["default"].settings_dict,
+            "ENGINE": "core.db.backends.sqlite3",
+            "NAME": name,
+            "POOL": {"MAX_SIZE": 2},
+        }
+        wrapper = DatabaseWrapper(settings_dict, alias="pool_test")
+        wrapper.ensure_connection()
+        raw = wrapper.connection
+        wrapper.close()
+        wrapper.ensure_connection()
+        self.assertIs(wrapper.connection, raw)
+        with wrapper.cursor() as cursor:
+            cursor.execute("SELECT 1")
+        wrapper.close()
+        stats = pool_stats()["pool_test"]
+        self.assertEqual((stats["connects"], stats["reuses"], stats["idle"]), (1, 1, 1))
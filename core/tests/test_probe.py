@@ -0,0 +1,54 @@
+import asyncio
+import socket
+from datetime import timedelta
+
+from django.utils import timezone
+
+from ..models import Server, ServerProbe
+from ..probe import probe_servers, probe_targets, prune_probes, with_last_probe
+from .base import CoreTestCase
+
+
+class ProbeTests(CoreTestCase):
+    def setUp(self):
+        self.listener = socket.socket()
+        self.listener.bind(("127.0.0.1", 0))
+        self.listener.listen()
+        self.addCleanup(self.listener.close)
+        self.open_port = self.listener.getsockname()[1]
+
+        closed = socket.socket()
+        closed.bind(("127.0.0.1", 0))
+        self.closed_port = closed.getsockname()[1]
+        closed.close()
+
+    def test_probe_targets(self):
+        results = asyncio.run(probe_targets(
+            [("up", "127.0.0.1", self.open_port), ("down", "127.0.0.1", self.closed_port)],
+            timeout=2, jitter=0,
+        ))
+        is_up, latency_ms, error = results["up"]
+        self.assertTrue(is_up)
+        self.assertGreaterEqual(latency_ms, 0)
+        self.assertEqual(error, "")
+        self.assertEqual(results["down"], (False, None, "refused"))
+
+    def test_probe_servers_stores_results(self):
+        Server.objects.filter(pk=self.server.pk).update(ip_address="127.0.0.1", ssh_port=self.open_port)
+        down = Server.objects.create(environment=self.environment, name="db", ip_address="127.0.0.1",
+                                     ssh_port=self.closed_port)
+        Server.objects.create(environment=self.environment, name="old", ip_address="127.0.0.1", is_active=False)
+
+        self.assertEqual(probe_servers(timeout=2, jitter=0), (2, 1))
+        probes = dict(ServerProbe.objects.values_list("server_id", "is_up"))
+        self.assertEqual(probes, {self.server.pk: True, down.pk: False})
+
+        server = with_last_probe(Server.objects.filter(pk=self.server.pk)).get()
+        self.assertTrue(server.last_probe_up)
+
+    def test_prune_probes(self):
+        now = timezone.now()
+        ServerProbe.objects.create(server=self.server, checked_at=now - timedelta(days=40), is_up=True)
+        ServerProbe.objects.create(server=self.server, checked_at=now, is_up=False)
+        self.assertEqual(prune_probes(30), 1)
+        self.assertEqual(ServerProbe.objects.count(), 1)
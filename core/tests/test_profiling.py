@@ -0,0 +1,104 @@
+import tempfile
+from collections import Counter
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import RequestFactory, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from .. import profiling
+from ..models import ProfileTrigger
+from .base import CoreTestCase
+
+
+class ProfilingTests(CoreTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.staff.is_superuser = True
+        cls.staff.save()
+        cls.alice = User.objects.create(username="alice")
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings = override_settings(PROFILER_DIR=directory.name, PROFILER_INTERVAL_MS=1)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        # Triggers are rolled back with the test; don't let them linger.
+        profiling._triggers.reset()
+        self.addCleanup(profiling._triggers.reset)
+
+    def request(self, path, user=None):
+        request = RequestFactory().get(path)
+        request.user = user or self.alice
+        return request
+
+    def test_match(self):
+        self.assertIsNone(profiling.match(self.request("/api/timesheet/")))
+        by_path = ProfileTrigger.objects.create(path_pattern=r"^/api/")
+        by_user = ProfileTrigger.objects.create(user=self.staff)
+        self.assertEqual(profiling.match(self.request("/api/timesheet/")), by_path.pk)
+        self.assertIsNone(profiling.match(self.request("/admin/")))
+        self.assertEqual(profiling.match(self.request("/admin/", self.staff)), by_user.pk)
+
+        ProfileTrigger.objects.all().delete()
+        ProfileTrigger.objects.create(expires_at=timezone.now() - timedelta(minutes=1))
+        ProfileTrigger.objects.create(path_pattern="[", sample_rate=1)
+        self.assertIsNone(profiling.match(self.request("/")))
+
+    def test_sample_rate(self):
+        trigger = ProfileTrigger.objects.create(sample_rate=4)
+        with mock.patch.object(profiling.random, "randrange", side_effect=[3, 0]):
+            self.assertIsNone(profiling.match(self.request("/")))
+            self.assertEqual(profiling.match(self.request("/")), trigger.pk)
+
+    def test_triggers_are_cached_between_refreshes(self):
+        ProfileTrigger.objects.create()
+        profiling.match(self.request("/"))
+        with self.assertNumQueries(0):
+            profiling.match(self.request("/"))
+
+    def test_profiled_request(self):
+        trigger = ProfileTrigger.objects.create(user=self.staff, path_pattern=r"^/api/inventory/")
+        self.client.force_login(self.staff)
+        response = self.client.get(reverse("inventory_export"))
+        b"".join(response.streaming_content)
+        name = response["X-Profile"]
+        meta, stacks, queries = profiling.load(name)
+        self.assertEqual((meta["path"], meta["user"], meta["trigger"]), ("/api/inventory/", "staff", trigger.pk))
+        self.assertEqual(meta["queries"], len(queries))
+        self.assertTrue(all("sql" in query and "at_ms" in query for query in queries))
+        self.assertEqual([summary["name"] for summary in profiling.listing()], [name])
+        self.assertNotIn("X-Profile", self.client.get(reverse("home")))
+
+    def test_store_keeps_the_newest(self):
+        names = []
+        with override_settings(PROFILER_MAX_PROFILES=2):
+            for n in range(3):
+                with mock.patch.object(profiling.timezone, "now", return_value=timezone.now() + timedelta(seconds=n)):
+                    names.append(profiling.save({"path": f"/{n}"}, Counter({"a;b": n + 1}), []))
+        self.assertEqual([summary["name"] for summary in profiling.listing()], names[:0:-1])
+        with self.assertRaises(FileNotFoundError):
+            profiling.load(names[0])
+        with self.assertRaises(FileNotFoundError):
+            profiling.load("../settings")
+
+    def test_stack_summaries(self):
+        stacks = [("main;view;query", 3), ("main;view", 1)]
+        self.assertEqual(profiling.collapsed(stacks), "main;view;query 3\nmain;view 1\n")
+        self.assertEqual(profiling.hot_frames(stacks), [("query", 3, 3), ("view", 1, 4)])
+
+    def test_views(self):
+        name = profiling.save({"path": "/"}, Counter({"main;view": 2}), [{"ms": 1.5, "sql": "SELECT 1"}])
+        self.client.force_login(self.staff)
+        self.assertContains(self.client.get(reverse("profiles")), name)
+        self.assertContains(self.client.get(reverse("profile_detail", args=[name])), "SELECT 1")
+        download = self.client.get(reverse("profile_download", args=[name]))
+        self.assertEqual(download.content, b"main;view 2\n")
+        self.assertEqual(self.client.get(reverse("profile_detail", args=["20260101T000000-00000000"])).status_code, 404)
+        self.assertRedirects(self.client.post(reverse("profile_delete", args=[name])), reverse("profiles"))
+        self.assertEqual(profiling.listing(), [])
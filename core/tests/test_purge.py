@@ -0,0 +1,77 @@
+from datetime import date
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from django.db import models
+
+from .. import search
+from ..models import (
+    Client, Environment, InfraActivity, Issue, Partner, Project, Resource, Server, UserProfile,
+)
+from ..purge import PurgeBlocked, PurgePlan
+from .base import CoreTestCase, create_tenant
+
+
+class PurgeTests(CoreTestCase):
+
+    def setUp(self):
+        self.other = create_tenant("globex")
+        for n in range(3):
+            issue = self.issue(title=f"Issue {n}", environment=self.environment)
+            InfraActivity.objects.create(issue=issue, activity_date=date(2026, 10, 2), hours_spent=1)
+        self.kept = self.issue(project=self.other.project)
+        self.profile = UserProfile.objects.create(user=self.staff, partner=self.partner, client=self.customer)
+
+    def counts(self, plan):
+        return {model: (deleted, unlinked) for model, deleted, unlinked in plan.counts()}
+
+    def test_counts(self):
+        counts = self.counts(PurgePlan(self.customer))
+        self.assertEqual(counts[Client], (1, 0))
+        self.assertEqual(counts[Issue], (3, 0))
+        self.assertEqual(counts[InfraActivity], (3, 0))
+        self.assertEqual(counts[UserProfile], (0, 1))
+
+    def test_execute_in_batches(self):
+        progress = []
+        generation = search.stamp([Issue])
+        deleted = PurgePlan(self.customer).execute(
+            batch_size=2, progress=lambda model, done: progress.append((model, done)),
+        )
+        self.assertEqual((deleted[Issue], deleted[InfraActivity], deleted[Server]), (3, 3, 1))
+        self.assertIn((Issue, 2), progress)
+        self.assertIn((Issue, 3), progress)
+        self.assertFalse(Client.objects.filter(pk=self.customer.pk).exists())
+        self.assertFalse(Environment.objects.filter(project_id=self.project.pk).exists())
+        self.assertTrue(Partner.objects.filter(pk=self.partner.pk).exists())
+        self.assertEqual(list(Issue.objects.values_list("pk", flat=True)), [self.kept.pk])
+        self.profile.refresh_from_db()
+        self.assertEqual((self.profile.partner_id, self.profile.client_id), (self.partner.pk, None))
+        self.assertNotEqual(search.stamp([Issue]), generation)
+
+    def test_partner_purge_keeps_other_tenants(self):
+        PurgePlan(self.partner).execute()
+        self.assertEqual(list(Project.objects.values_list("code", flat=True)), ["globex"])
+        self.assertEqual(list(Resource.objects.values_list("name", flat=True)), ["globex-db"])
+        self.profile.refresh_from_db()
+        self.assertIsNone(self.profile.partner_id)
+        self.assertTrue(User.objects.filter(pk=self.staff.pk).exists())
+
+    def test_protected_rows_block(self):
+        field = Issue._meta.get_field("environment")
+        with mock.patch.object(field.remote_field, "on_delete", models.PROTECT):
+            plan = PurgePlan(self.customer)
+        self.assertEqual(plan.blockers(), [(Issue, 3)])
+        with self.assertRaisesMessage(PurgeBlocked, "3 issues still reference this tenant."):
+            plan.execute()
+        self.assertTrue(Client.objects.filter(pk=self.customer.pk).exists())
+
+    def test_command(self):
+        out = StringIO()
+        call_command("purge_tenant", client=self.customer.pk, yes=True, stdout=out)
+        self.assertIn("issues: 3 to delete", out.getvalue())
+        self.assertFalse(Client.objects.filter(pk=self.customer.pk).exists())
+        with self.assertRaisesMessage(CommandError, "No client"):
+            call_command("purge_tenant", client=self.customer.pk, yes=True, stdout=out)
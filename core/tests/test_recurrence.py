@@ -0,0 +1,51 @@
+from datetime import date, timedelta
+
+from .. import recurrence
+from ..models import Issue, RecurrenceRule
+from .base import CoreTestCase
+
+
+class OccurrenceTests(CoreTestCase):
+    def test_month_end_is_clamped_per_occurrence(self):
+        days = list(recurrence.occurrences(
+            "monthly", 1, date(2026, 1, 31), None, date(2026, 1, 1), date(2026, 4, 30),
+        ))
+        self.assertEqual(days, [date(2026, 1, 31), date(2026, 2, 28), date(2026, 3, 31), date(2026, 4, 30)])
+
+    def test_weekly_from_a_later_start(self):
+        days = list(recurrence.occurrences(
+            "weekly", 2, date(2026, 1, 5), None, date(2026, 2, 1), date(2026, 2, 28),
+        ))
+        self.assertEqual(days, [date(2026, 2, 2), date(2026, 2, 16)])
+
+
+class ScheduleTests(CoreTestCase):
+    start = date(2026, 10, 5)
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.rule = RecurrenceRule.objects.create(
+            project=cls.project, resource=cls.resource, title="Patch DB",
+            frequency="weekly", start_date=cls.start, due_after_days=2,
+        )
+
+    def test_schedule_is_idempotent(self):
+        first = recurrence.schedule(start=self.start, days=28)
+        self.assertEqual(first["created"], 5)
+        issues = Issue.objects.filter(occurrence_key__startswith=f"r{self.rule.pk}:")
+        self.assertEqual(issues.count(), 5)
+        issue = issues.get(activity_date=self.start)
+        self.assertEqual(issue.environment_id, self.environment.pk)
+        self.assertEqual(issue.due_date, self.start + timedelta(days=2))
+
+        again = recurrence.schedule(start=self.start, days=28)
+        self.assertEqual((again["existing"], again["created"]), (5, 0))
+        wider = recurrence.schedule(start=self.start, days=35)
+        self.assertEqual((wider["existing"], wider["created"]), (5, 1))
+        self.assertEqual(issues.count(), 6)
+
+    def test_dry_run_creates_nothing(self):
+        counts = recurrence.schedule(start=self.start, days=28, dry_run=True)
+        self.assertEqual(counts["created"], 5)
+        self.assertFalse(Issue.objects.exists())
@@ -0,0 +1,79 @@
+import time
+
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from ..db.routers import ReadReplicaRouter, read_alias, replica_safe, use_primary, use_replica
+from ..middleware import ReplicaStickinessMiddleware
+from ..models import Issue
+
+
+@override_settings(DATABASE_REPLICAS=["replica_1"])
+class ReplicaStickinessTests(SimpleTestCase):
+    """
+    Which alias reads go to, through the middleware and the router.
+    """
+
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def read_alias_for(self, request, view_wrapper=replica_safe):
+        seen = []
+
+        def view(request):
+            seen.append(ReadReplicaRouter().db_for_read(Issue))
+            return HttpResponse()
+
+        response = ReplicaStickinessMiddleware(view_wrapper(view))(request)
+        return seen[0], response
+
+    def test_replica_safe_get_reads_from_replica(self):
+        alias, response = self.read_alias_for(self.factory.get("/"))
+        self.assertEqual(alias, "replica_1")
+        self.assertNotIn(ReplicaStickinessMiddleware.cookie_name, response.cookies)
+
+    def test_other_views_read_from_primary(self):
+        alias, _ = self.read_alias_for(self.factory.get("/"), view_wrapper=lambda view: view)
+        self.assertEqual(alias, "default")
+
+    def test_write_sets_pin_cookie(self):
+        _, response = self.read_alias_for(self.factory.post("/"))
+        cookie = response.cookies[ReplicaStickinessMiddleware.cookie_name]
+        self.assertGreater(int(cookie.value), time.time())
+
+    def test_pinned_browser_reads_from_primary(self):
+        request = self.factory.get("/")
+        request.COOKIES[ReplicaStickinessMiddleware.cookie_name] = str(int(time.time()) + 60)
+        alias, _ = self.read_alias_for(request)
+        self.assertEqual(alias, "default")
+
+    def test_expired_pin_reads_from_replica(self):
+        request = self.factory.get("/")
+        request.COOKIES[ReplicaStickinessMiddleware.cookie_name] = str(int(time.time()) - 1)
+        alias, _ = self.read_alias_for(request)
+        self.assertEqual(alias, "replica_1")
+
+    def test_use_primary_wins_over_use_replica(self):
+        with use_replica():
+            self.assertEqual(read_alias(), "replica_1")
+            with use_primary():
+                self.assertEqual(read_alias(), "default")
+
+    def test_instance_reads_stay_on_its_database(self):
+        issue = Issue()
+        issue._state.db = "default"
+        with use_replica():
+            self.assertEqual(ReadReplicaRouter().db_for_read(Issue, instance=issue), "default")
+
+    def test_writes_and_migrations_stay_on_primary(self):
+        router = ReadReplicaRouter()
+        with use_replica():
+            self.assertEqual(router.db_for_write(Issue), "default")
+        self.assertFalse(router.allow_migrate("replica_1", "core"))
+        self.assertTrue(router.allow_migrate("default", "core"))
+
+
+class NoReplicaTests(SimpleTestCase):
+    def test_reads_go_to_primary_without_replicas(self):
+        with use_replica():
+            self.assertEqual(read_alias(), "default")
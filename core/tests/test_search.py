@@ -0,0 +1,41 @@
+from django.core.cache import cache
+from django.urls import reverse
+
+from .. import search
+from ..models import Server
+from .base import CoreTestCase
+
+
+class TypeaheadTests(CoreTestCase):
+
+    def setUp(self):
+        cache.clear()
+        search._suggestions.cache_clear()
+
+    def labels(self, prefix, **kwargs):
+        return [label for _, label, _ in search.suggest(prefix, **kwargs)]
+
+    def test_shortest_names_first(self):
+        # Created first, so an unordered scan would return these.
+        for region in ("eu-west", "us-east", "ap-south"):
+            Server.objects.create(environment=self.environment, name=f"DB-replica-{region}", ip_address="10.0.1.1")
+        short = Server.objects.create(environment=self.environment, name="db-1", ip_address="10.0.1.2")
+        self.assertEqual(self.labels("db", limit=2), [f"{short.name} · 10.0.1.2", "DB-replica-eu-west · 10.0.1.1"])
+
+    def test_matches_every_source(self):
+        self.issue(title="Acme firewall rules")
+        self.assertEqual(
+            sorted(model for model, _, _ in search.suggest("ACME")),
+            ["Client", "Issue", "Project", "Resource", "Server"],
+        )
+        self.assertEqual(search.suggest("a"), ())
+
+    def test_new_rows_show_up(self):
+        self.assertEqual(self.labels("zeta"), [])
+        Server.objects.create(environment=self.environment, name="zeta-web", ip_address="10.0.2.1")
+        self.assertEqual(self.labels("zeta"), ["zeta-web · 10.0.2.1"])
+
+    def test_view(self):
+        self.client.force_login(self.staff)
+        response = self.client.get(reverse("search_suggest"), {"q": "acme-w"})
+        self.assertEqual(response.json()["results"], [["Server", "acme-web · 10.0.0.1", f"/admin/core/server/{self.server.pk}/change/"]])
@@ -0,0 +1,88 @@
+from importlib import import_module
+from unittest import mock
+
+from django.apps import apps
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .. import similarity
+from ..models import Issue, IssueLSHBucket, IssueSignature
+from ..signals import bulk_changed
+from .base import CoreTestCase
+
+
+CERT = "Renew the TLS certificate on the public load balancer before it expires"
+
+
+class SimilarityTests(CoreTestCase):
+
+    def test_estimate(self):
+        a = similarity.minhash(similarity.normalise(CERT, "ssl", ""))
+        b = similarity.minhash(similarity.normalise(CERT.upper() + "!", "SSL", ""))
+        c = similarity.minhash(similarity.normalise("Migrate billing database to new cluster", "", ""))
+        self.assertEqual(similarity.estimate(a, b), 1.0)
+        self.assertLess(similarity.estimate(a, c), 0.3)
+        self.assertEqual(similarity.unpack(similarity.pack(a)), a)
+
+    def test_similar_issues(self):
+        original = self.issue(title=CERT)
+        duplicate = self.issue(title=CERT + " next week")
+        self.issue(title="Migrate billing database to new cluster")
+        found = similarity.similar_issues(original)
+        self.assertEqual([issue.pk for _, issue in found], [duplicate.pk])
+        self.assertGreater(found[0][0], 0.7)
+        # Unsaved issues can be looked up too.
+        self.assertEqual(len(similarity.similar_issues(Issue(title=CERT))), 2)
+
+    def test_candidates_prefer_more_shared_bands(self):
+        target = self.issue(title=CERT)
+        close = self.issue(title="Close")
+        newer = self.issue(title="Newer")
+        signature = similarity.unpack(target.signature.minhash)
+        buckets = similarity.band_buckets(signature)
+        IssueLSHBucket.objects.filter(issue__in=[close, newer]).delete()
+        IssueLSHBucket.objects.bulk_create(
+            [IssueLSHBucket(issue=close, band=band, bucket=bucket) for band, bucket in buckets[:3]]
+            + [IssueLSHBucket(issue=newer, band=band, bucket=bucket) for band, bucket in buckets[:1]]
+        )
+        with mock.patch.object(similarity, "MAX_CANDIDATES", 1), self.assertNumQueries(2):
+            candidates = similarity._candidates(target.pk, signature)
+        self.assertEqual(list(candidates), [close.pk])
+        with mock.patch.object(similarity, "MAX_CANDIDATES", 2):
+            self.assertEqual(set(similarity._candidates(target.pk, signature)), {close.pk, newer.pk})
+
+    def test_text_changes_reindex(self):
+        issue = self.issue(title=CERT)
+        stamp = IssueSignature.objects.get(issue=issue).minhash
+        issue.status = "blocked"
+        with CaptureQueriesContext(connection) as queries:
+            issue.save(update_fields=["status"])
+        self.assertFalse([q for q in queries if "core_issuesignature" in q["sql"]])
+        issue.title = "Migrate billing database to new cluster"
+        issue.save()
+        self.assertNotEqual(bytes(IssueSignature.objects.get(issue=issue).minhash), bytes(stamp))
+
+    def test_duplicate_groups(self):
+        first = self.issue(title=CERT)
+        second = self.issue(title=CERT)
+        third = self.issue(title=CERT + ".")
+        self.issue(title="Migrate billing database to new cluster")
+        self.assertEqual(similarity.duplicate_groups(), [[first.pk, second.pk, third.pk]])
+        self.assertEqual(similarity.duplicate_groups(client_id=0), [])
+
+    def test_bulk_created_issues_are_indexed(self):
+        [issue] = Issue.objects.bulk_create([
+            Issue(project=self.project, title=CERT, activity_date=self.today),
+        ])
+        bulk_changed.send(sender=Issue, pks=[issue.pk])
+        self.assertEqual(IssueLSHBucket.objects.filter(issue=issue).count(), similarity.BANDS)
+
+    def test_backfill_migration(self):
+        issue = self.issue(title=CERT)
+        IssueSignature.objects.filter(issue=issue).delete()
+        IssueLSHBucket.objects.filter(issue=issue).delete()
+
+        import_module("core.migrations.0017_backfill_issue_signatures").backfill(apps, None)
+
+        self.assertTrue(IssueSignature.objects.filter(issue=issue).exists())
+        self.assertEqual(IssueLSHBucket.objects.filter(issue=issue).count(), similarity.BANDS)
@@ -0,0 +1,71 @@
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from importlib import import_module
+
+from django.apps import apps
+from django.test import override_settings
+
+from .. import sla
+from ..models import Issue, IssueSLA
+from .base import CoreTestCase
+
+
+CREATED = datetime(2026, 10, 19, 9, 0, tzinfo=dt_timezone.utc)
+
+
+class SLATests(CoreTestCase):
+
+    def issue(self, **fields):
+        issue = super().issue(**fields)
+        Issue.objects.filter(pk=issue.pk).update(created_at=CREATED)
+        sla.refresh_issues([issue.pk])
+        return issue
+
+    def test_deadline(self):
+        self.assertEqual(sla.compute_deadline("high", CREATED, None), CREATED + timedelta(hours=24))
+        # The end of an earlier due date wins.
+        self.assertEqual(
+            sla.compute_deadline("low", CREATED, date(2026, 10, 20)),
+            datetime(2026, 10, 21, tzinfo=dt_timezone.utc),
+        )
+        with override_settings(ISSUE_SLA_HOURS={"high": 8}):
+            self.assertEqual(sla.compute_deadline("high", CREATED, None), CREATED + timedelta(hours=8))
+
+    def test_state(self):
+        window = timedelta(hours=24)
+        self.assertEqual(sla.compute_state(CREATED, CREATED, window), IssueSLA.STATE_BREACHED)
+        self.assertEqual(sla.compute_state(CREATED + window, CREATED, window), IssueSLA.STATE_AT_RISK)
+        self.assertEqual(sla.compute_state(CREATED + 2 * window, CREATED, window), IssueSLA.STATE_OK)
+
+    def test_saved_issue_gets_a_row_until_closed(self):
+        issue = self.issue(priority="critical")
+        self.assertEqual(IssueSLA.objects.get(issue=issue).deadline, CREATED + timedelta(hours=4))
+        issue.status = "done"
+        issue.save()
+        self.assertFalse(IssueSLA.objects.filter(issue=issue).exists())
+
+    def test_scan(self):
+        breached = self.issue(priority="critical")
+        at_risk = self.issue(priority="high")
+        closed = self.issue()
+        # Closed behind the engine's back.
+        Issue.objects.filter(pk=closed.pk).update(status="done")
+
+        progress = list(sla.scan(batch_size=1, now=CREATED + timedelta(hours=5)))
+
+        self.assertEqual(progress, [(1, 1), (2, 0)])
+        states = dict(IssueSLA.objects.values_list("issue_id", "state"))
+        self.assertEqual(states, {
+            breached.pk: IssueSLA.STATE_BREACHED,
+            at_risk.pk: IssueSLA.STATE_AT_RISK,
+        })
+
+    def test_backfill_migration(self):
+        issue = self.issue(priority="medium")
+        kept = self.issue(priority="low")
+        IssueSLA.objects.filter(issue=issue).delete()
+        IssueSLA.objects.filter(issue=kept).update(state=IssueSLA.STATE_BREACHED)
+
+        import_module("core.migrations.0015_backfill_issue_sla").backfill(apps, None)
+
+        self.assertEqual(IssueSLA.objects.get(issue=issue).deadline, CREATED + timedelta(hours=72))
+        self.assertEqual(IssueSLA.objects.get(issue=kept).state, IssueSLA.STATE_BREACHED)
@@ -0,0 +1,114 @@
+import os
+import tempfile
+from datetime import date
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth.models import User
+
+from .. import recurrence, snapshot, timesheet
+from ..models import (
+    Client, Issue, InfraActivity, ProfileTrigger, RecurrenceRule, Server, TimesheetDay, TimesheetMonth,
+)
+from .base import CoreTestCase, create_tenant
+
+
+class SnapshotTests(CoreTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.other = create_tenant("globex")
+        issue = cls.issue(due_date=date(2026, 10, 31), estimate_hours=Decimal("2.50"))
+        for day in range(1, 4):
+            InfraActivity.objects.create(
+                issue=issue, activity_date=date(2026, 9, day), hours_spent=Decimal("1.25"),
+                status="done", performed_by=cls.staff,
+            )
+        cls.issue(project=cls.other.project, title="Not in scope")
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "acme.jsonl.gz")
+
+    def rows(self):
+        scope = {"project__client__code": "acme"}
+        return {
+            "issues": list(Issue.objects.filter(**scope).order_by("pk").values()),
+            "activities": list(InfraActivity.objects.filter(issue__project__client__code="acme")
+                               .order_by("pk").values()),
+            "servers": list(Server.objects.filter(environment__project__client__code="acme")
+                            .order_by("pk").values()),
+            "rules": list(RecurrenceRule.objects.filter(**scope).order_by("pk").values()),
+            "days": list(TimesheetDay.objects.filter(client_id=self.customer.pk).order_by("pk").values()),
+        }
+
+    def test_round_trip(self):
+        before = self.rows()
+        with mock.patch.object(snapshot, "CHUNK_ROWS", 2):  # several keyset batches
+            dumped = snapshot.dump(self.path, client_id=self.customer.pk)
+        self.assertEqual(dumped["core.infraactivity"], 3)
+        self.assertEqual(dumped["core.issue"], 1)
+
+        Client.objects.get(pk=self.customer.pk).delete()
+        self.assertFalse(Issue.objects.filter(title="Renew certificate").exists())
+
+        restored = snapshot.restore(self.path)
+        self.assertEqual(restored["core.infraactivity"], 3)
+        self.assertEqual(self.rows(), before)
+        self.assertTrue(Issue.objects.filter(title="Not in scope").exists())
+
+    def test_round_trip_keeps_recurrence_rules_and_frozen_days(self):
+        rule = RecurrenceRule.objects.create(
+            project=self.project, title="Patch", frequency="monthly", start_date=date(2026, 9, 1),
+        )
+        recurrence.schedule(start=date(2026, 9, 1), days=60)
+        timesheet.freeze_month(date(2026, 9, 1))
+        before = self.rows()
+        self.assertEqual(len(before["days"]), 3)
+
+        dumped = snapshot.dump(self.path, client_id=self.customer.pk)
+        self.assertEqual(dumped["core.recurrencerule"], 1)
+        self.assertNotIn("core.timesheetmonth", dumped)
+        Client.objects.get(pk=self.customer.pk).delete()
+        snapshot.restore(self.path)
+
+        self.assertEqual(self.rows(), before)
+        self.assertEqual(
+            set(Issue.objects.filter(occurrence_key__startswith="r").values_list("occurrence_key", flat=True)),
+            {recurrence.occurrence_key(rule.pk, date(2026, 9, 1)), recurrence.occurrence_key(rule.pk, date(2026, 10, 1))},
+        )
+        # Running the scheduler again finds the restored occurrences.
+        self.assertEqual(recurrence.schedule(start=date(2026, 9, 1), days=60)["created"], 0)
+
+    def test_frozen_days_skip_months_live_in_target(self):
+        timesheet.freeze_month(date(2026, 9, 1))
+        snapshot.dump(self.path, client_id=self.customer.pk)
+        Client.objects.get(pk=self.customer.pk).delete()
+        TimesheetMonth.objects.all().delete()
+
+        restored = snapshot.restore(self.path)
+        self.assertEqual(restored["core.timesheetday"], 0)
+        self.assertEqual(restored["core.infraactivity"], 3)
+
+    def test_whole_database_snapshot_carries_shared_tables(self):
+        ProfileTrigger.objects.create(user=self.staff, path_pattern="^/api/")
+        timesheet.freeze_month(date(2026, 9, 1))
+        dumped = snapshot.dump(self.path)
+        self.assertEqual(dumped["core.profiletrigger"], 1)
+        self.assertEqual(dumped["core.timesheetmonth"], 1)
+
+    def test_user_owned_rows_are_dropped_without_their_user(self):
+        mallory = User.objects.create(username="mallory")
+        ProfileTrigger.objects.create(user=mallory)
+        fields = [field.attname for field in ProfileTrigger._meta.concrete_fields]
+        row = list(ProfileTrigger.objects.values_list(*fields).get())
+        mallory.delete()
+        fixups = snapshot._Restore({"client": None}, "default")
+        self.assertEqual(fixups.prepare(ProfileTrigger, fields, [row]), [])
+
+    def test_restore_over_existing_rows_fails(self):
+        snapshot.dump(self.path, client_id=self.customer.pk)
+        with self.assertRaises(snapshot.SnapshotError):
+            snapshot.restore(self.path)
+        self.assertEqual(Issue.objects.count(), 2)
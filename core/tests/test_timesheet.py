@@ -0,0 +1,128 @@
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from django.urls import reverse
+
+from .. import timesheet
+from ..models import InfraActivity, TimesheetDay, TimesheetMonth
+from .base import CoreTestCase, create_tenant
+
+
+class TimesheetTests(CoreTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.alice = User.objects.create(username="alice", first_name="Alice", last_name="Smith")
+        cls.other = create_tenant("globex")
+        cls.target = cls.issue()
+        cls.theirs = cls.issue(project=cls.other.project)
+        for day, hours, user, issue in (
+            (date(2026, 8, 3), "1.5", cls.alice, cls.target),
+            (date(2026, 8, 4), "2", cls.alice, cls.target),
+            (date(2026, 9, 7), "3", cls.staff, cls.target),
+            (date(2026, 9, 8), "1", cls.alice, cls.theirs),
+            (date(2026, 10, 5), "4", cls.alice, cls.target),
+        ):
+            cls.log(day, hours, user, issue)
+
+    @classmethod
+    def log(cls, day, hours, user, issue=None):
+        return InfraActivity.objects.create(
+            issue=issue or cls.target, activity_date=day, hours_spent=Decimal(hours), performed_by=user,
+        )
+
+    def hours(self, rows, **keys):
+        return {
+            row["period"]: row["hours"] for row in rows
+            if all(row[key] == value for key, value in keys.items())
+        }
+
+    def test_closed_until(self):
+        self.assertEqual(timesheet.closed_until(self.today), date(2026, 9, 30))
+        self.assertEqual(timesheet.closed_until(date(2026, 10, 3)), date(2026, 8, 31))
+
+    def test_freeze_closed_months(self):
+        self.assertEqual(timesheet.freeze_closed(today=self.today), [date(2026, 8, 1), date(2026, 9, 1)])
+        august = TimesheetMonth.objects.get(month=date(2026, 8, 1))
+        self.assertEqual((august.hours, august.entries), (Decimal("3.50"), 2))
+        self.assertEqual(TimesheetDay.objects.filter(month=date(2026, 9, 1)).count(), 2)
+        self.assertEqual(timesheet.freeze_closed(today=self.today), [])
+
+    def test_report_reads_frozen_and_live_months(self):
+        timesheet.freeze_closed(today=self.today)
+        with self.assertNumQueries(3):
+            rows = timesheet.report(date(2026, 8, 1), date(2026, 10, 31), "month", ["user"])
+        self.assertEqual(self.hours(rows, user_id=self.alice.pk), {
+            date(2026, 8, 1): Decimal("3.50"),
+            date(2026, 9, 1): Decimal("1.00"),
+            date(2026, 10, 1): Decimal("4.00"),
+        })
+        # Nothing but the frozen rows: the report doesn't freeze October.
+        self.assertFalse(TimesheetMonth.objects.filter(month=date(2026, 10, 1)).exists())
+
+        scoped = timesheet.report(date(2026, 8, 1), date(2026, 10, 31), "month", ["client"], client_id=self.customer.pk)
+        self.assertEqual(self.hours(scoped), {
+            date(2026, 8, 1): Decimal("3.50"),
+            date(2026, 9, 1): Decimal("3.00"),
+            date(2026, 10, 1): Decimal("4.00"),
+        })
+
+    def test_partial_months_and_grains(self):
+        timesheet.freeze_closed(today=self.today)
+        rows = timesheet.report(date(2026, 8, 4), date(2026, 9, 7), "day", ["user", "project"])
+        self.assertEqual(
+            [(row["period"], row["hours"]) for row in rows],
+            [(date(2026, 8, 4), Decimal("2.00")), (date(2026, 9, 7), Decimal("3.00"))],
+        )
+        with self.assertRaises(ValueError):
+            timesheet.report(date(2026, 8, 1), date(2026, 8, 31), "year")
+        with self.assertRaises(ValueError):
+            timesheet.report(date(2026, 8, 1), date(2026, 8, 31), group_by=["team"])
+
+    def test_frozen_months_ignore_late_corrections_until_refreshed(self):
+        timesheet.freeze_closed(today=self.today)
+        self.log(date(2026, 8, 20), "5", self.alice)
+        august = (date(2026, 8, 1), date(2026, 8, 31))
+        self.assertEqual(self.hours(timesheet.report(*august)), {date(2026, 8, 1): Decimal("3.50")})
+        timesheet.freeze_month(date(2026, 8, 1), refresh=True)
+        self.assertEqual(self.hours(timesheet.report(*august)), {date(2026, 8, 1): Decimal("8.50")})
+
+    def test_pivot_and_csv(self):
+        rows = timesheet.report(date(2026, 8, 1), date(2026, 9, 30), "month", ["user"])
+        table = timesheet.pivot(rows, ["user"])
+        self.assertEqual(table["periods"], [date(2026, 8, 1), date(2026, 9, 1)])
+        [alice, staff] = table["rows"]
+        self.assertEqual((alice["labels"]["user"], alice["hours"]), ("Alice Smith", [Decimal("3.50"), Decimal("1.00")]))
+        self.assertEqual(staff["hours"], [Decimal("0"), Decimal("3.00")])
+        self.assertEqual(table["total"], Decimal("7.50"))
+        lines = timesheet.to_csv(table, ["user"]).splitlines()
+        self.assertEqual(lines[0], "User,2026-08-01,2026-09-01,Total")
+        self.assertEqual(lines[-1], "Total,3.50,4.00,7.50")
+
+    def test_command(self):
+        out = StringIO()
+        with self.assertRaisesMessage(CommandError, "--refresh needs --month."):
+            call_command("freeze_timesheets", refresh=True)
+        with self.assertRaisesMessage(CommandError, "not closed yet"):
+            call_command("freeze_timesheets", month="2999-01")
+        call_command("freeze_timesheets", month="2026-08", stdout=out)
+        self.assertRegex(out.getvalue(), r"^2026-08: 3\.50?h in 2 activities\.")
+        self.assertTrue(TimesheetMonth.objects.filter(month=date(2026, 8, 1)).exists())
+
+    def test_view(self):
+        url = reverse("timesheet_report")
+        params = {"start": "2026-08-01", "end": "2026-09-30", "group": "user,project"}
+        self.assertEqual(self.client.get(url, params).status_code, 403)
+        self.client.force_login(self.staff)
+        self.assertEqual(self.client.get(url, {**params, "grain": "year"}).status_code, 400)
+        self.assertEqual(self.client.get(url, {**params, "grain": "day", "start": "2026-01-01"}).status_code, 400)
+        data = self.client.get(url, params).json()
+        self.assertEqual(data["periods"], ["2026-08-01", "2026-09-01"])
+        self.assertEqual(data["total"], "7.50")
+        response = self.client.get(url, {**params, "format": "csv", "client": self.customer.pk})
+        self.assertEqual(response["Content-Type"], "text/csv")
+        self.assertTrue(response.content.decode().splitlines()[-1].endswith(",3.50,3.00,6.50"))
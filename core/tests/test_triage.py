@@ -0,0 +1,103 @@
+from datetime import date
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.urls import reverse
+
+from .. import audit, triage
+from ..calendar_index import week_key
+from ..models import InfraActivity, Issue, IssueWeekBucket
+from .base import CoreTestCase
+
+
+class TriageTests(CoreTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.alice = User.objects.create(username="alice")
+        cls.issues = [
+            cls.issue(title=f"Issue {n}", due_date=date(2026, 10, 20 + n), assigned_to=cls.alice)
+            for n in range(3)
+        ]
+        cls.undated = cls.issue(title="No due date")
+        cls.ids = [issue.pk for issue in cls.issues]
+
+    def setUp(self):
+        audit._local.buffer = None
+
+    def run_triage(self, func, *args, **kwargs):
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                return func(*args, **kwargs)
+
+    def changes(self, issue, field):
+        return [
+            (row["old_value"], row["new_value"])
+            for row in audit.object_timeline(Issue, issue.pk) if row["field"] == field
+        ]
+
+    def test_cost_does_not_depend_on_the_selection(self):
+        # Savepoint, read, UPDATE, release; the audit insert runs on commit.
+        with self.assertNumQueries(4):
+            triage.set_status_priority(self.ids, status="blocked")
+        with self.assertNumQueries(4):
+            triage.set_status_priority(self.ids[:1], status="open")
+
+    def test_reassign(self):
+        changed = self.run_triage(triage.reassign, self.ids, self.staff, assigned_by=self.staff)
+        self.assertEqual(changed, 3)
+        self.assertEqual(set(Issue.objects.filter(pk__in=self.ids).values_list("assigned_to", flat=True)),
+                         {self.staff.pk})
+        self.assertEqual(self.changes(self.issues[0], "assigned_to"), [(str(self.alice.pk), str(self.staff.pk))])
+
+    def test_status_and_priority(self):
+        before = Issue.objects.get(pk=self.ids[0]).updated_at
+        self.run_triage(triage.set_status_priority, self.ids, status="blocked", priority="high")
+        issue = Issue.objects.get(pk=self.ids[0])
+        self.assertEqual((issue.status, issue.priority), ("blocked", "high"))
+        self.assertGreater(issue.updated_at, before)
+        self.assertEqual(self.changes(issue, "priority"), [("medium", "high")])
+        self.assertEqual(triage.set_status_priority(self.ids), 0)
+
+    def test_shift_due_dates(self):
+        changed = self.run_triage(triage.shift_due_dates, self.ids + [self.undated.pk], 7)
+        self.assertEqual(changed, 3)
+        self.assertEqual(
+            list(Issue.objects.filter(pk__in=self.ids).order_by("pk").values_list("due_date", flat=True)),
+            [date(2026, 10, 27), date(2026, 10, 28), date(2026, 10, 29)],
+        )
+        self.assertIsNone(Issue.objects.get(pk=self.undated.pk).due_date)
+        self.assertEqual(self.changes(self.issues[0], "due_date"), [("2026-10-20", "2026-10-27")])
+        # The calendar index caught up on commit.
+        self.assertTrue(
+            IssueWeekBucket.objects.filter(issue=self.issues[2], week=week_key(date(2026, 10, 29))).exists()
+        )
+
+    def test_close_logs_activities(self):
+        self.run_triage(
+            triage.close, self.ids, "done", date(2026, 10, 19), "Closed in bulk",
+            hours_spent=Decimal("0.5"), performed_by=self.staff,
+        )
+        activities = InfraActivity.objects.filter(issue_id__in=self.ids)
+        self.assertEqual(activities.count(), 3)
+        self.assertEqual(set(activities.values_list("note", "status")), {("Closed in bulk", "done")})
+        self.assertEqual(
+            set(Issue.objects.filter(pk__in=self.ids).values_list("status", "actual_hours")),
+            {("done", Decimal("0.50"))},
+        )
+
+    def test_admin_action(self):
+        self.staff.is_superuser = True
+        self.staff.save()
+        self.client.force_login(self.staff)
+        response = self.client.post(reverse("admin:core_issue_changelist"), {
+            "action": "set_status_selected",
+            "_selected_action": self.ids,
+            "apply": "1",
+            "status": "blocked",
+            "priority": "",
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(Issue.objects.filter(status="blocked").count(), 3)
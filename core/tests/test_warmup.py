@@ -0,0 +1,63 @@
+import os
+import runpy
+from unittest import mock
+
+from django.conf import settings
+from django.test import SimpleTestCase
+
+from .. import warmup
+
+
+GUNICORN_CONF = os.path.join(settings.BASE_DIR, "gunicorn.conf.py")
+
+
+class WarmupTests(SimpleTestCase):
+
+    def test_warm_loads_templates_and_urls(self):
+        with mock.patch.object(warmup, "get_template", wraps=warmup.get_template) as get_template:
+            seconds = warmup.warm()
+        self.assertGreaterEqual(seconds, 0)
+        self.assertEqual([c.args[0] for c in get_template.call_args_list], list(warmup.TEMPLATES))
+
+    def test_release_closes_connections_and_pools(self):
+        with mock.patch.object(warmup.connections, "close_all") as close_all, \
+                mock.patch.object(warmup, "close_pools") as close_pools:
+            warmup.release()
+        close_all.assert_called_once_with()
+        close_pools.assert_called_once_with()
+
+
+class GunicornConfTests(SimpleTestCase):
+
+    def load(self, **env):
+        with mock.patch.dict(os.environ, env):
+            for name in ("WEB_WORKER_CLASS", "REDIS_URL"):
+                if name not in env:
+                    os.environ.pop(name, None)
+            return runpy.run_path(GUNICORN_CONF)
+
+    def test_defaults_to_asgi(self):
+        conf = self.load(WEB_WORKERS="1")
+        self.assertEqual(conf["worker_class"], "uvicorn.workers.UvicornWorker")
+        self.assertEqual(conf["wsgi_app"], "multi_tenant_infra_desk.asgi:application")
+        self.assertTrue(conf["preload_app"])
+
+    def test_gthread(self):
+        conf = self.load(WEB_WORKERS="1", WEB_WORKER_CLASS="gthread", WEB_THREADS="8")
+        self.assertEqual((conf["worker_class"], conf["threads"]), ("gthread", 8))
+        self.assertEqual(conf["wsgi_app"], "multi_tenant_infra_desk.wsgi:application")
+
+    def test_several_workers_need_a_shared_cache(self):
+        with self.assertRaisesMessage(RuntimeError, "set REDIS_URL"):
+            self.load(WEB_WORKERS="3")
+        self.assertEqual(self.load(WEB_WORKERS="3", REDIS_URL="redis://cache:6379/0")["workers"], 3)
+
+    def test_when_ready_warms_then_releases(self):
+        conf = self.load(WEB_WORKERS="1")
+        server = mock.Mock()
+        calls = []
+        with mock.patch.object(warmup, "warm", side_effect=lambda: calls.append("warm") or 0.25), \
+                mock.patch.object(warmup, "release", side_effect=lambda: calls.append("release")):
+            conf["when_ready"](server)
+        self.assertEqual(calls, ["warm", "release"])
+        server.log.info.assert_called_once_with("Warmed up in %.0f ms", 250.0)
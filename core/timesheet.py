@@ -0,0 +1,291 @@
+"""
+Timesheets: activity hours per user / client / project per day, week or
+month.
+
+Reports are GROUP BYs in the database over ``InfraActivity`` with the
+activity date truncated to the period. Months that are closed (ended
+more than TIMESHEET_GRACE_DAYS ago) are frozen into ``TimesheetDay``
+rows - hours per day, user and project - by ``manage.py
+freeze_timesheets`` (run it daily), and reports read those for the
+frozen months of a range, so month-end reporting doesn't re-aggregate
+history; reports never freeze anything themselves. Frozen months are
+immutable; ``freeze_timesheets --refresh`` recomputes one after a late
+correction.
+"""
+import calendar
+import csv
+import io
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Count, DateField, F, Q, Sum
+from django.db.models.functions import Trunc
+from django.utils import timezone
+
+from .models import Client, Project, InfraActivity, TimesheetDay, TimesheetMonth
+
+
+GRAINS = ("day", "week", "month")
+DIMENSIONS = ("user", "client", "project")
+
+
+def month_start(day):
+    return day.replace(day=1)
+
+
+def month_end(day):
+    return day.replace(day=calendar.monthrange(day.year, day.month)[1])
+
+
+def _months(start, end):
+    month = month_start(start)
+    while month <= end:
+        yield month
+        month = month_end(month) + timedelta(days=1)
+
+
+def closed_until(today=None):
+    """
+    Last day of the latest closed month.
+    """
+    today = today or date.today()
+    grace = getattr(settings, "TIMESHEET_GRACE_DAYS", 5)
+    return month_start(today - timedelta(days=grace)) - timedelta(days=1)
+
+
+# ---------- Freezing ----------
+
+def freeze_month(month, refresh=False):
+    """
+    Store the month's per-day / user / project hours; returns the
+    ``TimesheetMonth`` (existing and untouched unless ``refresh``).
+    """
+    month = month_start(month)
+    with transaction.atomic():
+        frozen = TimesheetMonth.objects.select_for_update().filter(month=month).first()
+        if frozen is not None and not refresh:
+            return frozen
+        TimesheetDay.objects.filter(month=month).delete()
+
+        rows = (
+            InfraActivity.objects
+            .filter(activity_date__range=(month, month_end(month)))
+            .values("activity_date", "performed_by_id", "issue__project_id", "issue__project__client_id")
+            .annotate(hours=Sum("hours_spent"), entries=Count("pk"))
+            .order_by()
+        )
+        days = [
+            TimesheetDay(
+                day=row["activity_date"],
+                month=month,
+                user_id=row["performed_by_id"],
+                project_id=row["issue__project_id"],
+                client_id=row["issue__project__client_id"],
+                hours=row["hours"] or 0,
+                entries=row["entries"],
+            )
+            for row in rows
+        ]
+        TimesheetDay.objects.bulk_create(days, batch_size=1000)
+
+        frozen, _ = TimesheetMonth.objects.update_or_create(
+            month=month,
+            defaults={
+                "frozen_at": timezone.now(),
+                "hours": sum((day.hours for day in days), Decimal("0")),
+                "entries": sum(day.entries for day in days),
+            },
+        )
+    return frozen
+
+
+def freeze_closed(start=None, end=None, today=None):
+    """
+    Freeze every closed month in ``start..end`` (default: all history)
+    that isn't frozen yet; returns the months frozen.
+    """
+    last_closed = closed_until(today)
+    end = min(end or last_closed, last_closed)
+    if start is None:
+        first = InfraActivity.objects.order_by("activity_date").values_list("activity_date", flat=True).first()
+        if first is None:
+            return []
+        start = first
+    if start > end:
+        return []
+    done = set(
+        TimesheetMonth.objects
+        .filter(month__range=(month_start(start), end))
+        .values_list("month", flat=True)
+    )
+    frozen = []
+    for month in _months(start, end):
+        if month not in done:
+            freeze_month(month)
+            frozen.append(month)
+    return frozen
+
+
+# ---------- Reports ----------
+
+def _scope(prefix, partner_id=None, client_id=None):
+    if client_id is not None:
+        return Q(**{f"{prefix}client_id": client_id})
+    if partner_id is not None:
+        return Q(**{f"{prefix}client__partner_id": partner_id})
+    return Q()
+
+
+def _grouped(queryset, date_field, grain, hours, entries, *fields, **columns):
+    return (
+        queryset
+        .annotate(period=Trunc(date_field, grain, output_field=DateField()))
+        .values("period", *fields, **columns)
+        .annotate(hours=hours, entries=entries)
+        .order_by()
+    )
+
+
+def _unfrozen(start, end, frozen):
+    """
+    ``[(first, last)]`` day ranges of ``start..end`` outside the months
+    in ``frozen``.
+    """
+    ranges = []
+    for month in _months(start, end):
+        if month in frozen:
+            continue
+        first, last = max(start, month), min(end, month_end(month))
+        if ranges and ranges[-1][1] + timedelta(days=1) == first:
+            ranges[-1] = (ranges[-1][0], last)
+        else:
+            ranges.append((first, last))
+    return ranges
+
+
+def report(start, end, grain="month", group_by=("user",), partner_id=None, client_id=None):
+    """
+    ``[{"period", <dimension>_id..., "hours", "entries"}]`` for
+    ``start..end``, sorted by period then keys.
+
+    Frozen months are read from TimesheetDay, everything else (open or
+    closed but not yet frozen) from the activities: at most three
+    queries, and nothing is written.
+    """
+    if grain not in GRAINS:
+        raise ValueError(f"Unknown grain '{grain}'.")
+    unknown = set(group_by) - set(DIMENSIONS)
+    if unknown:
+        raise ValueError(f"Unknown dimension(s): {', '.join(sorted(unknown))}.")
+
+    frozen = set(
+        TimesheetMonth.objects
+        .filter(month__range=(month_start(start), end))
+        .values_list("month", flat=True)
+    )
+    totals = {}
+    keys = [f"{dimension}_id" for dimension in group_by]
+
+    def add(rows):
+        for row in rows:
+            key = (row["period"], *(row[k] for k in keys))
+            hours, entries = totals.get(key, (Decimal("0"), 0))
+            # SQLite hands sums back as floats.
+            totals[key] = (hours + Decimal(str(row["hours"] or 0)), entries + row["entries"])
+
+    if frozen:
+        add(_grouped(
+            TimesheetDay.objects.filter(
+                _scope("project__", partner_id, client_id),
+                month__in=frozen,
+                day__range=(start, end),
+            ),
+            "day", grain, Sum("hours"), Sum("entries"), *keys,
+        ))
+    live = Q()
+    for first, last in _unfrozen(start, end, frozen):
+        live |= Q(activity_date__range=(first, last))
+    if live:
+        sources = {"user_id": "performed_by_id", "client_id": "issue__project__client_id", "project_id": "issue__project_id"}
+        add(_grouped(
+            InfraActivity.objects.filter(live, _scope("issue__project__", partner_id, client_id)),
+            "activity_date", grain, Sum("hours_spent"), Count("pk"),
+            **{k: F(sources[k]) for k in keys},
+        ))
+
+    cents = Decimal("0.01")
+    return [
+        {"period": key[0], **dict(zip(keys, key[1:])), "hours": hours.quantize(cents), "entries": entries}
+        for key, (hours, entries) in sorted(totals.items(), key=lambda item: (
+            item[0][0], *((pk is None, pk or 0) for pk in item[0][1:])
+        ))
+    ]
+
+
+def labels(rows, group_by):
+    """
+    ``{dimension: {id: name}}`` for the ids in ``rows`` (one query each).
+    """
+    result = {}
+    for dimension in group_by:
+        ids = {row[f"{dimension}_id"] for row in rows} - {None}
+        if dimension == "user":
+            result[dimension] = {
+                pk: (f"{first} {last}".strip() or username)
+                for pk, username, first, last in User.objects.filter(pk__in=ids).values_list(
+                    "pk", "username", "first_name", "last_name",
+                )
+            }
+        else:
+            model = Client if dimension == "client" else Project
+            result[dimension] = dict(model.objects.filter(pk__in=ids).values_list("pk", "name"))
+    return result
+
+
+def pivot(rows, group_by):
+    """
+    One row per key with a column per period::
+
+        {"periods": [...], "rows": [{"keys": {...}, "labels": {...},
+         "hours": [...], "total": ...}], "totals": [...], "total": ...}
+    """
+    names = labels(rows, group_by)
+    periods = sorted({row["period"] for row in rows})
+    column = {period: index for index, period in enumerate(periods)}
+    lines = {}
+    for row in rows:
+        key = tuple(row[f"{dimension}_id"] for dimension in group_by)
+        line = lines.get(key)
+        if line is None:
+            line = lines[key] = {
+                "keys": dict(zip(group_by, key)),
+                "labels": {
+                    dimension: names[dimension].get(pk, "(none)") if pk is not None else "(none)"
+                    for dimension, pk in zip(group_by, key)
+                },
+                "hours": [Decimal("0")] * len(periods),
+            }
+        line["hours"][column[row["period"]]] += row["hours"]
+    result_rows = sorted(lines.values(), key=lambda line: tuple(line["labels"][d] for d in group_by))
+    for line in result_rows:
+        line["total"] = sum(line["hours"], Decimal("0"))
+    totals = [sum((line["hours"][index] for line in result_rows), Decimal("0")) for index in range(len(periods))]
+    return {
+        "periods": periods,
+        "rows": result_rows,
+        "totals": totals,
+        "total": sum(totals, Decimal("0")),
+    }
+
+
+def to_csv(table, group_by):
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow([d.title() for d in group_by] + [p.isoformat() for p in table["periods"]] + ["Total"])
+    for line in table["rows"]:
+        writer.writerow([line["labels"][d] for d in group_by] + line["hours"] + [line["total"]])
+    writer.writerow(["Total"] + [""] * (len(group_by) - 1) + table["totals"] + [table["total"]])
+    return out.getvalue()
@@ -0,0 +1,133 @@
+"""
+Set-based triage of many issues at once (the Issue admin bulk actions).
+
+Every operation reads the affected issues' current values with one
+query (for the audit trail), applies the change with a single UPDATE
+that also stamps ``updated_at`` (``auto_now`` isn't applied by
+``update()``), writes any activities with one ``bulk_create``, and
+sends ``bulk_changed`` on commit so the SLA, calendar, impact and
+search indexes catch up. The cost doesn't depend on how many issues
+are selected.
+"""
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import F, Value
+from django.utils import timezone
+
+from . import audit, fragments
+from .bulk import bulk_insert
+from .models import Issue, InfraActivity
+from .signals import bulk_changed
+
+
+def _apply(issue_ids, changes, updates, activities=None):
+    """
+    Update the issues and audit the change; returns how many changed.
+
+    ``changes`` maps each updated field to ``new_value(row)`` for the
+    audit trail, ``updates`` holds the ``update()`` kwargs and
+    ``activities(rows)`` returns the activities to insert for the loaded
+    ``{pk: row}``.
+    """
+    columns = {name: Issue._meta.get_field(name).attname for name in changes}
+    with transaction.atomic():
+        rows = {
+            row["pk"]: row
+            for row in (
+                Issue.objects
+                .filter(pk__in=issue_ids)
+                .values("pk", "project_id", *columns.values())
+            )
+        }
+        if not rows:
+            return 0
+        Issue.objects.filter(pk__in=rows).update(updated_at=timezone.now(), **updates)
+
+        audit.record_bulk_update(Issue, [
+            (pk, name, row[columns[name]], new_value(row), {"project_id": row["project_id"]})
+            for pk, row in rows.items()
+            for name, new_value in changes.items()
+        ])
+
+        activities = activities(rows) if activities else []
+        activity_ids = bulk_insert(InfraActivity, activities) if activities else []
+
+        issue_pks = list(rows)
+        # The new assignee is picked up from bulk_changed; the old ones
+        # are only known here.
+        previous_assignees = (
+            [row["assigned_to_id"] for row in rows.values()] if "assigned_to" in changes else []
+        )
+
+        def notify():
+            if activity_ids:
+                bulk_changed.send(sender=InfraActivity, pks=activity_ids)
+            bulk_changed.send(sender=Issue, pks=issue_pks)
+            fragments.bump_assignees(previous_assignees)
+
+        transaction.on_commit(notify)
+    return len(rows)
+
+
+def reassign(issue_ids, assignee, assigned_by=None):
+    """
+    Assign the issues to ``assignee`` (a User, or None to unassign).
+    """
+    updates = {"assigned_to": assignee}
+    changes = {"assigned_to": lambda row: assignee.pk if assignee else None}
+    if assigned_by is not None:
+        updates["assigned_by"] = assigned_by
+        changes["assigned_by"] = lambda row: assigned_by.pk
+    return _apply(issue_ids, changes, updates)
+
+
+def set_status_priority(issue_ids, status=None, priority=None):
+    updates = {}
+    if status:
+        updates["status"] = status
+    if priority:
+        updates["priority"] = priority
+    if not updates:
+        return 0
+    changes = {name: (lambda row, value=value: value) for name, value in updates.items()}
+    return _apply(issue_ids, changes, updates)
+
+
+def shift_due_dates(issue_ids, days):
+    """
+    Move due dates by ``days`` (negative: earlier). Issues without a due
+    date are left alone.
+    """
+    delta = timedelta(days=days)
+    return _apply(
+        Issue.objects.filter(pk__in=issue_ids, due_date__isnull=False).values("pk"),
+        {"due_date": lambda row: row["due_date"] + delta},
+        {"due_date": F("due_date") + delta},
+    )
+
+
+def close(issue_ids, status, activity_date, note, hours_spent=0, performed_by=None):
+    """
+    Set ``status`` (done / cancelled) and log one final activity per
+    issue; its hours are added to each issue's ``actual_hours``.
+    """
+    def activities(rows):
+        return [
+            InfraActivity(
+                issue_id=pk,
+                activity_date=activity_date,
+                status=status,
+                note=note,
+                hours_spent=hours_spent,
+                performed_by=performed_by,
+            )
+            for pk in rows
+        ]
+
+    updates = {"status": status}
+    changes = {"status": lambda row: status}
+    if hours_spent:
+        updates["actual_hours"] = F("actual_hours") + Value(hours_spent)
+        changes["actual_hours"] = lambda row: row["actual_hours"] + hours_spent
+    return _apply(issue_ids, changes, updates, activities)
@@ -1,141 +1,136 @@
+import asyncio
 import csv
+import json
+import os
+from datetime import date
 
-from django.shortcuts import render
-from django.db.models import Q
-from django.http import HttpResponse
-from django.contrib.auth.models import User
+from django.shortcuts import get_object_or_404, redirect, render
+from django.core.paginator import Paginator
+from django.http import Http404, HttpResponse, HttpResponseForbidden, JsonResponse, StreamingHttpResponse
+from django.contrib import messages
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.contrib.admin.views.decorators import staff_member_required
+from django.core.exceptions import PermissionDenied
+from django.core.handlers.asgi import ASGIRequest
+from django.middleware.csrf import CsrfViewMiddleware
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
 
-from .models import (
-    Partner, Client, Project,
-    Environment, Server, Resource,
-    Issue, InfraActivity,
-)
+from . import profiling, search, timesheet
+from .calendar_index import CALENDAR_FIELDS, issues_between, month_range
+from .changefeed import feed
+from .impact import LOOKUPS as IMPACT_NODE_TYPES, blast_radius
+from .api import token_user
+from .bulk import BulkIngestError, ingest_activities, parse_activity_payload
+from .db.pool import pool_stats
+from .db.routers import read_alias, replica_safe
+from .inventory import stream as inventory_stream
+from .models import Resource, Issue, InfraActivity, SavedSearch
 
 
+@replica_safe
 def global_search(request):
     query = request.GET.get("q", "").strip()
-    results = []
-
-    if query:
-        def add_results(qs, model_label, admin_prefix):
-            for obj in qs[:25]:  # limit per model
-                results.append({
-                    "model": model_label,
-                    "label": str(obj),
-                    "admin_url": f"/admin/core/{admin_prefix}/{obj.pk}/change/",
-                })
-
-        # Partner
-        add_results(
-            Partner.objects.filter(
-                Q(name__icontains=query) |
-                Q(code__icontains=query) |
-                Q(contact_person__icontains=query) |
-                Q(contact_email__icontains=query)
-            ),
-            "Partner",
-            "partner",
-        )
+    results = search.global_search(query) if query else []
 
-        # Client
-        add_results(
-            Client.objects.filter(
-                Q(name__icontains=query) |
-                Q(code__icontains=query) |
-                Q(contact_person__icontains=query) |
-                Q(contact_email__icontains=query)
-            ),
-            "Client",
-            "client",
-        )
+    context = {
+        "query": query,
+        "results": results,
+    }
+    return render(request, "admin/global_search.html", context)
 
-        # Project
-        add_results(
-            Project.objects.filter(
-                Q(name__icontains=query) |
-                Q(code__icontains=query) |
-                Q(description__icontains=query)
-            ),
-            "Project",
-            "project",
-        )
 
-        # Environment
-        add_results(
-            Environment.objects.filter(
-                Q(name__icontains=query) |
-                Q(base_url__icontains=query) |
-                Q(notes__icontains=query)
-            ),
-            "Environment",
-            "environment",
-        )
+@replica_safe
+def search_suggest(request):
+    """
+    Typeahead for the header search box: ``{"fields": [...], "results":
+    [[model, label, url], ...]}`` for names / codes starting with ``q``.
+    """
+    if not request.user.is_authenticated or not request.user.is_staff:
+        return JsonResponse({"error": "Staff access required."}, status=403)
+    query = request.GET.get("q", "")
+    response = JsonResponse({
+        "q": query,
+        "fields": ["model", "label", "url"],
+        "results": search.suggest(query),
+    })
+    response["Cache-Control"] = "private, max-age=30"
+    return response
 
-        # Server
-        add_results(
-            Server.objects.filter(
-                Q(name__icontains=query) |
-                Q(ip_address__icontains=query) |
-                Q(region__icontains=query)
-            ),
-            "Server",
-            "server",
-        )
 
-        # Resource
-        add_results(
-            Resource.objects.filter(
-                Q(name__icontains=query) |
-                Q(resource_type__icontains=query) |
-                Q(provider__icontains=query) |
-                Q(identifier__icontains=query) |
-                Q(connection_info__icontains=query)
-            ),
-            "Resource",
-            "resource",
+@staff_member_required
+def saved_searches(request):
+    """
+    The user's saved searches; POST saves (or renames over) one.
+    """
+    if request.method == "POST":
+        name = request.POST.get("name", "").strip()[:100]
+        kind = request.POST.get("kind", "")
+        query = request.POST.get("query", "").strip()[:1000]
+        if not name or not query or kind not in dict(SavedSearch.KIND_CHOICES):
+            messages.error(request, "A saved search needs a name and a search or filter.")
+            return redirect("saved_searches")
+        saved, _ = SavedSearch.objects.update_or_create(
+            user=request.user,
+            name=name,
+            defaults={"kind": kind, "query": query},
         )
+        messages.success(request, f"Saved “{saved.name}”.")
+        return redirect("saved_search_run", pk=saved.pk)
 
-        # Issue
-        add_results(
-            Issue.objects.filter(
-                Q(title__icontains=query) |
-                Q(description__icontains=query) |
-                Q(activity_type__icontains=query)
-            ),
-            "Issue",
-            "issue",
-        )
+    context = {
+        "title": "Saved searches",
+        "searches": SavedSearch.objects.filter(user=request.user),
+    }
+    return render(request, "admin/saved_searches.html", context)
+
+
+@staff_member_required
+@require_POST
+def saved_search_delete(request, pk):
+    saved = get_object_or_404(SavedSearch, pk=pk, user=request.user)
+    saved.delete()
+    messages.success(request, f"Deleted “{saved.name}”.")
+    return redirect("saved_searches")
 
-        # InfraActivity
-        add_results(
-            InfraActivity.objects.filter(
-                Q(note__icontains=query) |
-                Q(status__icontains=query)
-            ),
-            "Infra Activity",
-            "infraactivity",
-        )
 
-        # Users
-        for u in User.objects.filter(
-            Q(username__icontains=query) |
-            Q(email__icontains=query) |
-            Q(first_name__icontains=query) |
-            Q(last_name__icontains=query)
-        )[:25]:
-            results.append({
-                "model": "User",
-                "label": f"{u.username} ({u.email})",
-                "admin_url": f"/admin/auth/user/{u.pk}/change/",
-            })
+@staff_member_required
+@replica_safe
+def saved_search_run(request, pk):
+    """
+    Results of a saved search, served from the cached result set.
+    """
+    saved = get_object_or_404(SavedSearch, pk=pk, user=request.user)
+    if saved.kind == SavedSearch.KIND_SEARCH:
+        context = {
+            "query": saved.query,
+            "results": search.global_search(saved.query),
+            "saved": saved,
+        }
+        return render(request, "admin/global_search.html", context)
 
+    if not request.user.has_perm("core.view_issue"):
+        return HttpResponseForbidden("You can't view issues.")
+    try:
+        ids = search.issue_filter_ids(request, saved.query)
+    except IncorrectLookupParameters:
+        messages.error(request, f"“{saved.name}” no longer matches the Issue filters; save it again.")
+        return redirect("saved_searches")
+
+    page = Paginator(ids, 100).get_page(request.GET.get("page"))
+    by_id = Issue.objects.select_related("project__client", "assigned_to", "sla").in_bulk(page.object_list)
     context = {
-        "query": query,
-        "results": results,
+        "title": saved.name,
+        "saved": saved,
+        "page": page,
+        "total": len(ids),
+        "truncated": len(ids) >= search.MAX_ISSUE_IDS,
+        "issues": [by_id[pk] for pk in page.object_list if pk in by_id],
     }
-    return render(request, "admin/global_search.html", context)
+    return render(request, "admin/saved_search_issues.html", context)
 
 
+@replica_safe
 def export_infra_data(request):
     """
     Export CSV with:
@@ -195,23 +190,24 @@ def export_infra_data(request):
         else:
             resources = ""
 
-        # 🔹 Activities – assumes FK is InfraActivity.issue
-        # If your FK is named differently, change `issue=issue` accordingly.
-        activities = list(InfraActivity.objects.filter(issue=issue)) or [None]
+        # 🔹 Activities, with who performed them
+        activities = list(
+            InfraActivity.objects.filter(issue=issue).select_related("performed_by")
+        ) or [None]
 
         for activity in activities:
             if activity:
                 handled_by = (
-                    activity.handled_by.get_full_name()
-                    or activity.handled_by.username
-                    if getattr(activity, "handled_by", None)
+                    activity.performed_by.get_full_name()
+                    or activity.performed_by.username
+                    if activity.performed_by
                     else ""
                 )
-                estimated = getattr(activity, "estimated_hours", "")
-                actual = getattr(activity, "actual_hours", "")
+                estimated = issue.estimate_hours
+                actual = activity.hours_spent
             else:
                 handled_by = ""
-                estimated = ""
+                estimated = issue.estimate_hours
                 actual = ""
 
             writer.writerow([
@@ -229,3 +225,340 @@ def export_infra_data(request):
             ])
 
     return response
+
+
+@replica_safe
+def inventory_export(request):
+    """
+    Partner > Client > Project > Environment > Server / Resource tree as
+    nested JSON, streamed. Optional ``partner`` or ``client`` id scope.
+    """
+    if not request.user.is_authenticated or not request.user.is_staff:
+        return JsonResponse({"error": "Staff access required."}, status=403)
+
+    scope = {}
+    for param, key in (("partner", "partner_id"), ("client", "client_id")):
+        value = request.GET.get(param, "")
+        if value:
+            if not value.isdigit():
+                return JsonResponse({"error": f"'{param}' must be an id."}, status=400)
+            scope[key] = int(value)
+    if len(scope) > 1:
+        return JsonResponse({"error": "Give a partner or a client, not both."}, status=400)
+
+    # The body is produced after the view returns: pin the alias now.
+    response = StreamingHttpResponse(
+        inventory_stream(using=read_alias(), **scope),
+        content_type="application/json",
+    )
+    response["Content-Disposition"] = 'attachment; filename="infra_inventory.json"'
+    return response
+
+
+TIMESHEET_MAX_DAYS = {"day": 93, "week": 370, "month": 1830}
+
+
+@replica_safe
+def timesheet_report(request):
+    """
+    Hours per user / client / project per day, week or month, pivoted:
+    one row per key, one column per period. ``format=csv`` downloads it.
+
+    Params: ``start`` / ``end`` (ISO dates, default: this month),
+    ``grain`` (day, week, month), ``group`` (comma separated user,
+    client, project), optional ``partner`` or ``client`` id.
+
+    Read-only: months not yet frozen by ``freeze_timesheets`` are summed
+    from the activities.
+    """
+    if not request.user.is_authenticated or not request.user.is_staff:
+        return JsonResponse({"error": "Staff access required."}, status=403)
+
+    today = date.today()
+    try:
+        start = date.fromisoformat(request.GET["start"]) if request.GET.get("start") else timesheet.month_start(today)
+        end = date.fromisoformat(request.GET["end"]) if request.GET.get("end") else timesheet.month_end(today)
+    except ValueError:
+        return JsonResponse({"error": "Use start/end=YYYY-MM-DD."}, status=400)
+    grain = request.GET.get("grain", "month")
+    group_by = [g.strip() for g in request.GET.get("group", "user").split(",") if g.strip()]
+    if grain not in timesheet.GRAINS:
+        return JsonResponse({"error": f"grain must be one of {', '.join(timesheet.GRAINS)}."}, status=400)
+    if not group_by or set(group_by) - set(timesheet.DIMENSIONS):
+        return JsonResponse({"error": f"group must list {', '.join(timesheet.DIMENSIONS)}."}, status=400)
+    if end < start or (end - start).days > TIMESHEET_MAX_DAYS[grain]:
+        return JsonResponse(
+            {"error": f"The range must be 0-{TIMESHEET_MAX_DAYS[grain]} days for grain '{grain}'."},
+            status=400,
+        )
+
+    scope = {}
+    for param, key in (("partner", "partner_id"), ("client", "client_id")):
+        value = request.GET.get(param, "")
+        if value:
+            if not value.isdigit():
+                return JsonResponse({"error": f"'{param}' must be an id."}, status=400)
+            scope[key] = int(value)
+
+    rows = timesheet.report(start, end, grain, group_by, **scope)
+    table = timesheet.pivot(rows, group_by)
+
+    if request.GET.get("format") == "csv":
+        response = HttpResponse(timesheet.to_csv(table, group_by), content_type="text/csv")
+        response["Content-Disposition"] = (
+            f'attachment; filename="timesheet_{start:%Y%m%d}_{end:%Y%m%d}_{grain}.csv"'
+        )
+        return response
+    return JsonResponse({
+        "start": start,
+        "end": end,
+        "grain": grain,
+        "group": group_by,
+        "closed_until": timesheet.closed_until(today),
+        **table,
+    })
+
+
+@staff_member_required
+def db_pool_stats(request):
+    """
+    Connection pool counters for this worker process (DB_POOL=1 only).
+    """
+    return JsonResponse({"pid": os.getpid(), "pools": pool_stats()})
+
+
+def _load_profile(request, name):
+    if not request.user.has_perm("core.view_profiletrigger"):
+        raise PermissionDenied
+    try:
+        return profiling.load(name)
+    except FileNotFoundError:
+        raise Http404("No such profile.")
+
+
+@staff_member_required
+def profiles(request):
+    """
+    Stored request profiles (core.profiling), newest first.
+    """
+    if not request.user.has_perm("core.view_profiletrigger"):
+        return HttpResponseForbidden("You can't view profiles.")
+    context = {
+        "title": "Request profiles",
+        "profiles": profiling.listing(),
+        "max_profiles": profiling.max_profiles(),
+    }
+    return render(request, "admin/profiles.html", context)
+
+
+@staff_member_required
+def profile_detail(request, name):
+    """
+    One profile: hottest frames and the SQL timeline.
+    """
+    meta, stacks, queries = _load_profile(request, name)
+    context = {
+        "title": f"Profile {name}",
+        "profile": meta,
+        "hot_frames": profiling.hot_frames(stacks),
+        "slowest": sorted(queries, key=lambda q: q["ms"], reverse=True)[:20],
+        "queries": queries[:500],
+        "more_queries": max(len(queries) - 500, 0),
+    }
+    return render(request, "admin/profile_detail.html", context)
+
+
+@staff_member_required
+def profile_download(request, name):
+    """
+    ``format=collapsed`` (default): stacks for flamegraph.pl / inferno /
+    speedscope; ``format=json``: summary, stacks and SQL timeline.
+    """
+    meta, stacks, queries = _load_profile(request, name)
+    if request.GET.get("format") == "json":
+        response = JsonResponse({"profile": meta, "stacks": stacks, "queries": queries})
+        filename = f"profile_{name}.json"
+    else:
+        response = HttpResponse(profiling.collapsed(stacks), content_type="text/plain; charset=utf-8")
+        filename = f"profile_{name}.folded"
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
+
+
+@staff_member_required
+@require_POST
+def profile_delete(request, name):
+    if not request.user.has_perm("core.delete_profiletrigger"):
+        return HttpResponseForbidden("You can't delete profiles.")
+    try:
+        profiling.delete(name)
+    except FileNotFoundError:
+        raise Http404("No such profile.")
+    messages.success(request, f"Deleted profile {name}.")
+    return redirect("profiles")
+
+
+def _csrf_failure(request):
+    # For session-authenticated requests to a csrf_exempt view.
+    check = CsrfViewMiddleware(lambda request: None)
+    check.process_request(request)
+    return check.process_view(request, None, (), {})
+
+
+@csrf_exempt
+@require_POST
+def bulk_log_activities(request):
+    """
+    Log many InfraActivity rows at once (JSON or CSV body).
+
+    JSON: ``[{"issue": 12, "activity_date": "2025-11-20", "hours_spent": "1.5",
+    "status": "done", "note": "Renewed SSL", "performed_by": "alice"}, ...]``;
+    CSV uses the same column names in its header line. ``performed_by``
+    (a username or user id) is optional and defaults to the uploader. All
+    rows are stored or none are.
+
+    Scripts authenticate with ``Authorization: Bearer <token>`` (see
+    ``API_TOKENS``) and need no CSRF token; browser sessions still do.
+    """
+    user = token_user(request)
+    if user is None:
+        user = request.user
+        if user.is_authenticated and _csrf_failure(request):
+            return JsonResponse({"error": "CSRF verification failed."}, status=403)
+    if not user.is_authenticated or not user.is_staff:
+        return JsonResponse({"error": "Staff access required."}, status=403)
+    try:
+        rows = parse_activity_payload(request.body, request.content_type or "")
+        result = ingest_activities(rows, performed_by=user)
+    except BulkIngestError as exc:
+        return JsonResponse({"error": str(exc), "rows": exc.errors}, status=400)
+    return JsonResponse(result, status=201)
+
+
+STREAM_SECONDS = 300      # clients reconnect (with Last-Event-ID) after this
+HEARTBEAT_SECONDS = 15
+
+
+async def _change_events(last_id, filters):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + STREAM_SECONDS
+    yield "retry: 3000\n\n"
+    while loop.time() < deadline:
+        events, reset = feed.since(last_id)
+        if reset:
+            # Carry on from the buffer's start (last_id may be stale).
+            last_id = 0
+            yield "event: reset\ndata: {}\n\n"
+        sent = False
+        for event in events:
+            last_id = event["id"]
+            if all(event.get(key) == value for key, value in filters.items()):
+                sent = True
+                yield f"id: {feed.cursor(event)}\nevent: change\ndata: {json.dumps(event)}\n\n"
+        if not sent:
+            yield ": keepalive\n\n"
+        await feed.wait(last_id, HEARTBEAT_SECONDS)
+
+
+async def issue_change_stream(request):
+    """
+    Server-Sent Events stream of Issue / InfraActivity changes.
+
+    Optional ``partner``, ``client`` and ``project`` ids narrow the feed;
+    a reconnecting EventSource resumes from its ``Last-Event-ID``
+    (``<epoch>-<id>``; one from another worker or an earlier run gets a
+    ``reset`` event). Served from memory, so it needs the ASGI server to
+    stream: under WSGI each client would hold a worker thread for the
+    whole stream, so it answers 501 there instead.
+    """
+    user = await request.auser()
+    if not user.is_authenticated or not user.is_staff:
+        return JsonResponse({"error": "Staff access required."}, status=403)
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse(
+            {"error": "The change stream needs the ASGI server (WEB_WORKER_CLASS=uvicorn)."},
+            status=501,
+        )
+
+    filters = {
+        key: int(request.GET[key])
+        for key in ("partner", "client", "project")
+        if request.GET.get(key, "").isdigit()
+    }
+    last_event_id = request.headers.get("Last-Event-ID") or request.GET.get("last_event_id", "")
+    last_id = feed.parse_cursor(last_event_id)
+    if last_id is None:
+        last_id = feed.last_id()
+
+    response = StreamingHttpResponse(
+        _change_events(last_id, filters),
+        content_type="text/event-stream",
+    )
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+@replica_safe
+def impact_lookup(request, kind, pk):
+    """
+    Blast radius of an environment / server / resource / issue as JSON.
+    """
+    if not request.user.is_authenticated or not request.user.is_staff:
+        return JsonResponse({"error": "Staff access required."}, status=403)
+    if kind not in IMPACT_NODE_TYPES:
+        return JsonResponse({"error": f"Unknown node type '{kind}'."}, status=404)
+    radius = blast_radius(kind, pk)
+    if radius is None:
+        return JsonResponse({"error": "Not indexed."}, status=404)
+    return JsonResponse(radius)
+
+
+CALENDAR_MAX_DAYS = 93
+
+
+@replica_safe
+def issue_calendar(request):
+    """
+    Issues overlapping a date range for one client, assignee or partner,
+    as compact rows for a month / Gantt view.
+
+    Range: ``month=YYYY-MM`` (default: current month) or ``start`` and
+    ``end`` (ISO dates, at most CALENDAR_MAX_DAYS apart).
+    """
+    if not request.user.is_authenticated or not request.user.is_staff:
+        return JsonResponse({"error": "Staff access required."}, status=403)
+
+    scope = {}
+    for param, key in (("client", "client_id"), ("assignee", "assignee_id"), ("partner", "partner_id")):
+        value = request.GET.get(param, "")
+        if value:
+            if not value.isdigit():
+                return JsonResponse({"error": f"'{param}' must be an id."}, status=400)
+            scope[key] = int(value)
+    if not scope:
+        return JsonResponse({"error": "Give a client, assignee or partner."}, status=400)
+
+    try:
+        if request.GET.get("start") or request.GET.get("end"):
+            start = date.fromisoformat(request.GET.get("start", ""))
+            end = date.fromisoformat(request.GET.get("end", ""))
+        elif request.GET.get("month"):
+            year, month = request.GET["month"].split("-")
+            start, end = month_range(int(year), int(month))
+        else:
+            today = date.today()
+            start, end = month_range(today.year, today.month)
+    except ValueError:
+        return JsonResponse({"error": "Use month=YYYY-MM or start/end=YYYY-MM-DD."}, status=400)
+    if end < start or (end - start).days > CALENDAR_MAX_DAYS:
+        return JsonResponse(
+            {"error": f"The range must be 0-{CALENDAR_MAX_DAYS} days."}, status=400,
+        )
+
+    return JsonResponse({
+        "start": start,
+        "end": end,
+        "fields": CALENDAR_FIELDS,
+        "issues": issues_between(start, end, **scope),
+    })
@@ -0,0 +1,10 @@
+#!/bin/sh
+# Container entrypoint: apply migrations only when some are pending, then
+# run the given command (the image default is gunicorn).
+set -e
+
+if ! python manage.py migrate --check --verbosity 0 >/dev/null 2>&1; then
+    python manage.py migrate --noinput
+fi
+
+exec "$@"
@@ -0,0 +1,57 @@
+"""
+Gunicorn settings for the production profile: ``gunicorn -c gunicorn.conf.py``
+(the image's default command).
+
+The master imports Django and warms it up (core.warmup) before forking,
+so workers start serving at once and share the loaded code
+copy-on-write. More than one worker requires REDIS_URL (see CACHES in
+settings). Workers serve the ASGI application with uvicorn, which the
+live change feed (SSE) needs; WEB_WORKER_CLASS=gthread serves WSGI
+instead, and the change feed then answers 501.
+"""
+import multiprocessing
+import os
+
+
+bind = os.getenv("WEB_BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_WORKERS", str(multiprocessing.cpu_count() * 2 + 1)))
+
+# Cache invalidation (core.search generations: searches, header / home
+# fragments, typeahead) only works across processes with a shared cache.
+if workers > 1 and not os.getenv("REDIS_URL"):
+    raise RuntimeError(
+        f"{workers} workers need a shared cache: set REDIS_URL (or WEB_WORKERS=1)."
+    )
+
+if os.getenv("WEB_WORKER_CLASS", "uvicorn") == "uvicorn":
+    worker_class = "uvicorn.workers.UvicornWorker"
+    wsgi_app = "multi_tenant_infra_desk.asgi:application"
+else:
+    worker_class = "gthread"
+    threads = int(os.getenv("WEB_THREADS", "4"))
+    wsgi_app = "multi_tenant_infra_desk.wsgi:application"
+
+preload_app = True
+timeout = int(os.getenv("WEB_TIMEOUT", "60"))
+graceful_timeout = 30
+keepalive = 5
+
+# Recycle workers now and then (staggered) to bound memory growth.
+max_requests = int(os.getenv("WEB_MAX_REQUESTS", "2000"))
+max_requests_jitter = max_requests // 10
+
+accesslog = "-"
+errorlog = "-"
+
+# Heartbeat files on tmpfs, not the container's overlay filesystem.
+if os.path.isdir("/dev/shm"):
+    worker_tmp_dir = "/dev/shm"
+
+
+def when_ready(server):
+    # Runs in the master after the app is loaded, before the first fork.
+    from core import warmup
+
+    seconds = warmup.warm()
+    warmup.release()
+    server.log.info("Warmed up in %.0f ms", seconds * 1000)
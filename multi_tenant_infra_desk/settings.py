@@ -33,10 +33,8 @@ CSRF_TRUSTED_ORIGINS = [
 # See https://docs.djangoproject.com/en/5.2/howto/deployment/checklist/
 
 # SECURITY WARNING: keep the secret key used in production secret!
-SECRET_KEY = "django-insecure-5br8l_4uf4*tvz5k6t3r=hax3=hnin965#uc6isr&jea0p_dxa"
-
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+# Both come from the environment (SECRET_KEY, DEBUG=0) - see above.
 
 # For local development you can keep this like this.
 # For real deployment, set this to your domain(s).
@@ -63,10 +61,14 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "whitenoise.middleware.WhiteNoiseMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "core.middleware.ProfilingMiddleware",
+    "core.middleware.ReplicaStickinessMiddleware",
+    "core.middleware.AuditRequestMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
@@ -139,6 +141,19 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/5.2/howto/static-files/
 
 STATIC_URL = "static/"
+STATIC_ROOT = BASE_DIR / "staticfiles"
+
+# collectstatic writes content-hashed copies plus .gz versions; WhiteNoise
+# serves them with far-future cache headers and picks the compressed file
+# when the client accepts it. With DEBUG on it serves the source files.
+STORAGES = {
+    "default": {
+        "BACKEND": "django.core.files.storage.FileSystemStorage",
+    },
+    "staticfiles": {
+        "BACKEND": "whitenoise.storage.CompressedManifestStaticFilesStorage",
+    },
+}
 
 
 # Default primary key field type
@@ -147,18 +162,47 @@ STATIC_URL = "static/"
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 
+# Connection management
+# DB_POOL=1 swaps in the pooled engines from core.db.backends: Django still
+# "closes" its connection after each request (CONN_MAX_AGE=0), which just
+# returns it to an in-process pool. Without the pool, connections persist
+# for DB_CONN_MAX_AGE seconds and are health-checked before reuse.
+DB_POOL = os.getenv("DB_POOL", "0") == "1"
+DB_CONN_MAX_AGE = int(os.getenv("DB_CONN_MAX_AGE", "0" if DB_POOL else "60"))
+DB_CONN_HEALTH_CHECKS = os.getenv("DB_CONN_HEALTH_CHECKS", "1") == "1"
+DB_POOL_OPTIONS = {
+    "MAX_SIZE": int(os.getenv("DB_POOL_SIZE", "10")),
+    "TIMEOUT": float(os.getenv("DB_POOL_TIMEOUT", "10")),
+    "MAX_IDLE": float(os.getenv("DB_POOL_MAX_IDLE", "300")),
+    "MAX_LIFETIME": float(os.getenv("DB_POOL_MAX_LIFETIME", "3600")),
+    # Ping idle connections older than this before handing them out.
+    "CHECK_AFTER": float(os.getenv("DB_POOL_CHECK_AFTER", "30")),
+}
+
 # Database configuration based on environment variable
 if DB_ENGINE == "mysql":
     DATABASES = {
         "default": {
-            "ENGINE": "django.db.backends.mysql",
+            "ENGINE": "core.db.backends.mysql" if DB_POOL else "django.db.backends.mysql",
             "NAME": os.getenv("DB_NAME", "infra_desk"),
             "USER": os.getenv("DB_USER", "root"),
             "PASSWORD": os.getenv("DB_PASSWORD", ""),
             "HOST": os.getenv("DB_HOST", "mysql_container"),
             "PORT": os.getenv("DB_PORT", "3306"),
+            "CONN_MAX_AGE": DB_CONN_MAX_AGE,
+            "CONN_HEALTH_CHECKS": DB_CONN_HEALTH_CHECKS,
+            "POOL": DB_POOL_OPTIONS,
             "OPTIONS": {
                 "charset": "utf8mb4",
+                "isolation_level": os.getenv("DB_ISOLATION_LEVEL", "read committed"),
+                "connect_timeout": int(os.getenv("DB_CONNECT_TIMEOUT", "5")),
+                "read_timeout": int(os.getenv("DB_READ_TIMEOUT", "30")),
+                "write_timeout": int(os.getenv("DB_WRITE_TIMEOUT", "30")),
+                "init_command": (
+                    "SET SESSION sql_mode='STRICT_TRANS_TABLES', "
+                    "SESSION innodb_lock_wait_timeout="
+                    + os.getenv("DB_LOCK_WAIT_TIMEOUT", "10")
+                ),
             },
         }
     }
@@ -166,7 +210,145 @@ else:
     # default: sqlite for local dev
     DATABASES = {
         "default": {
-            "ENGINE": "django.db.backends.sqlite3",
+            "ENGINE": "core.db.backends.sqlite3" if DB_POOL else "django.db.backends.sqlite3",
             "NAME": BASE_DIR / "db.sqlite3",
+            "CONN_MAX_AGE": DB_CONN_MAX_AGE,
+            "CONN_HEALTH_CHECKS": DB_CONN_HEALTH_CHECKS,
+            "POOL": DB_POOL_OPTIONS,
+            "OPTIONS": {
+                # Seconds to wait on a locked database before failing.
+                "timeout": int(os.getenv("DB_SQLITE_TIMEOUT", "20")),
+                "transaction_mode": "IMMEDIATE",
+                "init_command": (
+                    "PRAGMA journal_mode=WAL;"
+                    "PRAGMA synchronous=NORMAL;"
+                    "PRAGMA temp_store=MEMORY;"
+                    "PRAGMA cache_size=-20000"
+                ),
+            },
         }
     }
+
+
+# Read replicas
+# DB_REPLICAS is a comma separated list of MySQL hosts ("host" or "host:port")
+# when DB_ENGINE=mysql, or of sqlite file names for local dev. To try it
+# locally: cp db.sqlite3 db-replica.sqlite3 && DB_REPLICAS=db-replica.sqlite3
+DATABASE_REPLICAS = []
+for index, replica in enumerate(
+    [r.strip() for r in os.getenv("DB_REPLICAS", "").split(",") if r.strip()],
+    start=1,
+):
+    alias = f"replica_{index}"
+    replica_db = dict(DATABASES["default"])
+    if DB_ENGINE == "mysql":
+        host, _, port = replica.partition(":")
+        replica_db.update({
+            "HOST": host,
+            "PORT": port or replica_db["PORT"],
+            "USER": os.getenv("DB_REPLICA_USER", replica_db["USER"]),
+            "PASSWORD": os.getenv("DB_REPLICA_PASSWORD", replica_db["PASSWORD"]),
+        })
+    else:
+        replica_db["NAME"] = BASE_DIR / replica
+    # Tests run against the primary only.
+    replica_db["TEST"] = {"MIRROR": "default"}
+    DATABASES[alias] = replica_db
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ["core.db.routers.ReadReplicaRouter"]
+
+# After a save, keep that browser's reads on the primary for this long.
+DATABASE_REPLICA_STICKY_SECONDS = int(os.getenv("DB_REPLICA_STICKY_SECONDS", "5"))
+
+
+# Live change feed: events kept in memory per worker for Last-Event-ID resume
+# (ids carry a per-process epoch, so a resume on another worker resets).
+CHANGE_FEED_SIZE = int(os.getenv("CHANGE_FEED_SIZE", "1000"))
+
+
+# Bearer tokens for scripted clients of the bulk activity endpoint, as
+# "token:username,token:username" (the user must be active staff).
+API_TOKENS = dict(
+    pair.strip().split(":", 1)
+    for pair in os.getenv("API_TOKENS", "").split(",")
+    if ":" in pair
+)
+
+
+# Issue SLA targets in hours per priority (see core/sla.py); an issue is
+# "at risk" when its deadline is closer than ISSUE_SLA_AT_RISK_HOURS.
+ISSUE_SLA_HOURS = {
+    "critical": int(os.getenv("SLA_CRITICAL_HOURS", "4")),
+    "high": int(os.getenv("SLA_HIGH_HOURS", "24")),
+    "medium": int(os.getenv("SLA_MEDIUM_HOURS", "72")),
+    "low": int(os.getenv("SLA_LOW_HOURS", "168")),
+}
+ISSUE_SLA_AT_RISK_HOURS = int(os.getenv("SLA_AT_RISK_HOURS", "24"))
+
+
+# Cache
+# REDIS_URL shares cached results between workers; without it each process
+# keeps its own in-memory cache, which is only fine for a single process
+# (the dev server). The generation counters that invalidate cached
+# searches, header / home fragments and the typeahead live in this cache:
+# with several processes and no REDIS_URL, a change made through one
+# worker never reaches the others' caches (stale for up to
+# SEARCH_CACHE_SECONDS). Any multi-process deployment must set REDIS_URL.
+if os.getenv("REDIS_URL"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.getenv("REDIS_URL"),
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "infra-desk",
+        }
+    }
+
+# Global search / saved search result sets (core/search.py) are dropped as
+# soon as a searched model changes; this only bounds time-based drift
+# (e.g. SLA states) and memory.
+SEARCH_CACHE_SECONDS = int(os.getenv("SEARCH_CACHE_SECONDS", "900"))
+
+# Cached admin header / home page fragments (core/fragments.py); they are
+# re-keyed whenever the models they show change.
+FRAGMENT_CACHE_SECONDS = int(os.getenv("FRAGMENT_CACHE_SECONDS", "600"))
+
+
+# Timesheets (core/timesheet.py): a month is closed this many days after it
+# ends; ``manage.py freeze_timesheets`` then freezes its totals.
+TIMESHEET_GRACE_DAYS = int(os.getenv("TIMESHEET_GRACE_DAYS", "5"))
+
+
+# On-demand request profiler (core/profiling.py), switched on per user /
+# path / sample rate with Profile triggers in the admin. Profiles are
+# files under PROFILER_DIR; only the newest PROFILER_MAX_PROFILES are kept.
+PROFILER_DIR = os.getenv("PROFILER_DIR", str(BASE_DIR / "profiles"))
+PROFILER_MAX_PROFILES = int(os.getenv("PROFILER_MAX_PROFILES", "200"))
+PROFILER_INTERVAL_MS = float(os.getenv("PROFILER_INTERVAL_MS", "5"))
+PROFILER_MAX_SECONDS = int(os.getenv("PROFILER_MAX_SECONDS", "60"))
+# How often each process re-reads the triggers from the database.
+PROFILER_REFRESH_SECONDS = int(os.getenv("PROFILER_REFRESH_SECONDS", "5"))
+
+
+# Email
+# Defaults to printing mail on the console; set EMAIL_BACKEND to
+# "django.core.mail.backends.smtp.EmailBackend" (with the EMAIL_HOST_*
+# variables) to really send, or to the file / locmem backend to inspect.
+EMAIL_BACKEND = os.getenv("EMAIL_BACKEND", "django.core.mail.backends.console.EmailBackend")
+EMAIL_HOST = os.getenv("EMAIL_HOST", "localhost")
+EMAIL_PORT = int(os.getenv("EMAIL_PORT", "25"))
+EMAIL_HOST_USER = os.getenv("EMAIL_HOST_USER", "")
+EMAIL_HOST_PASSWORD = os.getenv("EMAIL_HOST_PASSWORD", "")
+EMAIL_USE_TLS = os.getenv("EMAIL_USE_TLS", "0") == "1"
+EMAIL_TIMEOUT = int(os.getenv("EMAIL_TIMEOUT", "30"))
+EMAIL_FILE_PATH = os.getenv("EMAIL_FILE_PATH", str(BASE_DIR / "sent_emails"))
+DEFAULT_FROM_EMAIL = os.getenv("DEFAULT_FROM_EMAIL", "Infra Desk <noreply@abhiramdas.site>")
+
+# Absolute base for links in emails (digests point at the admin).
+SITE_URL = os.getenv("SITE_URL", "https://infra-desk.abhiramdas.site")
@@ -17,6 +17,7 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path
 from django.views.generic import TemplateView
+from core import api as core_api
 from core import views as core_views
 from django.urls import path
 
@@ -35,6 +36,59 @@ urlpatterns = [
         name="global_search"
     ),
 
+    # Header typeahead (compact JSON)
+    path(
+        "admin/global-search/suggest/",
+        core_views.search_suggest,
+        name="search_suggest",
+    ),
+
+    # Saved searches / Issue filters (per user, cached results)
+    path(
+        "admin/saved-searches/",
+        core_views.saved_searches,
+        name="saved_searches",
+    ),
+    path(
+        "admin/saved-searches/<int:pk>/",
+        core_views.saved_search_run,
+        name="saved_search_run",
+    ),
+    path(
+        "admin/saved-searches/<int:pk>/delete/",
+        core_views.saved_search_delete,
+        name="saved_search_delete",
+    ),
+
+    # DB connection pool metrics (staff only)
+    path(
+        "admin/db-pool/",
+        core_views.db_pool_stats,
+        name="db_pool_stats",
+    ),
+
+    # Request profiles (core/profiling.py)
+    path(
+        "admin/profiles/",
+        core_views.profiles,
+        name="profiles",
+    ),
+    path(
+        "admin/profiles/<str:name>/",
+        core_views.profile_detail,
+        name="profile_detail",
+    ),
+    path(
+        "admin/profiles/<str:name>/download/",
+        core_views.profile_download,
+        name="profile_download",
+    ),
+    path(
+        "admin/profiles/<str:name>/delete/",
+        core_views.profile_delete,
+        name="profile_delete",
+    ),
+
     # Admin panel
     path("admin/", admin.site.urls),
     
@@ -44,4 +98,58 @@ urlpatterns = [
         core_views.export_infra_data,   # <-- call from core_views
         name="export_infra_data",
     ),
-]
\ No newline at end of file
+
+    # Nested inventory tree for CMDB sync (streamed JSON)
+    path(
+        "api/inventory/",
+        core_views.inventory_export,
+        name="inventory_export",
+    ),
+
+    # Live Issue / InfraActivity change feed (SSE, ASGI only)
+    path(
+        "api/changes/stream/",
+        core_views.issue_change_stream,
+        name="issue_change_stream",
+    ),
+
+    # Blast radius from the impact index
+    path(
+        "api/impact/<str:kind>/<int:pk>/",
+        core_views.impact_lookup,
+        name="impact_lookup",
+    ),
+
+    # Bulk activity logging (JSON or CSV)
+    path(
+        "api/activities/bulk/",
+        core_views.bulk_log_activities,
+        name="bulk_log_activities",
+    ),
+
+    # Calendar / Gantt rows from the week-bucket index
+    path(
+        "api/calendar/",
+        core_views.issue_calendar,
+        name="issue_calendar",
+    ),
+
+    # Timesheet report (JSON or CSV)
+    path(
+        "api/timesheet/",
+        core_views.timesheet_report,
+        name="timesheet_report",
+    ),
+
+    # Read-only JSON API
+    path(
+        "api/<str:resource>/",
+        core_api.api_list,
+        name="api_list",
+    ),
+    path(
+        "api/<str:resource>/<int:pk>/",
+        core_api.api_detail,
+        name="api_detail",
+    ),
+]